@@ -0,0 +1,133 @@
+"""
+EmsPy overhead benchmark, ran on the fake EnergyPlus API so no E+ install is needed.
+
+Measures, for each ToC size (number of EMS metrics): callbacks per second of a full run, bytes per stored sample,
+get_ems_data() latency, and get_df() build time. Results can be saved and compared against a saved baseline, failing
+(exit code 1) if any metric regressed by more than the tolerance.
+
+Run from the repo root:
+    python -m EmsPy.Testscripts.emspy_benchmark --sizes 10 100 1000 5000 --days 30
+    python -m EmsPy.Testscripts.emspy_benchmark --save baseline.csv
+    python -m EmsPy.Testscripts.emspy_benchmark --baseline baseline.csv --tolerance 0.25
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+import tempfile
+import pandas as pd
+
+from EmsPy import emspy
+from EmsPy.fake_energyplus import FAKE_EP_PATH
+
+calling_point = 'callback_after_predictor_after_hvac_managers'
+# metric: True if higher is better
+benchmark_metrics = {'callbacks/s': True, 'bytes/sample': False, 'get_ems_data (us)': False, 'get_df (ms)': False}
+
+
+def build_tocs(metric_num: int) -> tuple:
+    """Splits a ToC size into variables (80%), meters (10%), actuators (10%), and 2 weather metrics."""
+
+    meter_num = max(metric_num // 10, 1)
+    actuator_num = max(metric_num // 10, 1)
+    var_num = max(metric_num - meter_num - actuator_num - 2, 1)
+    vars_tc = {f'z{i}_temp': ['Zone Air Temperature', f'Zone {i}'] for i in range(var_num)}
+    meters_tc = {f'z{i}_elec': f'Electricity:Zone:Zone {i}' for i in range(meter_num)}
+    actuators_tc = {f'z{i}_cool_sp': ['Zone Temperature Control', 'Cooling Setpoint', f'Zone {i}']
+                    for i in range(actuator_num)}
+    weather_tc = {'oa_db': 'outdoor_dry_bulb', 'oa_rh': 'outdoor_relative_humidity'}
+    return vars_tc, meters_tc, actuators_tc, weather_tc
+
+
+def run_benchmark(metric_num: int, days: int, timesteps: int, idf_dir: str, latency_calls: int = 1000) -> dict:
+    """Runs one simulation of a ToC size on the fake E+ API and returns its benchmark metrics."""
+
+    end = pd.Timestamp('2001-01-01') + pd.Timedelta(days=days - 1)
+    idf_file = os.path.join(idf_dir, f'benchmark_{metric_num}.idf')
+    with open(idf_file, 'w') as idf:
+        idf.write(f'Timestep, {timesteps};\nRunPeriod, Benchmark, 1, 1, , {end.month}, {end.day}, , ;\n')
+
+    vars_tc, meters_tc, actuators_tc, weather_tc = build_tocs(metric_num)
+    sim = emspy.BcaEnv(FAKE_EP_PATH, idf_file, timesteps, vars_tc, None, meters_tc, actuators_tc, weather_tc)
+    actions = {name: 22.0 for name in actuators_tc}
+
+    def observation_fxn():
+        return 1.0
+
+    def actuation_fxn():
+        return actions
+
+    sim.set_calling_point_and_callback_function(calling_point, observation_fxn, actuation_fxn, True)
+    start = time.perf_counter()
+    sim.run_env(os.path.join(idf_dir, 'benchmark.epw'), os.path.join(idf_dir, 'out'))
+    run_time = time.perf_counter() - start
+
+    data_store = sim._data_store
+    sample_num = sum(data_store.lengths[col] for col, array in enumerate(data_store.arrays) if array is not None)
+
+    # latency of the typical observation call, a few metrics at the most recent time
+    metrics = list(vars_tc)[:3] + list(meters_tc)[:1]
+    start = time.perf_counter()
+    for _ in range(latency_calls):
+        sim.get_ems_data(metrics)
+    ems_data_latency = (time.perf_counter() - start) / latency_calls
+
+    sim._df_cache.clear()
+    start = time.perf_counter()
+    sim.get_df()
+    df_time = time.perf_counter() - start
+
+    sim.delete_state()
+    return {'metrics': metric_num, 'callbacks': sim.callback_current_count, 'run (s)': run_time,
+            'callbacks/s': sim.callback_current_count / run_time, 'bytes/sample': data_store.nbytes / sample_num,
+            'get_ems_data (us)': ems_data_latency * 1e6, 'get_df (ms)': df_time * 1e3}
+
+
+def compare_to_baseline(results: pd.DataFrame, baseline: pd.DataFrame, tolerance: float) -> list:
+    """Returns a description of each benchmark metric that regressed by more than the tolerance (fraction)."""
+
+    regressions = []
+    baseline = baseline.set_index('metrics')
+    for _, row in results.iterrows():
+        if row['metrics'] not in baseline.index:
+            continue
+        for metric, higher_is_better in benchmark_metrics.items():
+            base = baseline.loc[row['metrics'], metric]
+            change = (row[metric] - base) / base
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(f'[{metric}] of [{int(row["metrics"])}] metrics: {row[metric]:.2f} vs. baseline '
+                                   f'{base:.2f} ({change * 100:+.1f}%)')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='EmsPy overhead benchmark on the fake EnergyPlus API.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 5000], help='ToC sizes (metrics)')
+    parser.add_argument('--days', type=int, default=30, help='simulated days, 365 for a full year')
+    parser.add_argument('--timesteps', type=int, default=6, help='timesteps per hour')
+    parser.add_argument('--save', help='CSV file to save results to, i.e. as a baseline')
+    parser.add_argument('--baseline', help='baseline CSV file to compare results against')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed regression vs. baseline, fraction')
+    args = parser.parse_args()
+
+    emspy.set_log_level(logging.WARNING)
+    with tempfile.TemporaryDirectory() as idf_dir:
+        results = pd.DataFrame([run_benchmark(metric_num, args.days, args.timesteps, idf_dir)
+                                for metric_num in args.sizes])
+    print(results.to_string(index=False, float_format=lambda x: f'{x:.2f}'))
+
+    if args.save:
+        results.to_csv(args.save, index=False)
+    if args.baseline:
+        regressions = compare_to_baseline(results, pd.read_csv(args.baseline), args.tolerance)
+        for regression in regressions:
+            print('REGRESSION: ' + regression)
+        if regressions:
+            sys.exit(1)
+        print(f'No regressions beyond {args.tolerance * 100:.0f}% of baseline.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,298 @@
+"""
+Offline EMS Table of Contents (ToC) validation and generation, from an E+ model's output dictionary files.
+
+An E+ model writes all its available output variables (.rdd), meters (.mdd), and EMS actuators & internal variables (.edd)
+to its output directory, given these objects are in its .idf:
+    Output:VariableDictionary, IDF;
+    Output:EnergyManagementSystem, Verbose, Verbose, Verbose;
+These are parsed once into an indexed catalog, persisted on disk, so ToCs can be validated and built before BcaEnv is.
+"""
+
+import os
+import re
+import json
+
+CATALOG_CACHE_FILE = 'ems_catalog.json'
+
+
+def _norm(name: str) -> str:
+    """E+ object & metric names are case-insensitive."""
+
+    return ' '.join(name.split()).upper()
+
+
+def _attr_name(key: str) -> str:
+    """Converts an E+ object name to a valid attribute name part."""
+
+    return re.sub(r'\W+', '_', key.strip()).strip('_').lower()
+
+
+class EmsCatalog:
+    """
+    Indexed catalog of all EMS variables, internal variables, meters, and actuators available in an E+ model.
+
+    Variables are indexed by name, with their keys given by the .idf's zones (the .rdd does not list variable keys).
+    Internal variables are indexed by data type and actuators by (component type, control type), each with their set of
+    keys. Meters are indexed by name. All names are matched case-insensitively, as E+ does.
+    """
+
+    def __init__(self, rdd_file: str = None, edd_file: str = None, mdd_file: str = None, idf_file: str = None,
+                 cache_file: str = None):
+        """
+        :param rdd_file: path to the model's variable dictionary file, .rdd
+        :param edd_file: path to the model's EMS dictionary file, .edd
+        :param mdd_file: path to the model's meter dictionary file, .mdd
+        :param idf_file: path to the EnergyPlus building energy model, .idf file, used for its zone names
+        :param cache_file: path to the JSON file to persist the parsed catalog to, reused while newer than all inputs
+        """
+        self.source_files = {'rdd': rdd_file, 'edd': edd_file, 'mdd': mdd_file, 'idf': idf_file}
+        self.cache_file = cache_file
+
+        catalog = self._load_cache() if cache_file else None
+        if catalog is None:
+            catalog = self._parse()
+            if cache_file:
+                self._write_cache(catalog)
+        self.variables = catalog['variables']  # key: var name, val: [var name, units]
+        self.meters = catalog['meters']  # key: meter name, val: [meter name, units]
+        self.intvars = {data_type: set(keys) for data_type, keys in catalog['intvars'].items()}
+        self.actuators = {tuple(actuator.split('|')): set(keys) for actuator, keys in catalog['actuators'].items()}
+        self.zones = catalog['zones']
+        # original case of all keys, for generated ToCs
+        self.key_names = catalog['key_names']
+
+    @classmethod
+    def from_output_dir(cls, output_dir: str, idf_file: str = None, output_prefix: str = 'eplusout'):
+        """
+        Builds the catalog from a simulation output directory, persisted in that same directory.
+
+        :param output_dir: directory of the E+ model's output files, i.e. EmsPy.run_simulation() output_dir
+        :param idf_file: path to the EnergyPlus building energy model, .idf file, used for its zone names
+        :param output_prefix: output file name prefix
+        """
+        def output_file(extension: str):
+            file = os.path.join(output_dir, output_prefix + '.' + extension)
+            return file if os.path.exists(file) else None
+
+        return cls(output_file('rdd'), output_file('edd'), output_file('mdd'), idf_file,
+                   os.path.join(output_dir, CATALOG_CACHE_FILE))
+
+    def _load_cache(self):
+        """
+        Returns the persisted catalog if it exists and is newer than all of its source files, else None. A missing
+        source file makes the cache stale too.
+        """
+        try:
+            cache_time = os.path.getmtime(self.cache_file)
+            for file in self.source_files.values():
+                if file is not None and os.path.getmtime(file) > cache_time:
+                    return None
+        except OSError:  # missing cache or source file
+            return None
+        try:
+            with open(self.cache_file, 'r') as cache:
+                catalog = json.load(cache)
+        except (OSError, ValueError):
+            return None
+        return catalog if catalog.get('source_files') == self.source_files else None
+
+    def _write_cache(self, catalog: dict):
+        try:
+            with open(self.cache_file, 'w') as cache:
+                json.dump(catalog, cache)
+        except OSError:
+            pass
+
+    def _parse(self) -> dict:
+        """Parses all given source files into a JSON serializable catalog."""
+
+        catalog = {'source_files': self.source_files, 'variables': {}, 'meters': {}, 'intvars': {}, 'actuators': {},
+                   'zones': [], 'key_names': {}}
+        key_names = catalog['key_names']
+
+        def add_key(keys: dict, index, key: str):
+            keys.setdefault(index, []).append(_norm(key))
+            key_names[_norm(key)] = key
+
+        for dict_type in ['rdd', 'mdd']:
+            if self.source_files[dict_type] is None:
+                continue
+            metrics = catalog['variables' if dict_type == 'rdd' else 'meters']
+            with open(self.source_files[dict_type], 'r') as dict_file:
+                for line in dict_file:
+                    metric = self._parse_dict_line(line)
+                    if metric is not None:
+                        metrics[_norm(metric[0])] = list(metric)
+
+        if self.source_files['edd'] is not None:
+            with open(self.source_files['edd'], 'r') as edd:
+                for line in edd:
+                    fields = [field.strip() for field in line.strip().split(',')]
+                    if fields[0] == 'EnergyManagementSystem:Actuator Available' and len(fields) >= 4:
+                        # key, component type, control type, units
+                        actuator = _norm(fields[2]) + '|' + _norm(fields[3])
+                        add_key(catalog['actuators'], actuator, fields[1])
+                        key_names[_norm(fields[2])], key_names[_norm(fields[3])] = fields[2], fields[3]
+                    elif fields[0] == 'EnergyManagementSystem:InternalVariable Available' and len(fields) >= 3:
+                        # key, data type, units
+                        add_key(catalog['intvars'], _norm(fields[2]), fields[1])
+                        key_names[_norm(fields[2])] = fields[2]
+
+        if self.source_files['idf'] is not None:
+            catalog['zones'] = self._parse_idf_zones(self.source_files['idf'])
+            for zone in catalog['zones']:
+                key_names[_norm(zone)] = zone
+        return catalog
+
+    @staticmethod
+    def _parse_dict_line(line: str):
+        """
+        Parses a variable/meter dictionary (.rdd/.mdd) line of either format, returning (name, units) or None.
+
+        IDF format:     Output:Variable,*,Zone Air Temperature,hourly; !- Zone Average [C]
+                        Output:Meter,Electricity:Facility,hourly; !- [J]
+        Regular format: Zone,Average,Zone Air Temperature [C]
+        """
+        line = line.strip()
+        if not line or line.startswith(('!', 'Program Version', 'Var Type')):
+            return None
+        if line.upper().startswith('OUTPUT:'):
+            idf_object, _, comment = line.partition('!-')
+            fields = [field.strip() for field in idf_object.strip().rstrip(';').split(',')]
+            object_type = fields[0].upper()
+            if object_type == 'OUTPUT:VARIABLE' and len(fields) >= 3:
+                name = fields[2]
+            elif object_type == 'OUTPUT:METER' and len(fields) >= 2:  # not :MeterFileOnly, :Cumulative duplicates
+                name = fields[1]
+            else:
+                return None
+            units = re.search(r'\[(.*)\]', comment)
+            return name, units.group(1) if units else ''
+        fields = line.split(',')
+        if len(fields) != 3:
+            return None
+        match = re.match(r'(.*?)\s*\[(.*)\]\s*$', fields[2])
+        return (match.group(1), match.group(2)) if match else (fields[2].strip(), '')
+
+    @staticmethod
+    def _parse_idf_zones(idf_file: str) -> list:
+        """Returns the names of all Zone objects in the .idf."""
+
+        with open(idf_file, 'r') as idf:
+            idf_text = re.sub(r'!.*', '', idf.read())
+        zones = []
+        for idf_object in idf_text.split(';'):
+            fields = [field.strip() for field in idf_object.split(',')]
+            if len(fields) > 1 and fields[0].upper() == 'ZONE':
+                zones.append(fields[1])
+        return zones
+
+    def validate(self, var_tc: dict = None, intvar_tc: dict = None, meter_tc: dict = None,
+                 actuator_tc: dict = None) -> dict:
+        """
+        Checks all ToC entries against the catalog, without running E+.
+
+        Variable keys are not checked, since the .rdd does not list them, only that the variable exists.
+
+        :param var_tc: variable ToC, {"attr_handle_name": ["variable_type", "variable_key"],...}
+        :param intvar_tc: internal variable ToC, {"attr_handle_name": ["variable_type", "variable_key"],...}
+        :param meter_tc: meter ToC, {"attr_handle_name": "meter_name",...}
+        :param actuator_tc: actuator ToC, {"attr_handle_name": ["component_type", "control_type", "actuator_key"],...}
+        :return: invalid ToC entries, {"attr_handle_name": error message,...}, empty if all are valid
+        """
+        invalid = {}
+        for name, (var_name, var_key) in (var_tc or {}).items():
+            if _norm(var_name) not in self.variables:
+                invalid[name] = f'Variable [{var_name}] is not available in this model'
+        for name, (data_type, key) in (intvar_tc or {}).items():
+            if _norm(data_type) not in self.intvars:
+                invalid[name] = f'Internal variable [{data_type}] is not available in this model'
+            elif _norm(key) not in self.intvars[_norm(data_type)]:
+                invalid[name] = f'Internal variable [{data_type}] has no key [{key}]'
+        for name, meter_name in (meter_tc or {}).items():
+            if _norm(meter_name) not in self.meters:
+                invalid[name] = f'Meter [{meter_name}] is not available in this model'
+        for name, (component_type, control_type, key) in (actuator_tc or {}).items():
+            actuator = (_norm(component_type), _norm(control_type))
+            if actuator not in self.actuators:
+                invalid[name] = f'Actuator [{component_type}, {control_type}] is not available in this model'
+            elif _norm(key) not in self.actuators[actuator]:
+                invalid[name] = f'Actuator [{component_type}, {control_type}] has no key [{key}]'
+        return invalid
+
+    def check(self, var_tc: dict = None, intvar_tc: dict = None, meter_tc: dict = None, actuator_tc: dict = None):
+        """Validates all ToCs, see validate(), raising an error listing all invalid entries if there are any."""
+
+        invalid = self.validate(var_tc, intvar_tc, meter_tc, actuator_tc)
+        if invalid:
+            raise Exception('ERROR: Invalid ToC entries, please consult the .idf and/or your ToC for accuracy:\n' +
+                            '\n'.join(f'[{name}]: {error}' for name, error in invalid.items()))
+
+    def _generate(self, entry_fxn, keys, name_format: str, name: str) -> dict:
+        tc = {}
+        for i, key in enumerate(keys):
+            key = self.key_names.get(_norm(key), key)
+            tc[name_format.format(key=_attr_name(key), name=name, index=i)] = entry_fxn(key)
+        return tc
+
+    def expand_variable(self, var_name: str, keys: list = None, name_format: str = '{key}_{name}',
+                        name: str = None) -> dict:
+        """
+        Generates variable ToC entries of a variable for many keys, i.e. "Zone Air Temperature" for every zone.
+
+        :param var_name: variable name, i.e. 'Zone Air Temperature'
+        :param keys: variable keys, all .idf zones by default
+        :param name_format: format of each attr handle name, of {key} (as attribute name), {name}, and {index}
+        :param name: short metric name used in name_format, i.e. 'temp', the variable name by default
+        :return: variable ToC, {"attr_handle_name": ["variable_type", "variable_key"],...}
+        """
+        if _norm(var_name) not in self.variables:
+            raise ValueError(f'ERROR: Variable [{var_name}] is not available in this model.')
+        var_name = self.variables[_norm(var_name)][0]
+        return self._generate(lambda key: [var_name, key], self.zones if keys is None else keys, name_format,
+                              name if name else _attr_name(var_name))
+
+    def expand_intvar(self, data_type: str, name_format: str = '{key}_{name}', name: str = None) -> dict:
+        """
+        Generates internal variable ToC entries of a data type for all of its keys, i.e. "Zone Floor Area".
+
+        :param data_type: internal variable data type, i.e. 'Zone Floor Area'
+        :param name_format: format of each attr handle name, of {key} (as attribute name), {name}, and {index}
+        :param name: short metric name used in name_format, the data type by default
+        :return: internal variable ToC, {"attr_handle_name": ["variable_type", "variable_key"],...}
+        """
+        if _norm(data_type) not in self.intvars:
+            raise ValueError(f'ERROR: Internal variable [{data_type}] is not available in this model.')
+        data_type = self.key_names[_norm(data_type)]
+        return self._generate(lambda key: [data_type, key], sorted(self.intvars[_norm(data_type)]), name_format,
+                              name if name else _attr_name(data_type))
+
+    def expand_actuator(self, component_type: str, control_type: str, name_format: str = '{key}_{name}',
+                        name: str = None) -> dict:
+        """
+        Generates actuator ToC entries of an actuator for all of its keys, i.e. zone "Cooling Setpoint" of every zone.
+
+        :param component_type: actuator component type, i.e. 'Zone Temperature Control'
+        :param control_type: actuator control type, i.e. 'Cooling Setpoint'
+        :param name_format: format of each attr handle name, of {key} (as attribute name), {name}, and {index}
+        :param name: short metric name used in name_format, the control type by default
+        :return: actuator ToC, {"attr_handle_name": ["component_type", "control_type", "actuator_key"],...}
+        """
+        actuator = (_norm(component_type), _norm(control_type))
+        if actuator not in self.actuators:
+            raise ValueError(f'ERROR: Actuator [{component_type}, {control_type}] is not available in this model.')
+        component_type, control_type = self.key_names[actuator[0]], self.key_names[actuator[1]]
+        return self._generate(lambda key: [component_type, control_type, key], sorted(self.actuators[actuator]),
+                              name_format, name if name else _attr_name(control_type))
+
+    def find_meters(self, pattern: str, name_format: str = '{key}') -> dict:
+        """
+        Generates meter ToC entries of all meters matching a pattern, i.e. 'Electricity:Zone:*'.
+
+        :param pattern: meter name pattern, case-insensitive, '*' matches anything
+        :param name_format: format of each attr handle name, of {key} (meter name as attribute name) and {index}
+        :return: meter ToC, {"attr_handle_name": "meter_name",...}
+        """
+        regex = re.compile('^' + '.*'.join(re.escape(part) for part in _norm(pattern).split('*')) + '$')
+        meters = [meter_name for key, (meter_name, _) in sorted(self.meters.items()) if regex.match(key)]
+        return self._generate(lambda key: key, meters, name_format, '')
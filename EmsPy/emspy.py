@@ -8,10 +8,1001 @@ OpenStudio SDK documentation http://nrel.github.io/OpenStudio-user-documentation
 Unmet Hours help forum https://unmethours.com/questions/
 """
 
+import os
+import re
 import sys
+import json
+import hashlib
+import logging
+import time
+import queue
+import itertools
+import threading
+import multiprocessing
+from multiprocessing import shared_memory
 import datetime
+import calendar
+from collections import OrderedDict
+import numpy as np
 import pandas as pd
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional, only needed for streaming data sinks
+    pa = None
+    pq = None
+
+
+class _RateLimitFilter(logging.Filter):
+    """
+    Lets through at most max_num records from the same logging call per interval (s), counting the rest as suppressed.
+    """
+
+    def __init__(self, max_num: int = 5, interval: float = 10.0):
+        super().__init__()
+        self.max_num = max_num
+        self.interval = interval
+        # key: (source file, line no.) of logging call, val: [window start time, num logged, num suppressed]
+        self._windows = {}
+        self._last_prune = time.monotonic()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        now = time.monotonic()
+        if now - self._last_prune >= self.interval:  # evict expired windows, so that they do not pile up
+            self._windows = {key: window for key, window in self._windows.items() if now - window[0] < self.interval}
+            self._last_prune = now
+        key = (record.pathname, record.lineno)
+        window = self._windows.get(key)
+        if window is None or now - window[0] >= self.interval:
+            suppressed_num = window[2] if window is not None else 0
+            self._windows[key] = [now, 1, 0]
+            if suppressed_num:
+                record.msg = f'{record.msg} [{suppressed_num} similar messages suppressed]'
+            return True
+        if window[1] < self.max_num:
+            window[1] += 1
+            return True
+        window[2] += 1
+        return False
+
+
+# EmsPy runtime messages, to stdout by default, configure with set_log_level() or the standard logging module
+logger = logging.getLogger('EmsPy')
+if not logger.handlers:
+    _log_handler = logging.StreamHandler(sys.stdout)
+    _log_handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(_log_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+# per-timestep runtime events of callbacks only, rate limited, see BcaEnv.set_log_events()
+_event_logger = logging.getLogger('EmsPy.events')
+_log_rate_limit_filter = _RateLimitFilter()
+_event_logger.addFilter(_log_rate_limit_filter)
+
+
+def set_log_level(level: int = logging.INFO, rate_limit: tuple = None):
+    """
+    Sets the level of EmsPy messages for this process, i.e. logging.WARNING to silence all NOTEs of a worker process.
+
+    :param level: logging level, messages below it are not emitted
+    :param rate_limit: (max number, interval in seconds) of the same per-timestep runtime event logged, (5, 10.0) by
+    default
+    """
+    logger.setLevel(level)
+    if rate_limit is not None:
+        _log_rate_limit_filter.max_num, _log_rate_limit_filter.interval = rate_limit
+
+
+class EmsDataStore:
+    """
+    Columnar NumPy storage for EMS & timing time series, backing the EmsPy data attributes.
+
+    Each metric gets its own preallocated array that is grown geometrically once full, so that storing a sample is a
+    single array write rather than a boxed Python object appended to a list. Columns keep their own lengths, since EMS
+    metrics may be updated at different calling points and frequencies. A sample may itself be a fixed shape array, i.e.
+    the objectives of a multi-obj reward. Views returned are NOT copies.
+    """
+
+    growth_factor = 2
+
+    def __init__(self, capacity: int = 8760):
+        """
+        :param capacity: initial number of samples to preallocate for each column
+        """
+        self.capacity = max(int(capacity), 1)
+        self.column_index = {}  # key: column name, val: column index into arrays & lengths
+        self.arrays = []  # preallocated data arrays, per column
+        self.lengths = []  # number of valid samples, per column
+        self.column_periods = {}  # key: column index, val: num of rows per sample, if sampled less often
+
+    def __contains__(self, name: str):
+        return name in self.column_index
+
+    def add_column(self, name: str, dtype=np.float64, shape: tuple = ()) -> int:
+        """Preallocates a new data column of given dtype and sample shape, and returns its column index."""
+
+        if name in self.column_index:
+            raise ValueError(f'ERROR: Data column [{name}] already exists.')
+        col = len(self.arrays)
+        self.column_index[name] = col
+        self.arrays.append(np.empty((self.capacity,) + tuple(shape), dtype=dtype))
+        self.lengths.append(0)
+        return col
+
+    def remove_column(self, name: str):
+        """Removes a data column and frees its memory, other column indexes remain valid."""
+
+        col = self.column_index.pop(name)
+        self.arrays[col] = None
+        self.lengths[col] = 0
+        self.column_periods.pop(col, None)
+
+    def set_column_period(self, name: str, period: int):
+        """Sets a column to be sampled once per period (rows), so only 1/period of the capacity is preallocated."""
+
+        col = self.column_index[name]
+        if period > 1:
+            self.column_periods[col] = period
+        else:
+            self.column_periods.pop(col, None)
+        self._resize(col)
+
+    def _resize(self, col: int):
+        """Reallocates a column to its share of the capacity, never smaller than the samples it currently holds."""
+
+        array = self.arrays[col]
+        n = self.lengths[col]
+        capacity = -(-self.capacity // self.column_periods.get(col, 1))
+        resized = np.empty((max(capacity, n, 1),) + array.shape[1:], dtype=array.dtype)
+        resized[:n] = array[:n]
+        self.arrays[col] = resized
+
+    def _grow(self, col: int) -> np.ndarray:
+        """Reallocates a full column to a geometrically larger array, preserving its data."""
+
+        array = self.arrays[col]
+        grown = np.empty((max(len(array) * self.growth_factor, 1),) + array.shape[1:], dtype=array.dtype)
+        grown[:len(array)] = array
+        self.arrays[col] = grown
+        return grown
+
+    def append(self, name: str, value):
+        """Stores the next sample of a given column."""
+
+        self.append_at(self.column_index[name], value)
+
+    def append_at(self, col: int, value):
+        """Stores the next sample of a given column index, used by precompiled sampling plans."""
+
+        n = self.lengths[col]
+        array = self.arrays[col]
+        if n == len(array):
+            array = self._grow(col)
+        array[n] = value
+        self.lengths[col] = n + 1
+
+    def get(self, name: str) -> np.ndarray:
+        """Returns a view (no copy) of all samples stored thus far for a given column."""
+
+        col = self.column_index[name]
+        return self.arrays[col][:self.lengths[col]]
+
+    def last(self, name: str):
+        """Returns the most recent sample of a given column."""
+
+        col = self.column_index[name]
+        n = self.lengths[col]
+        if n == 0:  # would otherwise read an unset slot of the preallocated array
+            raise IndexError(f'ERROR: Data column [{name}] has no samples yet.')
+        return self.arrays[col][n - 1]
+
+    def length(self, name: str) -> int:
+        """Returns the number of samples stored for a given column."""
+
+        return self.lengths[self.column_index[name]]
+
+    def clear(self):
+        """Resets all columns to empty, keeping their allocated memory for reuse."""
+
+        self.lengths = [0] * len(self.lengths)
+
+    def set_capacity(self, capacity: int):
+        """
+        Reallocates all columns to a new capacity (their share of it, if sampled less often), never smaller than the
+        samples they currently hold.
+        """
+        self.capacity = max(int(capacity), 1)
+        for col, array in enumerate(self.arrays):
+            if array is not None:
+                self._resize(col)
+
+    def discard_head(self, keep: int):
+        """Discards all but the most recent samples of every column, keeping their allocated memory for reuse."""
+
+        for col, array in enumerate(self.arrays):
+            n = self.lengths[col]
+            if array is None or n <= keep:
+                continue
+            array[:keep] = array[n - keep:n]
+            self.lengths[col] = keep
+
+    @property
+    def nbytes(self) -> int:
+        """Total number of bytes allocated by all data columns."""
+
+        return sum(array.nbytes for array in self.arrays if array is not None)
+
+
+class EmsCustomFrame:
+    """
+    Compiled collector of a custom dataframe, see BcaEnv.init_custom_dataframe_dict().
+
+    Each data column is compiled to the index of its source column in the main EmsDataStore (and objective index, for
+    rewards), so each update is one gather of the most recent samples into a preallocated row of a 2D NumPy array,
+    rather than per-value name lookups and list appends. Dataframes are built from views of that array.
+    """
+
+    def __init__(self, column_names: list, sources: list, capacity: int):
+        """
+        :param column_names: data column names, in order
+        :param sources: (data store column index, objective index or None) of each data column, None if not 2D
+        :param capacity: initial number of rows to preallocate
+        """
+        self.column_names = list(column_names)
+        self.rows = EmsDataStore(capacity)
+        self._time_col = self.rows.add_column('Datetime', 'datetime64[s]')
+        self._timestep_col = self.rows.add_column('Timestep', np.int32)
+        self._values_col = self.rows.add_column('values', np.float64, (len(self.column_names),))
+        self._row = np.empty(len(self.column_names))
+        # scalar (1D) source columns, gathered at once
+        self._scalar_positions = np.array([i for i, (_, objective) in enumerate(sources) if objective is None],
+                                          dtype=np.intp)
+        self._scalar_columns = [column for column, objective in sources if objective is None]
+        # objectives of the 2D reward column, a single row slice
+        self._objective_positions = np.array([i for i, (_, objective) in enumerate(sources) if objective is not None],
+                                             dtype=np.intp)
+        self._objective_indexes = np.array([objective for _, objective in sources if objective is not None],
+                                           dtype=np.intp)
+        self._objective_column = next((column for column, objective in sources if objective is not None), None)
+
+    def __len__(self):
+        return self.rows.lengths[self._time_col]
+
+    def update(self, data_store: EmsDataStore, time_col: int, timestep_col: int):
+        """
+        Appends a row of the most recent sample of each source column, NaN if not yet sampled. No row is appended before
+        the first state update, since it has no time.
+        """
+        arrays, lengths = data_store.arrays, data_store.lengths
+        if not lengths[time_col]:
+            return
+        row = self._row
+        row[self._scalar_positions] = [arrays[col][lengths[col] - 1] if lengths[col] else np.nan
+                                       for col in self._scalar_columns]
+        objective_col = self._objective_column
+        if objective_col is not None:
+            n = lengths[objective_col]
+            row[self._objective_positions] = arrays[objective_col][n - 1][self._objective_indexes] if n else np.nan
+        rows = self.rows
+        rows.append_at(self._time_col, arrays[time_col][lengths[time_col] - 1])
+        rows.append_at(self._timestep_col, arrays[timestep_col][lengths[timestep_col] - 1])
+        rows.append_at(self._values_col, row)
+
+    def truncate(self, row_num: int):
+        """Discards all rows after the first row_num rows."""
+
+        self.rows.lengths = [min(length, row_num) for length in self.rows.lengths]
+
+    def clear(self):
+        """Discards all rows, keeping their allocated memory for reuse."""
+
+        self.rows.clear()
+
+    def to_df(self) -> pd.DataFrame:
+        """Returns the collected rows as a dataframe, backed by views (no copy) of the row arrays."""
+
+        df = pd.DataFrame(self.rows.get('values'), columns=self.column_names, copy=False)
+        df.insert(0, 'Timestep', self.rows.get('Timestep'))
+        df.insert(0, 'Datetime', self.rows.get('Datetime'))
+        return df
+
+
+class EmsCallbackTiming:
+    """
+    Per-callback timing instrumentation, splitting EnergyPlus solve time from EmsPy and agent (Python) time.
+
+    Each callback records the duration of its stages, and the gap since the prior callback exited is attributed to E+.
+    Samples are stored per callback in a columnar store and binned in batches into preallocated log-spaced histograms
+    per calling point, so summaries are available even if samples are not kept.
+    """
+
+    stages = ['E+', 'Callback', 'Update Time', 'Sampling', 'Observation', 'Actuation', 'Custom DF']
+
+    def __init__(self, calling_points: list, capacity: int = 8760, keep_samples: bool = True,
+                 min_time: float = 1e-7, max_time: float = 100.0, bins_per_decade: int = 20):
+        """
+        :param calling_points: all calling point names, indexed by calling point code
+        :param capacity: number of callback samples preallocated, and binned per batch if samples are not kept
+        :param keep_samples: whether to keep all callback samples for get_df(), or only histograms
+        :param min_time: lower histogram limit (s), shorter times are binned in the first bin
+        :param max_time: upper histogram limit (s), longer times are binned in the last bin
+        :param bins_per_decade: histogram resolution, bins per factor of 10
+        """
+        self.calling_points = calling_points
+        self.keep_samples = keep_samples
+        self._log_min_time = np.log10(min_time)
+        self.bins_per_decade = bins_per_decade
+        self.bin_num = int(np.ceil((np.log10(max_time) - self._log_min_time) * bins_per_decade))
+        self.bin_edges = np.logspace(self._log_min_time, np.log10(max_time), self.bin_num + 1)
+        self.histograms = np.zeros((len(calling_points), len(self.stages), self.bin_num), dtype=np.int64)
+        self.totals = np.zeros((len(calling_points), len(self.stages)))  # (s)
+        self.maxes = np.zeros((len(calling_points), len(self.stages)))  # (s)
+
+        self.samples = EmsDataStore(capacity)
+        self._calling_point_col = self.samples.add_column('Calling Point', np.int8)
+        self._stage_cols = [self.samples.add_column(stage) for stage in self.stages]
+        self._binned_num = 0  # samples already binned
+        self.last_exit = None  # time the last callback exited, None before first callback
+
+    def clear(self):
+        """Clears all samples and histograms, for a new run."""
+
+        self.histograms[:] = 0
+        self.totals[:] = 0
+        self.maxes[:] = 0
+        self.samples.clear()
+        self._binned_num = 0
+        self.last_exit = None
+
+    def record(self, calling_point_code: int, entry: float, exit_: float, update_time: float, sampling: float,
+               observation: float, actuation: float, custom_df: float):
+        """Records the stage durations (s) of a callback, NaN for stages not ran, given its entry & exit times."""
+
+        samples = self.samples
+        ep_time = entry - self.last_exit if self.last_exit is not None else np.nan
+        samples.append_at(self._calling_point_col, calling_point_code)
+        for col, value in zip(self._stage_cols, (ep_time, exit_ - entry, update_time, sampling, observation,
+                                                 actuation, custom_df)):
+            samples.append_at(col, value)
+        self.last_exit = exit_
+        if samples.lengths[self._calling_point_col] - self._binned_num >= len(samples.arrays[self._calling_point_col]):
+            self._bin_samples()  # batch full
+
+    def _bin_samples(self):
+        """Bins all samples not yet binned into the histograms, vectorized."""
+
+        samples = self.samples
+        calling_point_codes = samples.get('Calling Point')[self._binned_num:].astype(np.intp)
+        for stage_i, stage in enumerate(self.stages):
+            times = samples.get(stage)[self._binned_num:]
+            ran = ~np.isnan(times)
+            codes, times = calling_point_codes[ran], times[ran]
+            bins = np.clip(((np.log10(np.maximum(times, 1e-300)) - self._log_min_time) * self.bins_per_decade)
+                           .astype(np.intp), 0, self.bin_num - 1)
+            np.add.at(self.histograms[:, stage_i], (codes, bins), 1)
+            np.add.at(self.totals[:, stage_i], codes, times)
+            np.maximum.at(self.maxes[:, stage_i], codes, times)
+        if self.keep_samples:
+            self._binned_num = samples.length('Calling Point')
+        else:
+            samples.clear()
+            self._binned_num = 0
+
+    def _percentile(self, histogram: np.ndarray, q: float) -> float:
+        """Estimates a percentile (s) from a histogram, as the upper edge of the bin it falls in."""
+
+        cumulative = np.cumsum(histogram)
+        return self.bin_edges[np.searchsorted(cumulative, q / 100 * cumulative[-1]) + 1]
+
+    def summary(self) -> pd.DataFrame:
+        """
+        Returns the timing summary of each calling point & stage ran, from histograms.
+
+        Columns are count, total (s), mean/p50/p95/max (us), and share (%) of total run time, E+ & Callback stages.
+        """
+        self._bin_samples()
+        total_time = self.totals[:, :2].sum()
+        rows = []
+        for code, stage_i in zip(*np.nonzero(self.histograms.sum(axis=2))):
+            histogram = self.histograms[code, stage_i]
+            count = histogram.sum()
+            total = self.totals[code, stage_i]
+            rows.append({'Calling Point': self.calling_points[code], 'Stage': self.stages[stage_i],
+                         'count': count, 'total (s)': total, 'mean (us)': total / count * 1e6,
+                         'p50 (us)': self._percentile(histogram, 50) * 1e6,
+                         'p95 (us)': self._percentile(histogram, 95) * 1e6,
+                         'max (us)': self.maxes[code, stage_i] * 1e6,
+                         'share (%)': total / total_time * 100 if total_time else np.nan})
+        return pd.DataFrame(rows).set_index(['Calling Point', 'Stage']) if rows else pd.DataFrame()
+
+    def report(self) -> str:
+        """Returns a summary report of E+ vs. Python time, overall and per calling point & stage."""
+
+        summary = self.summary()
+        if summary.empty:
+            return 'No callback timing recorded.'
+        ep_time = self.totals[:, 0].sum()
+        python_time = self.totals[:, 1].sum()
+        return (f'Callback Timing: E+ [{ep_time:.3f}] s ({ep_time / (ep_time + python_time) * 100:.1f}%), '
+                f'Python (EmsPy & agent) [{python_time:.3f}] s ({python_time / (ep_time + python_time) * 100:.1f}%)\n'
+                + summary.to_string(float_format=lambda x: f'{x:.2f}'))
+
+    def get_df(self) -> pd.DataFrame:
+        """Returns the per callback stage durations (s), of all samples kept, NaN for stages not ran."""
+
+        samples = self.samples
+        df = pd.DataFrame({stage: samples.get(stage) for stage in self.stages}, copy=False)
+        df.insert(0, 'Calling Point', pd.Categorical.from_codes(samples.get('Calling Point'),
+                                                                categories=self.calling_points))
+        return df
+
+
+class EmsReplayBuffer:
+    """
+    Fixed capacity ring buffer of (observation, action, reward, next observation, done) transitions in NumPy arrays.
+
+    Insertion overwrites the oldest transition once full, O(1), and minibatches are sampled with a single vectorized
+    gather per array. Arrays can be allocated in shared memory, so the buffer can be filled by one process (i.e. a
+    simulation worker) while others attach to it with attach() and sample from it. Only one process should insert.
+    """
+
+    fields = ['obs', 'actions', 'rewards', 'next_obs', 'dones']
+
+    def __init__(self, capacity: int, obs_dim: int, act_dim: int, reward_dim: int = 1, dtype=np.float32,
+                 shared: bool = False, _shared_names: dict = None):
+        """
+        :param capacity: max number of transitions stored
+        :param obs_dim: number of observation metrics
+        :param act_dim: number of action actuators
+        :param reward_dim: number of reward objectives
+        :param dtype: dtype of observations, actions, and rewards
+        :param shared: whether to allocate arrays in shared memory, see share() & attach()
+        """
+        self.capacity = capacity
+        self.dims = {'obs_dim': obs_dim, 'act_dim': act_dim, 'reward_dim': reward_dim}
+        self.dtype = np.dtype(dtype)
+        shapes = {'obs': (capacity, obs_dim), 'actions': (capacity, act_dim), 'rewards': (capacity, reward_dim),
+                  'next_obs': (capacity, obs_dim), 'dones': (capacity,), 'counters': (2,)}
+        dtypes = {'dones': np.dtype(bool), 'counters': np.dtype(np.int64)}
+        self.shared = shared or _shared_names is not None
+        self._shared_memory = {}
+        self.arrays = {}
+        for name, shape in shapes.items():
+            array_dtype = dtypes.get(name, self.dtype)
+            if self.shared:
+                if _shared_names is not None:  # attach
+                    shm = shared_memory.SharedMemory(name=_shared_names[name])
+                else:
+                    shm = shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) *
+                                                                           array_dtype.itemsize, 1))
+                self._shared_memory[name] = shm
+                self.arrays[name] = np.ndarray(shape, dtype=array_dtype, buffer=shm.buf)
+            else:
+                self.arrays[name] = np.zeros(shape, dtype=array_dtype)
+        if _shared_names is None:
+            self.arrays['counters'][:] = 0
+        self._counters = self.arrays['counters']  # [next insert position, size]
+        self._owner = _shared_names is None
+
+    def __len__(self):
+        return int(self._counters[1])
+
+    def add(self, obs, action, reward, next_obs, done: bool = False):
+        """Inserts a transition, overwriting the oldest one if full."""
+
+        arrays = self.arrays
+        i = int(self._counters[0])
+        arrays['obs'][i] = obs
+        arrays['actions'][i] = action
+        arrays['rewards'][i] = reward
+        arrays['next_obs'][i] = next_obs
+        arrays['dones'][i] = done
+        self._counters[0] = (i + 1) % self.capacity
+        if self._counters[1] < self.capacity:
+            self._counters[1] += 1
+
+    def mark_done(self):
+        """Marks the most recently inserted transition as terminal, i.e. at the end of an episode."""
+
+        if self._counters[1]:
+            self.arrays['dones'][(self._counters[0] - 1) % self.capacity] = True
+
+    def sample(self, batch_size: int, rng: np.random.Generator = None) -> dict:
+        """
+        Samples a random minibatch of transitions, uniformly with replacement.
+
+        :return: dict of 'obs', 'actions', 'rewards', 'next_obs', 'dones' arrays, each with batch_size rows (copies)
+        """
+        size = int(self._counters[1])
+        if size == 0:
+            raise ValueError('ERROR: Cannot sample from an empty replay buffer.')
+        indexes = (rng if rng is not None else np.random.default_rng()).integers(0, size, batch_size)
+        return {name: self.arrays[name][indexes] for name in self.fields}
+
+    def share(self) -> dict:
+        """Returns the picklable info another process needs to attach to this shared buffer, see attach()."""
+
+        if not self.shared:
+            raise Exception('ERROR: Replay buffer was not allocated in shared memory, use shared=True.')
+        return {'capacity': self.capacity, 'dtype': self.dtype.str, **self.dims,
+                'shared_names': {name: shm.name for name, shm in self._shared_memory.items()}}
+
+    @classmethod
+    def attach(cls, shared_info: dict):
+        """Attaches to a shared buffer created by another process, given its share() info."""
+
+        return cls(shared_info['capacity'], shared_info['obs_dim'], shared_info['act_dim'],
+                   shared_info['reward_dim'], shared_info['dtype'], _shared_names=shared_info['shared_names'])
+
+    def close(self):
+        """Releases shared memory, which is freed once closed by its creating process."""
+
+        self.arrays = {}
+        self._counters = np.zeros(2, dtype=np.int64)  # detach from shared memory about to be released
+        for shm in self._shared_memory.values():
+            shm.close()
+            if self._owner:
+                shm.unlink()
+        self._shared_memory = {}
+
+
+class EmsRunningStats:
+    """
+    Running mean, variance, min, and max of EMS/weather metrics, updated incrementally as samples are stored.
+
+    Each update is O(1) per metric (Welford's algorithm, vectorized over the metrics sampled together), so observations
+    can be normalized without rescanning the metric history. Statistics can be saved to and loaded from a JSON file,
+    so later episodes and evaluation runs reuse them, optionally frozen so they are no longer updated.
+    """
+
+    def __init__(self, metric_names: list, frozen: bool = False):
+        """
+        :param metric_names: list of metric names tracked, in the order of normalized observation vectors
+        :param frozen: whether statistics are no longer updated, i.e. for evaluation runs
+        """
+        self.metric_names = list(metric_names)
+        self.metric_index = {name: i for i, name in enumerate(self.metric_names)}
+        self.frozen = frozen
+        metric_num = len(self.metric_names)
+        self.count = np.zeros(metric_num, dtype=np.int64)
+        self.mean = np.zeros(metric_num)
+        self._m2 = np.zeros(metric_num)  # sum of squared differences from the mean
+        self.min = np.full(metric_num, np.inf)
+        self.max = np.full(metric_num, -np.inf)
+
+    @property
+    def var(self) -> np.ndarray:
+        """Population variance of each metric, 0 until sampled."""
+
+        return self._m2 / np.maximum(self.count, 1)
+
+    @property
+    def std(self) -> np.ndarray:
+        """Population standard deviation of each metric, 0 until sampled."""
+
+        return np.sqrt(self.var)
+
+    def update(self, indexes: np.ndarray, values):
+        """
+        Adds one sample of each given metric, NaN samples are ignored.
+
+        :param indexes: unique metric indexes, into metric_names
+        :param values: sample of each metric, same order as indexes
+        """
+        values = np.asarray(values, dtype=np.float64)
+        valid = ~np.isnan(values)
+        if not valid.all():
+            indexes, values = indexes[valid], values[valid]
+        count = self.count[indexes] + 1
+        mean = self.mean[indexes]
+        delta = values - mean
+        mean += delta / count
+        self._m2[indexes] += delta * (values - mean)
+        self.mean[indexes] = mean
+        self.count[indexes] = count
+        self.min[indexes] = np.minimum(self.min[indexes], values)
+        self.max[indexes] = np.maximum(self.max[indexes], values)
+
+    def normalize(self, values, clip: float = None, eps: float = 1e-8) -> np.ndarray:
+        """
+        Standardizes a vector of all metric values, (value - mean) / std.
+
+        :param values: value of each metric, in the order of metric_names
+        :param clip: optional absolute bound of normalized values
+        :param eps: added to std, for constant metrics
+        """
+        normalized = (np.asarray(values, dtype=np.float64) - self.mean) / (self.std + eps)
+        if clip is not None:
+            np.clip(normalized, -clip, clip, out=normalized)
+        return normalized
+
+    def scale(self, values) -> np.ndarray:
+        """Min-max scales a vector of all metric values to [0, 1], in the order of metric_names."""
+
+        value_range = self.max - self.min
+        return (np.asarray(values, dtype=np.float64) - self.min) / np.where(value_range > 0, value_range, 1)
+
+    def to_df(self) -> pd.DataFrame:
+        """Returns the statistics of each metric as a dataframe."""
+
+        return pd.DataFrame({'count': self.count, 'mean': self.mean, 'std': self.std, 'min': self.min,
+                             'max': self.max}, index=self.metric_names)
+
+    def save(self, stats_file: str):
+        """Writes the statistics to a JSON file."""
+
+        stats = {name: {'count': int(self.count[i]), 'mean': float(self.mean[i]), 'm2': float(self._m2[i]),
+                        'min': float(self.min[i]), 'max': float(self.max[i])}
+                 for name, i in self.metric_index.items()}
+        stats_dir = os.path.dirname(os.path.abspath(stats_file))
+        os.makedirs(stats_dir, exist_ok=True)
+        with open(stats_file, 'w') as stats_json:
+            json.dump(stats, stats_json, indent=1)
+
+    def load(self, stats_file: str):
+        """Reads statistics saved with save(), only those of tracked metrics are used."""
+
+        with open(stats_file, 'r') as stats_json:
+            stats = json.load(stats_json)
+        for name, metric_stats in stats.items():
+            i = self.metric_index.get(name)
+            if i is None:
+                continue
+            self.count[i] = metric_stats['count']
+            self.mean[i] = metric_stats['mean']
+            self._m2[i] = metric_stats['m2']
+            self.min[i] = metric_stats['min']
+            self.max[i] = metric_stats['max']
+
+
+class EmsDataSink:
+    """
+    Streams dataframe chunks to Parquet (or Arrow IPC) files during the simulation, one file per dataframe.
+
+    Each chunk written is appended as a row group (or record batch) to its dataframe's file, so that dataframes never
+    have to be held in memory in their entirety. Files are opened on the first chunk written and closed by close().
+    """
+
+    file_formats = {'parquet': '.parquet', 'arrow': '.arrow'}
+
+    def __init__(self, sink_dir: str, file_format: str = 'parquet'):
+        """
+        :param sink_dir: directory the dataframe files will be written to
+        :param file_format: 'parquet' or 'arrow' (Arrow IPC file format)
+        """
+        if pa is None:
+            raise ImportError('ERROR: The pyarrow package is required to stream data to Parquet/Arrow files.')
+        if file_format not in self.file_formats:
+            raise ValueError(f'ERROR: Invalid file format [{file_format}], must be one of '
+                             f'{list(self.file_formats)}.')
+        self.sink_dir = sink_dir
+        self.file_format = file_format
+        self._writers = {}  # key: df name, val: open file writer
+
+    def get_file_path(self, df_name: str) -> str:
+        """Returns the path of the file a given dataframe is written to."""
+
+        return os.path.join(self.sink_dir, df_name + self.file_formats[self.file_format])
+
+    def write(self, df_name: str, df: pd.DataFrame):
+        """Appends a chunk of rows to a given dataframe's file."""
+
+        if df.empty:
+            return
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        writer = self._writers.get(df_name)
+        if writer is None:
+            os.makedirs(self.sink_dir, exist_ok=True)
+            if self.file_format == 'parquet':
+                writer = pq.ParquetWriter(self.get_file_path(df_name), table.schema)
+            else:
+                writer = pa.ipc.new_file(self.get_file_path(df_name), table.schema)
+            self._writers[df_name] = writer
+        writer.write_table(table)
+
+    def close(self):
+        """Closes all dataframe files, finalizing them to be read."""
+
+        for writer in self._writers.values():
+            writer.close()
+        self._writers = {}
+
+    @property
+    def df_names(self) -> list:
+        """Names of all dataframes written thus far."""
+
+        return list(self._writers)
+
+
+class EmsDataSinkReader:
+    """Lazily reads back the dataframes streamed by an EmsDataSink, only loading what is requested."""
+
+    def __init__(self, sink_dir: str, file_format: str = 'parquet'):
+        """
+        :param sink_dir: directory the dataframe files were written to
+        :param file_format: 'parquet' or 'arrow' (Arrow IPC file format)
+        """
+        if pa is None:
+            raise ImportError('ERROR: The pyarrow package is required to read streamed Parquet/Arrow files.')
+        self.sink_dir = sink_dir
+        self.file_format = file_format
+        self.file_extension = EmsDataSink.file_formats[file_format]
+
+    @property
+    def df_names(self) -> list:
+        """Names of all dataframes available to be read."""
+
+        return sorted(os.path.splitext(file_name)[0] for file_name in os.listdir(self.sink_dir)
+                      if file_name.endswith(self.file_extension))
+
+    def _get_file_path(self, df_name: str) -> str:
+        file_path = os.path.join(self.sink_dir, df_name + self.file_extension)
+        if not os.path.exists(file_path):
+            raise ValueError(f'ERROR: No dataframe [{df_name}] was streamed to [{self.sink_dir}]. Available '
+                             f'dataframes are {self.df_names}.')
+        return file_path
+
+    def iter_chunks(self, df_name: str, columns: list = None):
+        """Yields a given dataframe one chunk (row group or record batch) at a time, optionally only some columns."""
+
+        file_path = self._get_file_path(df_name)
+        if self.file_format == 'parquet':
+            parquet_file = pq.ParquetFile(file_path)
+            for i in range(parquet_file.num_row_groups):
+                yield parquet_file.read_row_group(i, columns=columns).to_pandas()
+        else:
+            with pa.memory_map(file_path) as source:
+                reader = pa.ipc.open_file(source)
+                for i in range(reader.num_record_batches):
+                    df = reader.get_batch(i).to_pandas()
+                    yield df[columns] if columns else df
+
+    def get_df(self, df_name: str, columns: list = None) -> pd.DataFrame:
+        """Reads an entire dataframe, default EMS type or custom, optionally only some columns."""
+
+        file_path = self._get_file_path(df_name)
+        if self.file_format == 'parquet':
+            return pq.read_table(file_path, columns=columns).to_pandas()
+        with pa.memory_map(file_path) as source:
+            table = pa.ipc.open_file(source).read_all()
+        return table.select(columns).to_pandas() if columns else table.to_pandas()
+
+
+class EmsHandleCache:
+    """
+    Persistent cache of resolved EMS handles, and their validity, keyed by IDF content hash and EnergyPlus version.
+
+    EMS handles of the same model ran by the same version of EnergyPlus are always the same, so repeat runs can skip
+    resolving each handle by name through the E+ API, and ToC entries known to be invalid can be rejected before the
+    simulation is even started. The cache is a JSON file that can be shared by many models and simulations.
+    """
+
+    def __init__(self, cache_file: str, idf_file: str, ep_path: str):
+        """
+        :param cache_file: path to the JSON cache file, created if it does not exist
+        :param idf_file: path to the EnergyPlus building energy model, .idf file, its content is hashed
+        :param ep_path: absolute path to EnergyPlus download directory, used to identify the E+ version
+        """
+        self.cache_file = cache_file
+        self.ep_version = self._get_ep_version(ep_path)
+        self._cache = self._load()
+        self.model_key = None
+        self.handles = None  # key: ToC entry key, val: handle (-1 invalid)
+        self.set_model(idf_file)
+
+    def set_model(self, idf_file: str):
+        """Keys the cached handles by the content hash of the given IDF, i.e. the (sized) model actually ran."""
+
+        with open(idf_file, 'rb') as idf:
+            idf_hash = hashlib.sha256(idf.read()).hexdigest()
+        self.model_key = idf_hash + ':' + self.ep_version
+        self.handles = self._cache.setdefault(self.model_key, {})
+
+    @staticmethod
+    def _get_ep_version(ep_path: str) -> str:
+        """Returns the E+ version from its IDD file, or the install path if not available."""
+
+        try:
+            with open(os.path.join(ep_path, 'Energy+.idd'), 'r') as idd:
+                version = re.match(r'!IDD_Version\s+(\S+)', idd.readline())
+            if version:
+                return version.group(1)
+        except OSError:
+            pass
+        return os.path.abspath(ep_path)
+
+    def _load(self) -> dict:
+        try:
+            with open(self.cache_file, 'r') as cache:
+                return json.load(cache)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def entry_key(ems_type: str, ems_obj_details) -> str:
+        """Returns the cache key of a ToC entry, its EMS type and the details used to get its handle."""
+
+        return ems_type + ':' + json.dumps(ems_obj_details)
+
+    def get(self, ems_type: str, ems_obj_details):
+        """Returns the cached handle of a ToC entry, -1 if known to be invalid, or None if not cached."""
+
+        return self.handles.get(self.entry_key(ems_type, ems_obj_details))
+
+    def set(self, ems_type: str, ems_obj_details, handle: int):
+        """Caches the resolved handle of a ToC entry, -1 if invalid."""
+
+        self.handles[self.entry_key(ems_type, ems_obj_details)] = handle
+
+    def save(self):
+        """Writes the cache to file, merged with entries written by other simulations since it was loaded."""
+
+        cache = self._load()
+        cache.setdefault(self.model_key, {}).update(self.handles)
+        cache_dir = os.path.dirname(os.path.abspath(self.cache_file))
+        os.makedirs(cache_dir, exist_ok=True)
+        temp_file = self.cache_file + f'.{os.getpid()}.tmp'
+        with open(temp_file, 'w') as cache_temp:
+            json.dump(cache, cache_temp)
+        os.replace(temp_file, self.cache_file)  # atomic, for concurrent simulations
+
+
+class EmsSizingCache:
+    """
+    Cache of autosized model variants, so zone/system/plant sizing is only ran once per (IDF, EPW) pair.
+
+    The first time a model and weather file are ran, a sizing only simulation (sizing periods, no weather file run
+    periods) is ran and the autosized values it reports to the .eio are captured. A variant of the model is then
+    written with all those 'Autosize' fields hard-sized and, if no autosized field is left, all sizing calculations
+    disabled. Later simulations of the same IDF & EPW content run this variant directly.
+
+    The sizing and sized models are written next to the original model, so that its relative file references (i.e.
+    Schedule:File) still resolve, while sizing simulation outputs are written to the cache directory.
+    """
+
+    _idd_cache = {}  # key: IDD path, val: {upper IDF class: [field names]}
+
+    def __init__(self, cache_dir: str, ep_path: str):
+        """
+        :param cache_dir: directory to write sizing simulation outputs to
+        :param ep_path: absolute path to EnergyPlus download directory, its IDD is used to map sizes to IDF fields
+        """
+        self.cache_dir = cache_dir
+        self.idd_file = os.path.join(ep_path, 'Energy+.idd')
+
+    @staticmethod
+    def _hash_file(file: str) -> str:
+        with open(file, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()[:16]
+
+    def get_sized_idf(self, idf_file: str, weather_file: str, run_sizing) -> str:
+        """
+        Returns the sized variant of a model for a weather file, running sizing to create it if not cached.
+
+        :param idf_file: path to the EnergyPlus building energy model, .idf file
+        :param weather_file: path to the EnergyPlus weather file, .epw
+        :param run_sizing: fxn(idf_file, weather_file, output_dir) -> E+ exit code, runs a sizing only simulation
+        :return: path to the sized .idf, or the given .idf if sizing failed
+        """
+        sized_name = f'{self._hash_file(idf_file)}_{self._hash_file(weather_file)}'
+        # next to the original model, relative file references in the model are resolved from its directory
+        idf_base = os.path.splitext(os.path.abspath(idf_file))[0]
+        sized_idf_file = f'{idf_base}.{sized_name}.sized.idf'
+        if os.path.exists(sized_idf_file):
+            return sized_idf_file
+
+        sizing_dir = os.path.join(self.cache_dir, sized_name + '_sizing')
+        os.makedirs(sizing_dir, exist_ok=True)
+        model = EnergyPlusModelModifier(idf_file)
+        sizing_model = model.copy()
+        self._set_simulation_control(sizing_model, do_sizing=True, run_sizing_periods=True, run_weather_file=False)
+        sizing_idf_file = f'{idf_base}.{sized_name}.{os.getpid()}.sizing.idf'
+        logger.info('* * * Running E+ Sizing Simulation * * *')
+        try:
+            sizing_model.write(sizing_idf_file)
+            try:
+                if run_sizing(sizing_idf_file, weather_file, sizing_dir) != 0:
+                    raise OSError('sizing simulation failed')
+            finally:
+                if os.path.exists(sizing_idf_file):
+                    os.remove(sizing_idf_file)
+            sizes = self._parse_eio_sizes(os.path.join(sizing_dir, 'eplusout.eio'))
+        except OSError:
+            logger.warning('*WARNING: Sizing simulation FAILED, running model with sizing.')
+            return idf_file
+
+        autosized_left = self._hard_size(model, sizes)
+        if autosized_left:
+            logger.warning(f'*WARNING: {autosized_left} autosized fields could not be hard-sized, sizing remains '
+                           f'enabled.')
+        else:
+            self._set_simulation_control(model, do_sizing=False, run_sizing_periods=False, run_weather_file=True)
+        temp_file = sized_idf_file + f'.{os.getpid()}.tmp'
+        model.write(temp_file)
+        os.replace(temp_file, sized_idf_file)  # atomic, for concurrent simulations
+        return sized_idf_file
+
+    @staticmethod
+    def _set_simulation_control(model, do_sizing: bool, run_sizing_periods: bool, run_weather_file: bool):
+        """Sets SimulationControl sizing calculation and environment fields, adding the object if needed."""
+
+        def yes_no(flag: bool) -> str:
+            return 'Yes' if flag else 'No'
+
+        values = [yes_no(do_sizing)] * 3 + [yes_no(run_sizing_periods), yes_no(run_weather_file)]
+        if not model.get_objects('SimulationControl'):
+            model.set_object(['SimulationControl'] + values)
+            return
+        for i, value in enumerate(values, start=1):
+            model.set_field('SimulationControl', None, i, value)
+
+    @staticmethod
+    def _normalize_field_name(field_name: str) -> str:
+        field_name = re.sub(r'\[.*?\]|\{.*?\}', '', field_name)
+        return ' '.join(re.sub(r'^\s*design size\s+', '', field_name.lower()).split())
+
+    @staticmethod
+    def _parse_eio_sizes(eio_file: str) -> dict:
+        """Parses autosized values, {(upper IDF class, upper object name): {normalized field name: value}}."""
+
+        sizes = {}
+        with open(eio_file, 'r') as eio:
+            for line in eio:
+                # i.e. Component Sizing Information, Fan:OnOff, FAN 1, Design Size Maximum Flow Rate [m3/s], 0.4
+                fields = [field.strip() for field in line.split(',')]
+                if fields[0] != 'Component Sizing Information' or len(fields) < 5 or \
+                        not fields[3].lower().startswith('design size'):
+                    continue
+                sizes.setdefault((fields[1].upper(), fields[2].upper()), {})[
+                    EmsSizingCache._normalize_field_name(fields[3])] = fields[4]
+        return sizes
+
+    def _get_idd_field_names(self) -> dict:
+        """Parses the field names of each IDF class from the E+ IDD, numbered as EnergyPlusModelModifier fields."""
+
+        if self.idd_file not in EmsSizingCache._idd_cache:
+            idd_fields, idf_class = {}, None
+            with open(self.idd_file, 'r') as idd:
+                for line in idd:
+                    field = re.match(r'\s+[AN]\d+\s*[,;]\s*\\field\s+(.*)', line)
+                    if field and idf_class is not None:
+                        idd_fields[idf_class].append(field.group(1).strip())
+                    elif line[:1].isalpha():  # class definition
+                        idf_class = line.strip().rstrip(',;').upper()
+                        idd_fields[idf_class] = ['']  # field 0 is class name
+            EmsSizingCache._idd_cache[self.idd_file] = idd_fields
+        return EmsSizingCache._idd_cache[self.idd_file]
+
+    def _hard_size(self, model, sizes: dict) -> int:
+        """Replaces the model's 'Autosize' fields with their sizes, returns the number of autosized fields left."""
+
+        try:
+            idd_fields = self._get_idd_field_names()
+        except OSError:
+            idd_fields = {}
+        autosized_left = 0
+        for idf_class in [idf_class for idf_class in model.get_classes() if not idf_class.startswith('SIZING')]:
+            field_names = idd_fields.get(idf_class, [])
+            for fields in model.get_objects(idf_class):
+                autosized = [i for i, field in enumerate(fields) if field.lower() == 'autosize']
+                if not autosized or len(fields) < 2:
+                    continue
+                # by class & name, objects of the same name in other classes (i.e. a coil & its fan) are sized apart
+                object_key = (idf_class, fields[1].upper())
+                object_sizes = sizes.get(object_key, {})
+                for i in autosized:
+                    field_name = self._normalize_field_name(field_names[i]) if i < len(field_names) else None
+                    if field_name in object_sizes:
+                        size = object_sizes[field_name]
+                    elif len(autosized) == 1 and len(object_sizes) == 1:  # unambiguous
+                        size = next(iter(object_sizes.values()))
+                    else:
+                        autosized_left += 1
+                        continue
+                    model.set_field(*object_key, i, size)
+        return autosized_left
+
 
 class EmsPy:
     """A meta-class wrapper to the EnergyPlus Python API to simplify/constrain usage for RL-algorithm purposes."""
@@ -37,6 +1028,14 @@ class EmsPy:
                                 'callback_end_zone_timestep_after_zone_reporting',
                                 'callback_end_zone_timestep_before_zone_reporting',
                                 'callback_inside_system_iteration_loop']
+    # calling points that may fire more than once per zone timestep, per system timestep or HVAC iteration
+    sub_timestep_calling_points = ['callback_begin_system_timestep_before_predictor',
+                                   'callback_after_predictor_before_hvac_managers',
+                                   'callback_after_predictor_after_hvac_managers',
+                                   'callback_inside_system_iteration_loop',
+                                   'callback_end_system_timestep_before_hvac_reporting',
+                                   'callback_end_system_timestep_after_hvac_reporting']
+    callback_dedup_modes = ['first', 'latest']
 
     def __init__(self, ep_path: str, ep_idf_to_run: str, timesteps: int,
                  tc_var: dict, tc_intvar: dict, tc_meter: dict, tc_actuator: dict, tc_weather: dict):
@@ -90,6 +1089,12 @@ class EmsPy:
         # Table of Content for present weather data
         self.tc_weather = tc_weather
 
+        # columnar data storage, presized for entire run period
+        self.timestep_input = timesteps
+        self._data_store = EmsDataStore(self._get_run_period_days() * 24 * timesteps)
+        self._data_attr_dict = {}  # key: data attribute name, val: data store column name
+        self._row_index_columns = {}  # key: data store column of row indexes, val: column whose rows are indexed
+
         # dataframes
         self.df_count = 0
         self.df_custom_dict = {}  # key: dict_name, val: ([ems_list], 'calling_point', update freq)
@@ -99,37 +1104,34 @@ class EmsPy:
         self.df_actuator = None
         self.df_weather = None
         self.custom_dataframes_initialized = False
+        self._custom_frames = {}  # key: custom df name, val: its compiled collector, EmsCustomFrame
+        self._custom_frames_by_cp = {}  # key: calling point, val: list of (update freq, EmsCustomFrame)
 
         # summary dicts and lists
-        self.times_master_list = ['actual_date_time', 'actual_times', 'current_times', 'years', 'months', 'days',
-                                  'hours', 'minutes', 'time_x', 'timesteps_zone', 'timesteps_zone_num'
-                                  'callbacks']  # list of available time data user can call
+        self.times_master_list = ['actual_date_times', 'actual_times', 'current_times', 'years', 'months', 'days',
+                                  'hours', 'minutes', 'time_x', 'timesteps_zone_num',
+                                  'callbacks_count']  # list of available time data user can call
         self.ems_names_master_list = self.times_master_list[:]  # keeps track of all user & default EMS var names
         self.ems_type_dict = {}  # keep track of EMS metric names and associated EMS type, quick lookup
         self.ems_num_dict = {}  # keep track of EMS variable categories and num of vars for each
-        self.ems_current_data_dict = {}  # collection of all ems metrics (keys) and their current values (val)
         self.calling_point_actuation_dict = {}  # links cp to actuation fxn & its needed args
+        self._sampling_plans = {}  # key: calling point or tuple of ems metrics, val: compiled sampling plan
+        self.sampling_periods = {}  # key: EMS/weather metric name, val: sampling period in zone timesteps, if > 1
+        self._sample_index_columns = {}  # key: EMS/weather metric name, val: its data store column of time indexes
 
         # create attributes of sensor and actuator .idf handles and data arrays
         self._init_ems_handles_and_data()  # creates ems_handle = int & ems_data = [] attributes, and variable counts
         self.got_ems_handles = False
         self.static_vars_obtained = False  # static (internal) variables, gather once
+        self._static_vars_dict = {}  # key: intvar name, val: static value fetched once
         # create attributes for weather
         self._init_weather_data()  # creates weather_data = [] attribute, useful for present/prior weather data tracking
+        self._weather_forecast_day = None  # (year, month, day) of cached weather forecasts
+        self._weather_forecast_cache = {}  # key: (when, weather metric(s)), val: day forecast array, for current day
 
-        # timing data
-        self.actual_date_times = []
-        self.actual_times = []
-        self.current_times = []
-        self.years = []
-        self.months = []
-        self.days = []
-        self.hours = []
-        self.minutes = []
-        self.time_x = []
+        # timing data, data store columns
+        self._init_time_data()
         # timestep
-        self.timestep_input = timesteps
-        self.timesteps_zone_num = []
         self.timestep_zone_num_current = 0  # fluctuate from 1 to # of timesteps/hour
         self.timestep_total_count = 0  # cnt for entire simulation
         self.timestep_per_hour = None  # sim timesteps per hour, initialized later
@@ -137,22 +1139,150 @@ class EmsPy:
         self.timestep_params_initialized = False
 
         # callback data
-        self.callback_calling_points = []
-        self.callbacks_count = []
         self.callback_current_count = 0
 
         # reward data
         self.rewards_created = False
         self.rewards_multi = False
-        self.rewards = []
         self.reward_current = None
         self.rewards_cnt = None
+        self.reward_totals = None  # running total of each reward objective, (objectives,) array
+        self._reward_col = None  # data store column of rewards, (state updates, objectives)
 
         # simulation data
+        self.handle_cache = None  # optional persistent EMS handle cache
+        self.sizing_cache = None  # optional cache of sized model variants
         self._actuators_used_set = set()  # keep track of what EMS actuators are actually actuated
+        self._actuation_plan = {}  # key: actuator name, val: (handle, setpoint column, setpoint change column)
+        self._actuator_last_values = {}  # key: actuator handle, val: last value written, None if reset
+        self.actuator_write_coalescing = True  # skip writing actuator values unchanged since last written
+        self.actuator_writes = 0  # num of actuator values written (or reset) this run
+        self.actuator_writes_skipped = 0  # num of unchanged actuator values not written this run
         self.simulation_success = 1  # 1 fail, 0 success
+        self._output_dir = None  # E+ output directory of the current run
+        self._step_aborted = False  # whether the running simulation was stopped on purpose, see BcaEnv.reset()
+
+        # forked episodes, Linux only, see BcaEnv.run_forked_episodes()
+        self._fork_episodes = None  # forked episodes setup, forked from first callback after warmup if set
+        self._fork_episode_index = None  # index of this process's forked episode, None if not forked
+        self._rollout = None  # rollout branch setup, only set in forked branch processes, see BcaEnv.fork_rollouts()
+        self._current_calling_point = None  # calling point of the callback currently running
+
+        self.callback_timing = None  # optional callback timing instrumentation, EmsCallbackTiming
+        self.callback_dedup = {}  # key: calling point, val: sub-timestep dedup mode, see set_callback_dedup()
+        self.callback_dedup_counts = {}  # key: calling point, val: num of repeated firings deduplicated this run
+        self.replay_buffer = None  # optional transition replay buffer, EmsReplayBuffer
+        self.observation_stats = None  # optional running statistics of observation metrics, EmsRunningStats
+        self._replay_feed = None  # calling point & data store columns feeding the replay buffer
+
+        # per-timestep runtime events, see set_log_events()
+        self.log_events_count_only = False
+        self.log_event_counts = {}  # key: event name, val: num of occurrences this run
+
+        self._df_cache = {}  # key: tuple of df names, val: returned dict of dfs
+
+        # streaming data sink, optional
+        self.data_sink = None
+        self.data_sink_chunk_size = None  # num of state updates per chunk flushed
+        self.data_sink_keep_history = None  # num of most recent samples kept in memory after each flush
+        self._data_sink_pending_start = 0  # data store index of first state update not yet flushed
+        self._data_sink_rewards_pending_start = 0
+
+        logger.info('*NOTE: Simulation EmsPy class and instance created!')
+
+    def set_log_events(self, count_only: bool = True):
+        """
+        Sets whether per-timestep runtime events (i.e. actuation functions not returning actions) are only counted in
+        log_event_counts rather than also logged, to keep long and parallel runs quiet. See set_log_level() for all
+        other messages.
+        """
+        self.log_events_count_only = count_only
+
+    def _log_event(self, event: str, level: int, msg: str, *args):
+        """Counts a per-timestep runtime event and logs it, lazily formatted, unless in count only mode."""
+
+        self.log_event_counts[event] = self.log_event_counts.get(event, 0) + 1
+        if not self.log_events_count_only and _event_logger.isEnabledFor(level):
+            _event_logger.log(level, msg, *args, stacklevel=2)  # attributed to, and rate limited by, the caller
+
+    def __getattr__(self, name: str):
+        """Resolves EMS & timing data attributes, 'data_' + ems_type + '_' + ems_name etc., to data store views."""
+
+        # only reached when normal attribute lookup fails, use __dict__ to avoid recursion before init
+        column = self.__dict__.get('_data_attr_dict', {}).get(name)
+        data_store = self.__dict__.get('_data_store')
+        if column is not None and column in data_store:
+            if self.__dict__['ems_type_dict'].get(column) == 'setpoint':
+                return self._get_setpoint_data(column)  # expanded from run-length encoded changes
+            return data_store.get(column)
+        raise AttributeError(f'\'{type(self).__name__}\' object has no attribute \'{name}\'')
+
+    @property
+    def callback_calling_points(self) -> pd.Categorical:
+        """The calling point of each state update, stored as codes of EmsPy.available_calling_points."""
+
+        return pd.Categorical.from_codes(self._data_store.get('callback_calling_points'),
+                                         categories=EmsPy.available_calling_points)
 
-        print('\n*NOTE: Simulation EmsPy class and instance created!')
+    @property
+    def rewards(self) -> np.ndarray:
+        """
+        All rewards returned thus far, (rewards,) or (rewards, objectives) if multi-obj, a view of the data store.
+        """
+        if self._reward_col is None:
+            return np.empty(0)
+        data_store = self._data_store
+        rewards = data_store.arrays[self._reward_col][:data_store.lengths[self._reward_col]]
+        return rewards if self.rewards_multi else rewards[:, 0]
+
+    @property
+    def ems_current_data_dict(self) -> dict:
+        """Collection of all EMS metrics (keys) and their current values (val), read from the data store."""
+
+        data_store = self._data_store
+        current_data_dict = {}
+        if data_store.length('time_x'):
+            current_data_dict['Datetime'] = data_store.last('time_x')
+        for ems_name in self.ems_names_master_list:
+            if ems_name in data_store and data_store.length(ems_name):
+                current_data_dict[ems_name] = data_store.last(ems_name)
+        return current_data_dict
+
+    def _add_data_column(self, attr_name: str, column_name: str, dtype=np.float64):
+        """Creates a data store column and links it to its (read-only) data attribute name."""
+
+        self._data_store.add_column(column_name, dtype)
+        self._data_attr_dict[attr_name] = column_name
+
+    def _get_run_period_days(self) -> int:
+        """Estimates the number of simulated days from the RunPeriod(s) of the IDF, used to presize data storage."""
+
+        try:
+            with open(self.idf_file, 'r') as idf:
+                idf_text = re.sub(r'!.*', '', idf.read())  # remove comments
+        except (OSError, TypeError):
+            return 365  # IDF not readable, assume annual simulation
+
+        weekdays = [day.lower() for day in calendar.day_name]
+        run_period_days = 0
+        for idf_obj in idf_text.split(';'):
+            fields = [field.strip() for field in idf_obj.split(',')]
+            if fields[0].lower() != 'runperiod':
+                continue
+            try:
+                # E+ 9.x adds Begin/End Year fields, older IDFs have Day of Week for Start Day right after End Day
+                if fields[6].lower() in weekdays:
+                    begin_month, begin_day, end_month, end_day = fields[2:6]
+                else:
+                    begin_month, begin_day, _, end_month, end_day = fields[2:7]
+                begin = datetime.date(2001, int(begin_month), int(begin_day))
+                end = datetime.date(2001, int(end_month), int(end_day))
+            except (IndexError, ValueError):
+                continue
+            if end < begin:  # run period wraps around new year
+                end = end.replace(year=2002)
+            run_period_days += (end - begin).days + 1
+        return run_period_days if run_period_days else 365
 
     def _init_ems_handles_and_data(self):
         """
@@ -176,10 +1306,17 @@ class EmsPy:
                         raise ValueError(f'ERROR: EMS metric user-defined names must be unique, '
                                          f'{ems_name}({self.ems_type_dict[ems_name]}) != {ems_name}({ems_type})')
                     setattr(self, 'handle_' + ems_type + '_' + ems_name, None)
-                    setattr(self, 'data_' + ems_type + '_' + ems_name, [])
+                    self._add_data_column('data_' + ems_type + '_' + ems_name, ems_name)
                     if ems_type == 'actuator':  # handle associated actuator setpoints
                         setpoint_name = 'setpoint_' + ems_name
-                        setattr(self, 'data_' + setpoint_name, [])  # what user/control sets
+                        # what user/control sets, run-length encoded as changes & the actuation row of each
+                        self._add_data_column('data_' + setpoint_name, setpoint_name)
+                        self._add_data_column('data_setpoint_changes_' + ems_name, 'setpoint_changes_' + ems_name,
+                                              np.int64)
+                        self._row_index_columns['setpoint_changes_' + ems_name] = 'actuation_time_indexes'
+                        if 'actuation_time_indexes' not in self._data_store:  # state update row of each actuation
+                            self._add_data_column('actuation_time_indexes', 'actuation_time_indexes', np.int64)
+                            self._row_index_columns['actuation_time_indexes'] = 'time_x'
                         self.ems_type_dict[setpoint_name] = 'setpoint'
                         self.ems_names_master_list.append(setpoint_name)
                     self.ems_type_dict[ems_name] = ems_type
@@ -202,12 +1339,22 @@ class EmsPy:
                 if weather_name in self.ems_names_master_list:
                     raise ValueError(f'ERROR: EMS metric user-defined names must be unique, '
                                      f'{weather_name}({self.ems_type_dict[weather_name]}) != {weather_name}(weather)')
-                setattr(self, 'data_weather_' + weather_name, [])
+                self._add_data_column('data_weather_' + weather_name, weather_name)
                 self.ems_names_master_list.append(weather_name)
                 self.ems_type_dict[weather_name] = 'weather'
             self.ems_num_dict['weather'] = len(self.tc_weather)
             self.df_count += 1
 
+    def _init_time_data(self):
+        """Creates data store columns for all time-keeping data, accessible by their time attribute names."""
+
+        time_dtypes = {'actual_date_times': np.int64, 'actual_times': np.float64, 'current_times': np.float64,
+                       'years': np.int32, 'months': np.int32, 'days': np.int32, 'hours': np.int32,
+                       'minutes': np.int32, 'time_x': 'datetime64[s]', 'timesteps_zone_num': np.int32,
+                       'callback_calling_points': np.int8, 'callbacks_count': np.int64}
+        for time_name, dtype in time_dtypes.items():
+            self._add_data_column(time_name, time_name, dtype)
+
     def _init_timestep(self) -> int:
         """This function is used to fetch the timestep input from the IDF model & verify with user input."""
 
@@ -224,39 +1371,73 @@ class EmsPy:
                                      f'{available_timesteps}')
                 self.timestep_period = 60 // timestep
                 self.timestep_per_hour = timestep
-                print(f'\n*NOTE: Your simulation timestep period is {self.timestep_period} minutes @ {timestep}'
-                      f' timestep(s) an hour.\n')
+                logger.info(f'*NOTE: Your simulation timestep period is {self.timestep_period} minutes @ {timestep}'
+                            f' timestep(s) an hour.')
                 self.timestep_params_initialized = True
                 return timestep
         except ZeroDivisionError:
             pass
 
     def _init_reward(self, reward):
-        """This updates the reward attributes to the needs set by user."""
+        """This updates the reward attributes to the needs set by user, i.e. single or multi-obj from first reward."""
 
         # attribute creation
         if not self.rewards_created:  # first iteration, do once
-            try:  # multi obj rewards
-                self.rewards_cnt = len(reward)
-                self.rewards_multi = True
-                self.rewards = [[] for _ in range(self.rewards_cnt)]
-            except TypeError:
-                self.rewards_cnt = 1
-                self.rewards = []
+            self.rewards_multi = np.ndim(reward) > 0  # multi obj rewards, tuple/list/array
+            self.rewards_cnt = int(np.size(reward))
+            # (state updates, objectives) data store column, reused across runs if the same num of objectives
+            data_store = self._data_store
+            if 'rewards' in data_store and data_store.arrays[data_store.column_index['rewards']].shape[1:] != \
+                    (self.rewards_cnt,):
+                data_store.remove_column('rewards')
+            if 'rewards' not in data_store:
+                data_store.add_column('rewards', np.float64, (self.rewards_cnt,))
+            self._reward_col = data_store.column_index['rewards']
+            self.reward_totals = np.zeros(self.rewards_cnt)
             self.rewards_created = True
-            self.reward_current = [0] * self.rewards_cnt
 
     def _set_ems_handles(self):
         """Gets and reassigns the gathered sensor/actuators handles to their according _handle instance attribute."""
 
+        handle_cache = self.handle_cache
+        cache_updated = False
         ems_types = ['var', 'intvar', 'meter', 'actuator']
         for ems_type in ems_types:
             ems_tc = getattr(self, 'tc_' + ems_type)
             if ems_tc is not None:
                 for name in ems_tc:
                     handle_inputs = ems_tc[name]
-                    setattr(self, 'handle_' + ems_type + '_' + name, self._get_handle(ems_type, handle_inputs))
-        print('\n*NOTE: Got all EMS handles.\n')
+                    handle = handle_cache.get(ems_type, handle_inputs) if handle_cache is not None else None
+                    if handle is None:  # not cached, resolve by name
+                        try:
+                            handle = self._get_handle(ems_type, handle_inputs)
+                        except Exception:
+                            if handle_cache is not None:  # remember invalid entry, rejected before next run
+                                handle_cache.set(ems_type, handle_inputs, -1)
+                                handle_cache.save()
+                            raise
+                        if handle_cache is not None:
+                            handle_cache.set(ems_type, handle_inputs, handle)
+                            cache_updated = True
+                    setattr(self, 'handle_' + ems_type + '_' + name, handle)
+        if cache_updated:
+            handle_cache.save()
+        logger.info('*NOTE: Got all EMS handles.')
+
+        # actuation lookups, resolved ONCE now that handles are known
+        column_index = self._data_store.column_index
+        self._actuation_plan = {actuator_name: (getattr(self, 'handle_actuator_' + actuator_name),
+                                                column_index['setpoint_' + actuator_name],
+                                                column_index['setpoint_changes_' + actuator_name])
+                                for actuator_name in (self.tc_actuator or {})}
+        self._actuator_last_values.clear()
+
+        # compile state update sampling plans ONCE per calling point, now that handles are known
+        self._sampling_plans.clear()
+        state_plan = self._compile_sampling_plan(self.ems_names_master_list)
+        for calling_point, (_, _, update_state, _, _) in self.calling_point_actuation_dict.items():
+            if update_state:
+                self._sampling_plans[calling_point] = state_plan
 
     def _get_handle(self, ems_type: str, ems_obj_details):
         """
@@ -300,6 +1481,7 @@ class EmsPy:
 
         state = self.state
         datax = self.api.exchange
+        data_store = self._data_store
 
         # gather data
         year = datax.year(state)
@@ -309,17 +1491,22 @@ class EmsPy:
         minute = datax.minutes(state)
         timestep_zone_num = datax.zone_time_step_number(state)
 
+        # verify new timestep if current & previous timestep num and datetime are different, compare before append
+        first_update = data_store.length('timesteps_zone_num') == 0
+        timestep_prev = None if first_update else data_store.last('timesteps_zone_num')
+        dt_prev = None if first_update else data_store.last('time_x')
+
         # set, append
-        self.actual_date_times.append(datax.actual_date_time(state))
-        self.actual_times.append(datax.actual_time(state))
-        self.current_times.append(datax.current_time(state))
-        self.years.append(year)
-        self.months.append(month)
-        self.days.append(day)
-        self.hours.append(hour)
-        self.minutes.append(minute)
+        data_store.append('actual_date_times', datax.actual_date_time(state))
+        data_store.append('actual_times', datax.actual_time(state))
+        data_store.append('current_times', datax.current_time(state))
+        data_store.append('years', year)
+        data_store.append('months', month)
+        data_store.append('days', day)
+        data_store.append('hours', hour)
+        data_store.append('minutes', minute)
         # timesteps
-        self.timesteps_zone_num.append(timestep_zone_num)
+        data_store.append('timesteps_zone_num', timestep_zone_num)
         self.timestep_zone_num_current = timestep_zone_num
 
         # manage time  tracking
@@ -333,71 +1520,140 @@ class EmsPy:
         # time keeping dataframe management
         dt = datetime.datetime(year=year, month=month, day=day, hour=hour, minute=minute)
         dt += timedelta
-        self.time_x.append(dt)
-        self.ems_current_data_dict['Datetime'] = dt  # TODO not used
+        data_store.append('time_x', dt)
 
         # timesteps total
-        if len(self.time_x) < 2 or \
-                self.time_x[-1] != self.time_x[-2] or self.timesteps_zone_num[-1] != self.timesteps_zone_num[-2]:
-            # verify new timestep if current & previous timestep num and datetime are different
+        if first_update or np.datetime64(dt, 's') != dt_prev or timestep_zone_num != timestep_prev:
             self.timestep_total_count += 1
 
-    def _update_ems_data_attributes(self, ems_type: str, ems_name: str, data_val: float):
-        """Helper function to update EMS attributes with current values."""
+    def _compile_sampling_plan(self, ems_metrics_list: list, periodic: bool = True) -> dict:
+        """
+        Compiles a sampling plan of the given EMS/weather metrics, to be ran with _run_sampling_plan at runtime.
+
+        All attribute names, EMS type lookups, and API getter functions are resolved once here, after the EMS handles
+        have been set, so that each callback only iterates flat lists of (getter, handle, data store column) tuples
+        grouped by EMS type.
 
-        getattr(self, 'data_' + ems_type + '_' + ems_name).append(data_val)
-        self.ems_current_data_dict[ems_name] = data_val
+        Metrics with a sampling period (see set_sampling_periods()) are compiled into their own sub-plan per period,
+        ran only when due, along with the data store column their time indexes are stored to.
 
-    def _update_ems_and_weather_vals(self, ems_metrics_list: list):
-        """Fetches and updates given sensor/actuator/weather values to data lists/dicts from running simulation."""
+        :param ems_metrics_list: list of EMS/weather metric names, time and setpoint metrics are skipped
+        :param periodic: whether to split metrics with sampling periods into sub-plans, or sample all of them
+        :return: dict of EMS type (key) and list of its sampling tuples (val), and 'periodic' sub-plans
+        """
+        sampling_periods = self.sampling_periods
+        periodic_plans = []
+        if periodic and sampling_periods:
+            period_metrics = {}
+            for ems_name in ems_metrics_list:
+                period = sampling_periods.get(ems_name)
+                if period is not None:
+                    period_metrics.setdefault(period, []).append(ems_name)
+            # [period, time index column, sub-plan, zone timestep count last sampled], mutable
+            for period, metrics in sorted(period_metrics.items()):
+                periodic_plans.append([period, self._data_store.column_index['sample_indexes_' + str(period)],
+                                       self._compile_sampling_plan(metrics, periodic=False), -period])
+            ems_metrics_list = [ems_name for ems_name in ems_metrics_list if ems_name not in sampling_periods]
 
-        # TODO how to handle user-specified TIMING updates separate from state, right now they are joint
-        # specific data exchange API function calls
         datax = self.api.exchange
         ems_datax_func = {'var': datax.get_variable_value,
                           'intvar': datax.get_internal_variable_value,
                           'meter': datax.get_meter_value,
                           'actuator': datax.get_actuator_value}
+        column_index = self._data_store.column_index
 
+        plan = {'var': [], 'intvar': [], 'meter': [], 'actuator': [], 'weather': []}
         for ems_name in ems_metrics_list:
             ems_type = self.ems_type_dict[ems_name]
             # SKIP time and setpoint updates, each have their OWN updates
-            if ems_type == 'time' or ems_type == 'setpoint':
+            if ems_type == 'time' or ems_type == 'setpoint' or ems_name not in column_index:
                 continue
             if ems_type == 'weather':
-                data_i = self._get_weather([ems_name], 'today', self.hours[-1], self.timestep_zone_num_current)
-            elif ems_type == 'intvar':  # internal(static) vars updated ONCE, separately
-                if not self.static_vars_obtained:
-                    data_i = ems_datax_func[ems_type](self.state, getattr(self, 'handle_' + ems_type + '_' + ems_name))
-                    self.static_vars_obtained = True
-            else:  # rest: var, meter, actuator
-                # get data from E+ sim
-                data_i = ems_datax_func[ems_type](self.state, getattr(self, 'handle_' + ems_type + '_' + ems_name))
-
-            # store data in obj attributes
-            self._update_ems_data_attributes(ems_type, ems_name, data_i)
+                weather_metric = self.tc_weather[ems_name]
+                # sun weather type is unique to rest, doesn't follow consistent naming system
+                if weather_metric == 'sun_is_up':
+                    def weather_getter(state, hour, zone_ts, sun_is_up=datax.sun_is_up):
+                        return sun_is_up(state)
+                else:
+                    weather_getter = getattr(datax, 'today_weather_' + weather_metric + '_at_time')
+                plan['weather'].append((weather_getter, column_index[ems_name]))
+            else:  # var, intvar, meter, actuator
+                handle = getattr(self, 'handle_' + ems_type + '_' + ems_name)
+                plan[ems_type].append((ems_datax_func[ems_type], handle, column_index[ems_name], ems_name))
+
+        # running statistics of sampled metrics, see BcaEnv.init_observation_stats()
+        plan['stats'] = None
+        stats = self.observation_stats
+        if stats is not None and not stats.frozen:
+            tracked = [(i, column_index[name]) for name, i in stats.metric_index.items()
+                       if name in column_index and name in ems_metrics_list]
+            if tracked:
+                stats_indexes, stats_columns = zip(*tracked)
+                plan['stats'] = (np.array(stats_indexes), list(stats_columns))
+        plan['periodic'] = periodic_plans
+        return plan
+
+    def _run_sampling_plan(self, plan: dict):
+        """Fetches and stores all metric values of a compiled sampling plan from the running simulation."""
 
-    def _update_reward(self, reward):
-        """ Updates attributes related to the reward. Works for single-obj(scalar) and multi-obj(vector) reward fxns."""
+        state = self.state
+        append_at = self._data_store.append_at
+
+        for ems_type in ('var', 'meter', 'actuator'):
+            for getter, handle, col, _ in plan[ems_type]:
+                append_at(col, getter(state, handle))
+        # internal(static) vars fetched ONCE, then repeated
+        static_vars_dict = self._static_vars_dict
+        for getter, handle, col, ems_name in plan['intvar']:
+            try:
+                append_at(col, static_vars_dict[ems_name])
+            except KeyError:
+                static_vars_dict[ems_name] = getter(state, handle)
+                append_at(col, static_vars_dict[ems_name])
+                self.static_vars_obtained = len(static_vars_dict) == self.ems_num_dict['intvar']
+        if plan['weather']:
+            hour = self._data_store.last('hours')
+            zone_ts = self.timestep_zone_num_current
+            for getter, col in plan['weather']:
+                append_at(col, getter(state, hour, zone_ts))
+        if plan['stats'] is not None:
+            stats_indexes, stats_columns = plan['stats']
+            arrays, lengths = self._data_store.arrays, self._data_store.lengths
+            self.observation_stats.update(stats_indexes, [arrays[col][lengths[col] - 1] for col in stats_columns])
+        # metrics sampled less often, once due since last sampled, along with the state update (time) index
+        if plan['periodic']:
+            timestep_count = self.timestep_total_count
+            for periodic_plan in plan['periodic']:
+                if timestep_count - periodic_plan[3] >= periodic_plan[0]:
+                    periodic_plan[3] = timestep_count
+                    self._run_sampling_plan(periodic_plan[2])
+                    append_at(periodic_plan[1], self._data_store.length('time_x') - 1)
 
-        # handle single vs multi reward together
-        if self.rewards_multi:
-            rewards = []  # init for multi
-        else:
-            reward = [reward]  # need to make single val iterable
+    def _update_ems_and_weather_vals(self, ems_metrics_list: list):
+        """Fetches and updates given sensor/actuator/weather values to data store from running simulation."""
 
-        for reward_i in reward:
-            if type(reward_i) is not float and type(reward_i) is not int:
-                raise TypeError(f'ERROR: Reward returned from the observation function, [{reward_i}] must be of'
-                                f' type float or int.')
-            else:
-                if self.rewards_multi:
-                    rewards.append(reward_i)  # [[r11, r12, r13], [r21, r22, r23], ...]
-                else:
-                    rewards = reward_i  # single reward
+        # TODO how to handle user-specified TIMING updates separate from state, right now they are joint
+        plan_key = tuple(ems_metrics_list)
+        plan = self._sampling_plans.get(plan_key)
+        if plan is None:  # compile ONCE per unique metric list
+            plan = self._sampling_plans[plan_key] = self._compile_sampling_plan(ems_metrics_list)
+        self._run_sampling_plan(plan)
+
+    def _update_reward(self, reward):
+        """
+        Updates attributes related to the reward. Works for single-obj (scalar) and multi-obj (tuple, list, or array)
+        reward fxns, all objectives are checked at once to be int or float.
+        """
+        if type(reward) is not float or self.rewards_cnt != 1:  # fast path for the typical scalar reward
+            reward = np.asarray(reward)
+            if reward.dtype.kind not in 'iuf' or reward.size != self.rewards_cnt:
+                raise TypeError(f'ERROR: Reward returned from the observation function, [{reward}] must be of type'
+                                f' float or int, with [{self.rewards_cnt}] objective(s) as returned the first time.')
         # reward data update
-        self.rewards.append(rewards)
-        self.reward_current = rewards
+        self._data_store.append_at(self._reward_col, reward)
+        reward_row = self._data_store.last('rewards')
+        self.reward_totals += reward_row
+        self.reward_current = reward_row.copy() if self.rewards_multi else float(reward_row[0])
 
     def _get_weather(self, weather_metrics: list, when: str,  hour: int, zone_ts: int) -> list:
         """
@@ -446,6 +1702,56 @@ class EmsPy:
         else:
             return weather_data
 
+    def _get_weather_day(self, weather_metrics: list, when: str) -> np.ndarray:
+        """
+        Gets an entire day of desired weather metric data, either for today or tomorrow in simulation.
+
+        Forecasts are cached for the current simulation day, and invalidated once the day rolls over, so that only the
+        first call of the day for a given weather metric calls the E+ API (hours x timesteps times).
+
+        :param weather_metrics: the weather metrics to call from E+ API, only specific fields from ToC are granted
+        :param when: the day in question, 'today' or 'tomorrow', relative to current simulation time
+        :return: array of weather data, (weather metrics, 24 hours, timesteps per hour). The 'sun_is_up' metric is
+        only available for the current time and is returned as NaN
+        """
+        if when != 'today' and when != 'tomorrow':
+            raise Exception('ERROR: Weather data must either be called from sometime today or tomorrow relative to'
+                            ' current simulation timestep.')
+        state = self.state
+        datax = self.api.exchange
+
+        # invalidate cache on day rollover
+        day = (datax.year(state), datax.month(state), datax.day_of_month(state))
+        if day != self._weather_forecast_day:
+            self._weather_forecast_cache.clear()
+            self._weather_forecast_day = day
+        weather_cache = self._weather_forecast_cache
+        cache_key = (when, tuple(weather_metrics))
+        if cache_key in weather_cache:
+            return weather_cache[cache_key]
+
+        timesteps = self.timestep_per_hour if self.timestep_per_hour else self.timestep_input
+        weather_days = []
+        for weather_name in weather_metrics:
+            metric_key = (when, weather_name)
+            if metric_key not in weather_cache:
+                # input error handling
+                if weather_name not in self.tc_weather:
+                    raise Exception(f'ERROR: Invalid weather metric [{weather_name}] given. Please see your weather ToC'
+                                    f' for available weather metrics.')
+                weather_metric = self.tc_weather[weather_name]
+                weather_day = np.full((24, timesteps), np.nan)
+                # sun weather type is unique to rest, doesn't follow consistent naming system, current time only
+                if weather_metric != 'sun_is_up':
+                    weather_getter = getattr(datax, when + '_weather_' + weather_metric + '_at_time')
+                    for hour in range(24):
+                        for zone_ts in range(1, timesteps + 1):
+                            weather_day[hour, zone_ts - 1] = weather_getter(state, hour, zone_ts)
+                weather_cache[metric_key] = weather_day
+            weather_days.append(weather_cache[metric_key])
+        weather_cache[cache_key] = np.stack(weather_days)
+        return weather_cache[cache_key]
+
     def _actuate(self, actuator_handle: str, actuator_val):
         """Sets value of a specific actuator in running simulation, or relinquishes control back to EnergyPlus."""
 
@@ -467,19 +1773,47 @@ class EmsPy:
         returns control back to EnergyPlus from EMS
         """
         if actuator_setpoint_dict is not None:  # in case some 'actuation functions' does not actually act
+            data_store = self._data_store
+            actuation_plan = self._actuation_plan
+            last_values = self._actuator_last_values
+            coalescing = self.actuator_write_coalescing
+            actuation_row = data_store.length('actuation_time_indexes')
             for actuator_name, actuator_setpoint in actuator_setpoint_dict.items():
-                if actuator_name not in self.tc_actuator:
+                try:
+                    actuator_handle, setpoint_col, change_col = actuation_plan[actuator_name]
+                except KeyError:
                     raise Exception(f'ERROR: Either this actuator [{actuator_name}] is not tracked, or misspelled.'
-                                    f' Check your Actuator ToC.')
+                                    f' Check your Actuator ToC.') from None
+                # skip unchanged values, E+ holds the last value written until changed or reset
+                if coalescing and last_values.get(actuator_handle, _unwritten) == actuator_setpoint:
+                    self.actuator_writes_skipped += 1
+                    continue
                 # actuate and update data tracking
-                actuator_handle = getattr(self, 'handle_actuator_' + actuator_name)
                 self._actuate(actuator_handle, actuator_setpoint)
+                last_values[actuator_handle] = actuator_setpoint
+                self.actuator_writes += 1
                 self._actuators_used_set.add(actuator_name)  # to keep track of what actuators from TC are actually used
-                # update SETPOINT value of actuators
-                getattr(self, 'data_setpoint_' + actuator_name).append(actuator_setpoint)
+                # update SETPOINT value of actuators as a change, NaN when control is relinquished
+                data_store.append_at(setpoint_col, np.nan if actuator_setpoint is None else actuator_setpoint)
+                data_store.append_at(change_col, actuation_row)
+            data_store.append('actuation_time_indexes', data_store.length('time_x') - 1)
         else:
-            print(f'\n*NOTE: No actuators/values defined for actuation function at calling point [{calling_point}],'
-                  f' timestep [{self.timestep_zone_num_current}]\n')
+            self._log_event('no_actuation', logging.INFO, '*NOTE: No actuators/values defined for actuation function '
+                            'at calling point [%s], timestep [%s]', calling_point, self.timestep_zone_num_current)
+
+    def _get_setpoint_data(self, setpoint_name: str) -> np.ndarray:
+        """
+        Expands the run-length encoded changes of an actuator setpoint into its (dense) setpoint at each actuation, from
+        the first time it was set. See the 'actuation_time_indexes' data column for the state update row of each.
+
+        :param setpoint_name: 'setpoint_' + actuator name
+        """
+        data_store = self._data_store
+        setpoints = data_store.get(setpoint_name)
+        # actuation rows discarded by a data sink flush are negative, clip to the first row kept
+        change_rows = np.maximum(data_store.get('setpoint_changes_' + setpoint_name[len('setpoint_'):]), 0)
+        run_lengths = np.diff(change_rows, append=data_store.length('actuation_time_indexes'))
+        return np.repeat(setpoints, run_lengths)
 
     def _enclosing_callback(self, calling_point: str, observation_fxn, actuation_fxn,
                             update_state: bool = False,
@@ -497,6 +1831,19 @@ class EmsPy:
         :param update_state_freq: the number of zone timesteps per updating the simulation state
         :param update_act_freq: the number of zone timesteps per updating the actuators from the actuation function
         """
+        calling_point_code = self.available_calling_points.index(calling_point)  # stored as int code
+        # optional timing instrumentation, see BcaEnv.init_callback_timing()
+        timing = self.callback_timing
+        clock = time.perf_counter if timing is not None else float  # float() is a 0.0 no-op clock
+        nan = np.nan
+        # optional replay buffer, fed only at its own calling point, see BcaEnv.init_replay_buffer()
+        replay_feed = self._replay_feed
+        if replay_feed is not None and replay_feed['calling_point'] != calling_point:
+            replay_feed = None
+        # optional sub-timestep dedup, see set_callback_dedup()
+        dedup = self.callback_dedup.get(calling_point)
+        last_firing = None  # (day, hour, zone timestep num, system time) of previous firing
+        firing_lengths = None  # data lengths before the first firing of the current zone & system timestep
 
         def _callback_function(state_arg):
             """
@@ -504,6 +1851,9 @@ class EmsPy:
 
             :param state_arg: NOT USED by this API - passed to and used internally by EnergyPlus simulation
             """
+            nonlocal last_firing, firing_lengths
+            t_entry = clock()
+            self._current_calling_point = calling_point
             # get EMS handles ONCE
             if not self.got_ems_handles:
                 # verify ems objects are ready for access, skip until
@@ -514,37 +1864,58 @@ class EmsPy:
 
             # skip if simulation in WARMUP
             if self.api.exchange.warmup_flag(state_arg):
+                if timing is not None:
+                    timing.last_exit = clock()  # warmup is attributed to E+
                 return
 
             # init Timestep params ONCE, after warmup and EMS handles
             if not self.timestep_params_initialized:
+                if self._fork_episodes is not None:
+                    self._fork_episodes_from_here()  # only returns in forked episode processes
                 self._init_timestep()
 
             # get current timestep for update frequency
             self.timestep_zone_num_current = self.api.exchange.zone_time_step_number(state_arg)
-            current_timestep = self.timestep_zone_num_current  # preserve for callback # TODO implement
 
-            # TODO verify this is proper way to prevent sub-timestep callbacks, make seperate function
-            # FAIL with multiple CPs since they share timesteps
-            # catch and skip sub-timestep callbacks, when the timestep num is the same as before
-            try:
-                if self.timesteps_zone_num[-1] == self.timestep_zone_num_current:
-                    # verify with (timestep/hr) * (24 hrs) * (# of days of sim) == data/df length
-                    # print('-- Sub-Timestep Callback --')
-                    # return  # skip callback
-                    pass
-            except IndexError:
-                pass  # catch first iter when no data available
+            # catch sub-timestep callbacks, repeated firings of this calling point in the same zone & system timestep
+            repeat_firing = False
+            if dedup is not None:
+                datax = self.api.exchange
+                firing = (datax.day_of_month(state_arg), datax.hour(state_arg), self.timestep_zone_num_current,
+                          datax.actual_time(state_arg))  # actual time includes system time elapsed
+                repeat_firing = firing == last_firing
+                last_firing = firing
+                if repeat_firing:
+                    self.callback_dedup_counts[calling_point] += 1
+                    if dedup == 'first':
+                        if timing is not None:
+                            timing.last_exit = clock()
+                        return  # skip callback
+                    self._discard_data_since(firing_lengths)  # latest only, replaces the previous firing's data
+                elif dedup == 'latest':
+                    firing_lengths = self._get_data_lengths()
+
+            # stage durations, NaN if not ran
+            update_time_s = sampling_s = observation_s = actuation_s = nan
+            state_updated = False
+            reward = None
 
             # state update & observation (optionally)
             if update_state and self.timestep_zone_num_current % update_state_freq == 0:
+                state_updated = True
                 # update & append simulation data
+                t_start = clock()
                 self._update_time()  # note timing update is first
-                self._update_ems_and_weather_vals(self.ems_names_master_list)  # update sensor/actuator/weather/ vals
-                self.callback_calling_points.append(calling_point)
+                t_end = clock()
+                update_time_s = t_end - t_start
+                self._run_sampling_plan(self._sampling_plans[calling_point])  # update sensor/actuator/weather/ vals
+                self._data_store.append('callback_calling_points', calling_point_code)
+                t_start = clock()
+                sampling_s = t_start - t_end
                 # run user-defined agent state update function
                 if observation_fxn is not None:
                     reward = observation_fxn()  # execute user's state/reward observation
+                    observation_s = clock() - t_start
                     if reward is not None:  # reward returned
                         if not self.rewards_created:
                             self._init_reward(reward)
@@ -552,20 +1923,95 @@ class EmsPy:
 
             # action update
             if actuation_fxn is not None and self.timestep_zone_num_current % update_act_freq == 0:
-                self._actuate_from_list(calling_point, actuation_fxn())
+                actuator_setpoint_dict = None
+                t_start = clock()
+                if self._rollout is None:
+                    try:
+                        actuator_setpoint_dict = actuation_fxn()
+                    except _RolloutBranch:
+                        pass  # forked into a rollout branch, see BcaEnv.fork_rollouts()
+                if self._rollout is not None:  # rollout branch, replay its candidate actions instead
+                    actuator_setpoint_dict = self._next_rollout_action(calling_point)
+                actuation_s = clock() - t_start
+                self._actuate_from_list(calling_point, actuator_setpoint_dict)
+
+            # transition of previous state & action into this state
+            if replay_feed is not None and state_updated and not repeat_firing:
+                self._feed_replay_buffer(replay_feed, reward)
 
             # init and update CUSTOM dataframes
+            t_start = clock()
             if not self.custom_dataframes_initialized:
-                self._init_custom_dataframe_dict()
+                self._compile_custom_dataframes()
                 self.custom_dataframes_initialized = True
-            self._update_custom_dataframe_dicts(calling_point)
+            self._update_custom_dataframes(calling_point)
+            custom_df_s = clock() - t_start
+
+            # stream full chunk of data to sink, bounding memory
+            if self.data_sink is not None and \
+                    self._data_store.length('time_x') - self._data_sink_pending_start >= self.data_sink_chunk_size:
+                self._flush_data_sink()
 
             # update callback count data
             self.callback_current_count += 1
-            self.callbacks_count.append(self.callback_current_count)
+            self._data_store.append('callbacks_count', self.callback_current_count)
+
+            if timing is not None:
+                timing.record(calling_point_code, t_entry, clock(), update_time_s, sampling_s, observation_s,
+                              actuation_s, custom_df_s)
 
         return _callback_function
 
+    def _get_data_lengths(self) -> tuple:
+        """Returns the current lengths of all data store columns and custom dataframes, see _discard_data_since()."""
+
+        custom_lengths = {df_name: len(frame) for df_name, frame in self._custom_frames.items()}
+        return list(self._data_store.lengths), custom_lengths
+
+    def _discard_data_since(self, data_lengths: tuple):
+        """
+        Discards all data stored since the given data lengths were taken, used by the 'latest' callback dedup mode.
+
+        :param data_lengths: data store column and custom dataframe lengths, from _get_data_lengths()
+        """
+        store_lengths, custom_lengths = data_lengths
+        lengths = self._data_store.lengths
+        self._actuator_last_values.clear()  # discarded setpoint changes are written & stored again
+        if self._reward_col is not None:  # running totals exclude discarded rewards
+            reward_start = store_lengths[self._reward_col] if self._reward_col < len(store_lengths) else 0
+            if lengths[self._reward_col] > reward_start:
+                self.reward_totals -= self._data_store.arrays[self._reward_col][
+                                      reward_start:lengths[self._reward_col]].sum(axis=0)
+        for col, length in enumerate(lengths):
+            # columns created since start empty, lengths only shrink in case of a data sink flush since
+            lengths[col] = min(length, store_lengths[col] if col < len(store_lengths) else 0)
+        for df_name, frame in self._custom_frames.items():
+            frame.truncate(custom_lengths.get(df_name, 0))
+
+    def _feed_replay_buffer(self, replay_feed: dict, reward):
+        """
+        Inserts the transition from the previous state update to the current one into the replay buffer, gathering the
+        observation and last actuator setpoints directly from the data store columns.
+
+        :param replay_feed: replay buffer feed setup, see BcaEnv.init_replay_buffer()
+        :param reward: reward returned by the observation function this callback, NaN if None
+        """
+        arrays, lengths = self._data_store.arrays, self._data_store.lengths
+        obs, action = replay_feed['obs'], replay_feed['action']
+        for i, column in enumerate(replay_feed['obs_columns']):
+            length = lengths[column]
+            obs[i] = arrays[column][length - 1] if length else np.nan
+        if replay_feed['has_prev']:
+            self.replay_buffer.add(replay_feed['prev_obs'], replay_feed['prev_action'],
+                                   np.nan if reward is None else reward, obs)
+        # action taken from this state, actuators never actuated are NaN
+        for i, column in enumerate(replay_feed['action_columns']):
+            length = lengths[column]
+            action[i] = arrays[column][length - 1] if length else np.nan
+        replay_feed['prev_obs'][:] = obs
+        replay_feed['prev_action'][:] = action
+        replay_feed['has_prev'] = True
+
     def _init_calling_points_and_callback_functions(self):
         """This iterates through the Calling Point Dict{} to set runtime calling points with actuation functions."""
 
@@ -589,10 +2035,10 @@ class EmsPy:
                 # report message summary to user
                 actuation_msg = 'Yes' if actuation_fxn is not None else 'No'
                 observation_msg = 'Yes' if observation_fxn is not None else 'No'
-                print(f'\n*NOTE: Callback Function Summary: Calling Point [{calling_key}]\n'
-                      f'       Actuation: [{actuation_msg}], Observation: [{observation_msg}], '
-                      f'State Update: [{update_state}], State Update Freq: [{update_state_freq}], '
-                      f'Action Update Freq: [{update_act_freq}]')
+                logger.info(f'*NOTE: Callback Function Summary: Calling Point [{calling_key}]\n'
+                            f'       Actuation: [{actuation_msg}], Observation: [{observation_msg}], '
+                            f'State Update: [{update_state}], State Update Freq: [{update_state_freq}], '
+                            f'Action Update Freq: [{update_act_freq}]')
 
     def _create_default_dataframes(self):
         """Creates default dataframes for each EMS data list, for each EMS category (and rewards if included in sim)."""
@@ -600,111 +2046,146 @@ class EmsPy:
         if not self.ems_num_dict:
             return  # no ems dicts created, very unlikely
         for ems_type in self.ems_num_dict:
-            ems_df_dict = {'Datetime': self.time_x, 'Timestep': self.timesteps_zone_num,
-                           'Calling Point': self.callback_calling_points}  # index columns
-            for ems_name in getattr(self, 'tc_' + ems_type):
-                ems_data_list_name = 'data_' + ems_type + '_' + ems_name
-                try:
-                    ems_df_dict[ems_name] = getattr(self, ems_data_list_name)
-                except AttributeError:
-                    pass  # ignore unused actuators
-            # create default df
-            df_name = 'df_' + ems_type
-            setattr(self, df_name, pd.DataFrame.from_dict(ems_df_dict))
+            setattr(self, 'df_' + ems_type, self._build_default_df(ems_type))
 
         # manage rewards separately, since not standard EMS metrics
-        if self.rewards:
-            col_names = ['reward']  # single reward
-            if self.rewards_multi:
-                col_names = []
-                for n in range(self.rewards_cnt):
-                    col_names.append('reward' + str(n + 1))
-            self.df_reward = pd.DataFrame(self.rewards, columns=col_names)
-            # self.df_reward = self.df_reward.dropna()  # drop NA vals # TODO figure out why these are here at the start
-            # add times to df  # TODO issue with multi obj reward
-            self.df_reward['Datetime'] = self.time_x
-            self.df_reward['Timestep'] = self.timesteps_zone_num
-            self.df_reward['Calling Point'] = self.callback_calling_points
-
-    def _init_custom_dataframe_dict(self):
-        """Initializes custom EMS metric dataframes attributes at specific calling points & frequencies."""
-
-        # add to dataframe  to fetch & track data during sim
-        for df_name in self.df_custom_dict:
-            ems_metrics, calling_point, update_freq = self.df_custom_dict[df_name]
-            self.df_count += 1
+        if len(self.rewards):
+            self.df_reward = self._build_reward_df(self.rewards)
+
+    def _build_default_df(self, ems_type: str, start: int = 0) -> pd.DataFrame:
+        """Builds the default dataframe of an EMS type from data store rows [start:], zero-copy views of data."""
+
+        data_store = self._data_store
+        calling_points = self.callback_calling_points
+        ems_df_dict = {'Datetime': data_store.get('time_x')[start:],
+                       'Timestep': data_store.get('timesteps_zone_num')[start:],
+                       'Calling Point': calling_points[start:]}  # index columns
+        for ems_name in getattr(self, 'tc_' + ems_type):
+            if ems_name in data_store:  # ignore unused actuators
+                ems_df_dict[ems_name] = self._get_dense_data(ems_name, start)
+        return pd.DataFrame(ems_df_dict, copy=False)
+
+    def _get_dense_data(self, ems_name: str, start: int = 0) -> np.ndarray:
+        """
+        Returns the data of a metric at each state update [start:], a view unless it has a sampling period, in which
+        case its samples are expanded by their time indexes with NaN where not sampled.
+        """
+        data_store = self._data_store
+        index_column = self._sample_index_columns.get(ems_name)
+        if index_column is None:
+            return data_store.get(ems_name)[start:]
+        dense = np.full(data_store.length('time_x') - start, np.nan)
+        time_indexes = data_store.get(index_column)
+        in_range = time_indexes >= start
+        dense[time_indexes[in_range] - start] = data_store.get(ems_name)[in_range]
+        return dense
+
+    def _build_reward_df(self, rewards: np.ndarray) -> pd.DataFrame:
+        """Builds the reward dataframe of given rewards, aligned to the most recent state update times."""
+
+        col_names = ['reward']  # single reward
+        if self.rewards_multi:
+            col_names = []
+            for n in range(self.rewards_cnt):
+                col_names.append('reward' + str(n + 1))
+        df_reward = pd.DataFrame(rewards, columns=col_names, copy=False)
+        # add times to df  # TODO issue with multi obj reward
+        start = self._data_store.length('time_x') - len(rewards)
+        df_reward['Datetime'] = self._data_store.get('time_x')[start:]
+        df_reward['Timestep'] = self._data_store.get('timesteps_zone_num')[start:]
+        df_reward['Calling Point'] = self.callback_calling_points[start:]
+        return df_reward
+
+    def _flush_data_sink(self):
+        """Streams all data not yet flushed to the data sink, then discards all but the recent history from memory."""
+
+        data_sink = self.data_sink
+        start = self._data_sink_pending_start
+        # default dfs, all EMS types of ToC since unused actuators are not yet known
+        for ems_type in self.ems_num_dict:
+            data_sink.write(ems_type, self._build_default_df(ems_type, start))
+        if len(self.rewards):
+            data_sink.write('reward', self._build_reward_df(self.rewards[self._data_sink_rewards_pending_start:]))
+        # custom dfs, flushed entirely
+        for df_name, frame in self._custom_frames.items():
+            data_sink.write(df_name, frame.to_df())
+            frame.clear()
+
+        # keep recent history in memory for agent state lookups, all of which has been flushed
+        keep = self.data_sink_keep_history
+        data_store = self._data_store
+        indexed_lengths = {column: data_store.length(column) for column in set(self._row_index_columns.values())}
+        data_store.discard_head(keep)  # rewards included
+        for index_column, indexed_column in self._row_index_columns.items():  # row indexes of the rows kept
+            if index_column in data_store:
+                data_store.get(index_column)[:] -= indexed_lengths[indexed_column] - data_store.length(indexed_column)
+        self._data_sink_pending_start = min(keep, self._data_store.length('time_x'))
+        self._data_sink_rewards_pending_start = len(self.rewards)
+
+    def _compile_custom_dataframes(self):
+        """
+        Compiles each custom dataframe into a collector of its source data store columns, see EmsCustomFrame.
+
+        Done once per run at the first callback, after the first reward (if any) is known, since column indexes of
+        rewards and restored unused actuators are only known then.
+        """
+        data_store = self._data_store
+        column_index = data_store.column_index
+        self._custom_frames = {}
+        self._custom_frames_by_cp = {}
+        for df_name, (ems_metrics, calling_point, update_freq) in self.df_custom_dict.items():
             if calling_point not in self.calling_point_actuation_dict:
                 raise Exception(f'ERROR: Invalid Calling Point name [{calling_point}].\nSee your declared available'
                                 f' calling points {self.calling_point_actuation_dict.keys()}.')
             # metric names must align with the EMS metric names assigned in var, intvar, meters, actuators, weather ToC
-            ems_custom_dict = {'Datetime': [], 'Timestep': []}
-            # handle reward tracking
-            if self.rewards:
-                is_reward = 'rewards'
-            else:
-                is_reward = ''
+            column_names = []
+            sources = []  # (data store column index, reward objective index or None)
             for metric in ems_metrics:
                 # verify proper input
-                if metric not in self.ems_names_master_list + [is_reward]:
+                if metric == 'rewards' and self._reward_col is not None:
+                    if self.rewards_multi:  # multiple reward, reward#, 1-n
+                        column_names += ['reward' + str(i + 1) for i in range(self.rewards_cnt)]
+                    else:
+                        column_names.append(metric)
+                    sources += [(self._reward_col, i) for i in range(self.rewards_cnt)]
+                    continue
+                if metric not in self.ems_names_master_list:
                     raise Exception(f'ERROR: Incorrect EMS metric name, [{metric}], was entered for custom '
                                     f'dataframes.')
                 # unused actuators
                 if metric in self.tc_actuator and metric not in self._actuators_used_set:
                     raise Exception('ERROR: The EMS actuator [{metric}] was not by user and has no data to track.')
-                # create dict to collect data for pandas dataframe
-                if metric == 'rewards' and self.rewards_multi:  # multiple reward
-                    for i in range(self.rewards_cnt):
-                        metric = 'reward' + str(i + 1)  # reward#, 1-n
-                        ems_custom_dict[metric] = []
-                else:
-                    ems_custom_dict[metric] = []  # single reward, all else EMS
-            # update custom df tracking list
-            self.df_custom_dict[df_name][0] = ems_custom_dict
-
-    def _update_custom_dataframe_dicts(self, calling_point):
-        """Updates dataframe data based on desired calling point, timestep frequency, and specific ems vars."""
-
-        # TODO handle redundant data collection when cp & freq are identical to default (may not always be applicable)
-        if not self.df_custom_dict:
-            return  # no custom dicts created
-        # iterate through and update all default and user-defined dataframes
-        for df_name in self.df_custom_dict:
-            ems_dict, cp, update_freq = self.df_custom_dict[df_name]  # unpack value
-            if cp is calling_point and self.timestep_zone_num_current % update_freq == 0:
-                reward_index = 0  # TODO make independent of perfect order of reward, make robust to reward name int
-                for ems_name in ems_dict:
-                    # get most recent data point
-                    if ems_name is 'Datetime':
-                        data_i = self.time_x[-1]
-                    elif ems_name is 'Timestep':
-                        data_i = self.timesteps_zone_num[-1]
-                    elif 'reward' in ems_name:
-                        if self.rewards_multi:
-                            data_i = self.rewards[-1][reward_index]  # extra ith reward of most recent reward
-                            reward_index += 1
-                        else:
-                            data_i = self.rewards[-1]
-                    else:
-                        # normal ems types
-                        ems_type = self.get_ems_type(ems_name)
-                        if ems_type == 'setpoint':  # actuator setpoints
-                            data_list_name = 'data_' + ems_name  # setpoint is redundant, user must input themselves
-                        else:  # all other
-                            data_list_name = 'data_' + ems_type + '_' + ems_name
-                        data_i = getattr(self, data_list_name)[-1]
-
-                    # append to dict list
-                    self.df_custom_dict[df_name][0][ems_name].append(data_i)
+                if not np.issubdtype(data_store.arrays[column_index[metric]].dtype, np.number):
+                    raise Exception(f'ERROR: The metric [{metric}] is not numeric, custom dataframes already include '
+                                    f'the \'Datetime\' of each row.')
+                column_names.append(metric)
+                sources.append((column_index[metric], None))
+            frame = EmsCustomFrame(column_names, sources, -(-data_store.capacity // update_freq))
+            self._custom_frames[df_name] = frame
+            self._custom_frames_by_cp.setdefault(calling_point, []).append((update_freq, frame))
+
+    def _update_custom_dataframes(self, calling_point: str):
+        """Appends a row to each custom dataframe due at the given calling point and timestep frequency."""
+
+        frames = self._custom_frames_by_cp.get(calling_point)
+        if not frames:
+            return  # no custom dfs at this calling point
+        data_store = self._data_store
+        time_col = data_store.column_index['time_x']
+        timestep_col = data_store.column_index['timesteps_zone_num']
+        timestep = self.timestep_zone_num_current
+        for update_freq, frame in frames:
+            if timestep % update_freq == 0:
+                frame.update(data_store, time_col, timestep_col)
 
     def _create_custom_dataframes(self):
         """Creates custom dataframes for specifically tracked ems data list, for each ems category."""
 
         if not self.df_custom_dict:
-            print('*NOTE: No custom dataframes created.')
+            logger.info('*NOTE: No custom dataframes created.')
             return  # no ems dicts created
-        for df_name in self.df_custom_dict:
-            ems_dict, _, _ = self.df_custom_dict[df_name]
-            setattr(self, df_name, pd.DataFrame.from_dict(ems_dict))
+        for df_name, frame in self._custom_frames.items():
+            setattr(self, df_name, frame.to_df())
 
     def get_ems_type(self, ems_metric: str):
         """ Returns EMS (var, intvar, meter, actuator, weather) or time type string for a given ems metric variable."""
@@ -719,10 +2200,10 @@ class EmsPy:
             unused_actuators = []
             for actuator_name in self.tc_actuator:
                 if actuator_name not in self._actuators_used_set:
-                    print(f"*NOTE: The actuator [{actuator_name}] was not used by EMS to actuator. Their EMS tracked "
-                          f"null data attributes will be removed.")
+                    logger.info(f"*NOTE: The actuator [{actuator_name}] was not used by EMS to actuator. Their EMS "
+                                f"tracked null data attributes will be removed.")
                     # remove their data attributes
-                    delattr(self, 'data_actuator_' + actuator_name)
+                    self._data_store.remove_column(actuator_name)
                     unused_actuators.append(actuator_name)
             # update EMS number dictionary - relates to default DF creation,
             original_num = self.ems_num_dict['actuator']
@@ -731,18 +2212,28 @@ class EmsPy:
             # report to user
             if updated_num == 0:  # last actuator left
                 self.ems_num_dict.pop('actuator')
-                print(f'*NOTE: No EMS actuators of [{original_num}] were used, all have been removed from your '
-                      f'simulation object.')
+                logger.info(f'*NOTE: No EMS actuators of [{original_num}] were used, all have been removed from '
+                            f'your simulation object.')
             else:
                 self.ems_num_dict['actuator'] = updated_num
-                print(f'*NOTE: [{updated_num}] of [{original_num}] actuators were used in this simulation.')
+                logger.info(f'*NOTE: [{updated_num}] of [{original_num}] actuators were used in this simulation.')
 
     def _user_input_check(self):
         # TODO create function that checks if all user-input attributes has been specified and add help directions
 
         if not self.calling_point_actuation_dict:
-            print('\n*WARNING: No calling points or callback actuation/observation functions were initialized.'
-                  'Will just run simulation!\n')
+            logger.warning('*WARNING: No calling points or callback actuation/observation functions were '
+                           'initialized. Will just run simulation!')
+        # reject ToC entries already known to be invalid for this model, before simulation starts
+        if self.handle_cache is not None:
+            for ems_type in ['var', 'intvar', 'meter', 'actuator']:
+                ems_tc = getattr(self, 'tc_' + ems_type)
+                if ems_tc is not None:
+                    for name, handle_inputs in ems_tc.items():
+                        if self.handle_cache.get(ems_type, handle_inputs) == -1:
+                            raise Exception(f'ERROR: [{name}: {str(handle_inputs)}]: The EMS sensor/actuator handle '
+                                            f'could not be found in a prior run of this model. Please consult the '
+                                            f'.idf and/or your ToC for accuracy')
 
     def _new_state(self):
         """Creates & returns a new state instance that's required to pass into EnergyPlus Runtime API function calls."""
@@ -759,29 +2250,114 @@ class EmsPy:
 
         self.api.state_manager.delete_state(self.state)
 
-    def run_simulation(self, weather_file: str):
-        """This runs the EnergyPlus simulation and RL experiment."""
+    def _reset_run_data(self):
+        """Clears all data collected during a simulation run, so that the same instance can be ran again."""
+
+        # data store, restore columns of unused actuators removed in post-processing
+        data_store = self._data_store
+        data_store.clear()
+        for column in self._data_attr_dict.values():
+            if column not in data_store:
+                data_store.add_column(column)
+                data_store.set_column_period(column, self.sampling_periods.get(column, 1))
+        if self.tc_actuator:
+            self.ems_num_dict['actuator'] = len(self.tc_actuator)
+        self._actuators_used_set.clear()
+        self._actuator_last_values.clear()
+        self.actuator_writes = 0
+        self.actuator_writes_skipped = 0
+        # handles & static vars, fetched again for new state
+        self.got_ems_handles = False
+        self.static_vars_obtained = False
+        self._static_vars_dict.clear()
+        # timing & callbacks
+        self.timestep_zone_num_current = 0
+        self.timestep_total_count = 0
+        self.callback_current_count = 0
+        self._weather_forecast_day = None
+        self._weather_forecast_cache.clear()
+        # rewards
+        self.rewards_created = False
+        self.rewards_multi = False
+        self.reward_current = None
+        self.rewards_cnt = None
+        self.reward_totals = None
+        self._reward_col = None  # column emptied with the data store, re-linked by the first reward
+        # custom dataframes, compiled again at the first callback since column indexes may change
+        self.custom_dataframes_initialized = False
+        self._custom_frames = {}
+        self._custom_frames_by_cp = {}
+        self.simulation_success = 1
+        self.log_event_counts = {}
+        if self.callback_timing is not None:
+            self.callback_timing.clear()
+        self.callback_dedup_counts = dict.fromkeys(self.callback_dedup, 0)
+        if self._replay_feed is not None:
+            self._replay_feed['has_prev'] = False  # buffer keeps transitions across runs, new episode starts
+        self._data_sink_pending_start = 0
+        self._data_sink_rewards_pending_start = 0
+
+    def _run_sizing_simulation(self, idf_file: str, weather_file: str, output_dir: str) -> int:
+        """Runs a simulation on its own E+ state, without callbacks, see EmsSizingCache."""
+
+        sizing_state = self.api.state_manager.new_state()
+        try:
+            return self.api.runtime.run_energyplus(sizing_state, ['-w', weather_file, '-d', output_dir, idf_file])
+        finally:
+            self.api.state_manager.delete_state(sizing_state)
+
+    def run_simulation(self, weather_file: str, output_dir: str = 'out'):
+        """
+        This runs the EnergyPlus simulation and RL experiment.
+
+        :param weather_file: path to the EnergyPlus weather file, .epw
+        :param output_dir: directory EnergyPlus will write its output files to, keep unique for concurrent simulations
+        """
+
+        idf_file = self.idf_file
+        if self.sizing_cache is not None:
+            idf_file = self.sizing_cache.get_sized_idf(self.idf_file, weather_file, self._run_sizing_simulation)
+        if self.handle_cache is not None:
+            self.handle_cache.set_model(idf_file)  # handles of the model ran, the sized variant if swapped in
 
         # check valid input by user
         self._user_input_check()
+        self._df_cache.clear()  # new data
 
         # create callback function(s) and link with calling point(s)
         if self.calling_point_actuation_dict:
             self._init_calling_points_and_callback_functions()
 
+        self._output_dir = output_dir
+
         # RUN SIMULATION
-        print('\n* * * Running E+ Simulation * * *\n')
-        self.simulation_success = self.api.runtime.run_energyplus(self.state, ['-w', weather_file, '-d', 'out', self.idf_file])   # cmd line args
-        if self.simulation_success != 0:
-            print('\n* * * Simulation FAILED * * *\n')
+        logger.info('* * * Running E+ Simulation * * *')
+        self.simulation_success = self.api.runtime.run_energyplus(self.state, ['-w', weather_file, '-d', output_dir,
+                                                                               idf_file])  # cmd line args
+        if self._rollout is not None:  # rollout branch reached end of simulation before its horizon
+            self._exit_forked_process(self._rollout['pipe'], self._get_rollout_result())
+        if self.replay_buffer is not None and self.simulation_success == 0:
+            self.replay_buffer.mark_done()  # end of episode
+        if self.data_sink is not None:
+            # stream leftover data, dataframes are then read back lazily from the sink
+            if self.simulation_success == 0:
+                self._flush_data_sink()
+            self.data_sink.close()
+        if self.simulation_success != 0 and self._step_aborted:
+            logger.info('* * * Simulation Stopped, Step Env Episode Abandoned * * *')
+        elif self.simulation_success != 0:
+            logger.warning('* * * Simulation FAILED * * *')
+        elif self.data_sink is not None:
+            logger.info(f'* * * Simulation Done, Data Streamed to [{self.data_sink.sink_dir}] * * *')
+            self._post_process_data()
         # simulation successful
         else:
-            print('\n* * * Simulation Done * * *')
+            logger.info('* * * Simulation Done * * *')
             self._post_process_data()
             # create default and custom ems pandas df's after simulation complete
             self._create_default_dataframes()
             self._create_custom_dataframes()
-            print('* * * DF Creation Done * * *')
+            logger.info('* * * DF Creation Done * * *')
 
 
 class BcaEnv(EmsPy):
@@ -801,6 +2377,19 @@ class BcaEnv(EmsPy):
         super().__init__(ep_path, ep_idf_to_run, timesteps, tc_vars, tc_intvars, tc_meters, tc_actuator, tc_weather)
         self.ems_list_update_checked = False # TODO get rid off, doesnt work with multiple method instances
 
+        # step env, simulation ran on worker thread handing off observations/actions through bounded queues
+        self.step_env_initialized = False
+        self.step_observation_metrics = []
+        self._step_obs_queue = None
+        self._step_act_queue = None
+        self._step_thread = None
+        self._step_aborted = False
+        self._step_done = True
+        self._step_handoff_time = None  # time observation was handed off, used for latency tracking
+        self._step_timing = EmsDataStore(self._data_store.capacity)
+        self._step_timing.add_column('Agent Wait')  # simulation blocked waiting on agent action
+        self._step_timing.add_column('Simulation Wait')  # agent blocked in step() waiting on simulation
+
     def set_calling_point_and_callback_function(self, calling_point: str,
                                                 observation_fxn,
                                                 actuation_fxn,
@@ -826,7 +2415,7 @@ class BcaEnv(EmsPy):
         """
 
         if update_act_freq > update_state_freq:
-            print(f'\n*WARNING: It is unusual to have your action update more frequent than your state update\n')
+            logger.warning('*WARNING: It is unusual to have your action update more frequent than your state update')
         if calling_point in self.calling_point_actuation_dict:  # overwrite error
             raise Exception(
                 f'ERROR: You have overwritten the calling point \'{calling_point}\'. Keep calling points unique.')
@@ -834,6 +2423,77 @@ class BcaEnv(EmsPy):
             self.calling_point_actuation_dict[calling_point] = [observation_fxn, actuation_fxn, update_state,
                                                                 update_state_freq, update_act_freq]
 
+    def set_sampling_periods(self, sampling_periods: dict):
+        """
+        Sets the sampling period of EMS/weather metrics, so each is only fetched from E+ and stored when due.
+
+        By default every metric is sampled at every state update. Slowly varying metrics (i.e. hourly meters, weather)
+        can instead be sampled once every period, cutting both the E+ exchange calls and memory of wide ToCs. Their
+        samples are stored along with the time index (state update row) at which each was taken, in a shared
+        'sample_indexes_' + period data column per period, and default dataframes show NaN where not sampled. Custom
+        dataframes and get_ems_data() use the most recent sample. Replaces any sampling periods set before, and must
+        be called before the simulation is ran.
+
+        :param sampling_periods: dict of EMS/weather metric name or EMS type ('var', 'intvar', 'meter', 'actuator',
+        'weather') keys and sampling period (minutes) values, rounded to a multiple of the zone timestep. Metric names
+        take precedence over their EMS type, metrics not given are sampled every state update
+        """
+        ems_types = ['var', 'intvar', 'meter', 'actuator', 'weather']
+        for key in sampling_periods:
+            if key not in ems_types and (key not in self.ems_type_dict or self.ems_type_dict[key] not in ems_types):
+                raise Exception(f'ERROR: Invalid sampling period key [{key}], must be an EMS/weather metric name from '
+                                f'your ToCs or one of the EMS types {ems_types}.')
+
+        data_store = self._data_store
+        self.sampling_periods = {}
+        self._sample_index_columns = {}
+        for ems_type in ems_types:
+            for ems_name in (getattr(self, 'tc_' + ems_type) or {}):
+                minutes = sampling_periods.get(ems_name, sampling_periods.get(ems_type))
+                period = 1 if minutes is None else max(int(round(minutes * self.timestep_input / 60)), 1)
+                if period > 1:
+                    index_column = 'sample_indexes_' + str(period)
+                    if index_column not in data_store:
+                        self._add_data_column(index_column, index_column, np.int64)
+                        self._row_index_columns[index_column] = 'time_x'
+                    data_store.set_column_period(index_column, period)
+                    self.sampling_periods[ems_name] = period
+                    self._sample_index_columns[ems_name] = index_column
+                if ems_name in data_store:
+                    data_store.set_column_period(ems_name, period)
+        logger.info(f'*NOTE: [{len(self.sampling_periods)}] EMS/weather metrics are sampled less often than every '
+                    f'state update.')
+
+    def set_callback_dedup(self, mode: str = 'first', calling_points: list = None):
+        """
+        Deduplicates sub-timestep callbacks, repeated firings of a calling point within the same zone & system timestep.
+
+        System level calling points (i.e. 'callback_inside_system_iteration_loop') may fire many times per zone
+        timestep, each otherwise doing a full state update, observation, actuation, and custom dataframe update. A
+        repeated firing is detected by its day, hour, zone timestep num, and actual time, which includes the system
+        time elapsed, so distinct system timesteps are kept. In 'first' mode repeated firings exit early, only the first
+        firing of each system timestep runs. In 'latest' mode every firing runs, but the data stored since the first
+        firing of the system timestep is replaced, so only the latest firing's data is kept (no duplicate rows) while
+        the agent still sees and actuates each iteration. 'latest' assumes no other calling point stores data between
+        repeated firings. Must be called before the simulation is ran.
+
+        :param mode: 'first', 'latest', or None to disable dedup
+        :param calling_points: calling points to dedup, all of EmsPy.sub_timestep_calling_points by default
+        """
+        if mode is not None and mode not in self.callback_dedup_modes:
+            raise Exception(f'ERROR: Invalid callback dedup mode [{mode}], must be one of '
+                            f'{self.callback_dedup_modes} or None.')
+        if calling_points is None:
+            calling_points = self.sub_timestep_calling_points
+        for calling_point in calling_points:
+            if calling_point not in self.available_calling_points:
+                raise Exception(f'ERROR: The calling point [{calling_point}] is not a valid calling point.')
+            if mode is None:
+                self.callback_dedup.pop(calling_point, None)
+            else:
+                self.callback_dedup[calling_point] = mode
+        self.callback_dedup_counts = dict.fromkeys(self.callback_dedup, 0)
+
     def _check_ems_metric_input(self, ems_metric):
         """Verifies user-input of EMS metric/type list is valid."""
 
@@ -891,30 +2551,32 @@ class BcaEnv(EmsPy):
             else:
                 ems_metric_list = list(getattr(self, 'tc_' + ems_metric_list[0]).keys())
 
+        data_store = self._data_store
         for ems_metric in ems_metric_list:
             # verify valid input #TODO do once
             self._check_ems_metric_input(ems_metric)
-            ems_type = self.get_ems_type(ems_metric)  # for attribute variable name
-            # no time index specified, return ALL current data
+            # setpoints are stored as changes, expanded to their value at each actuation
+            if self.ems_type_dict[ems_metric] == 'setpoint':
+                data_array = self._get_setpoint_data(ems_metric)
+            else:
+                data_array = data_store.get(ems_metric)
+            # no time index specified, return ALL current data, view of data store
             if not time_rev_index:
-                return_data_list.append(getattr(self, 'data_' + ems_type + '_' + ems_metric))
+                return_data_list.append(data_array)
             else:
                 return_data_indexed = []
                 # iterate through previous time indexes
                 for time in time_rev_index:
-                    if ems_type is not 'time':
-                        ems_name = 'data_' + ems_type + '_' + ems_metric
-                    else:
-                        ems_name = ems_metric
                     try:
-                        data_indexed = getattr(self, ems_name)[-1 - time]
+                        data_indexed = data_array[-1 - time]
                         # so that a single-element nested list is not returned
                         if single_val:
                             return_data_indexed = data_indexed
                         else:
                             return_data_indexed.append(data_indexed)
                     except IndexError:
-                        print('\n*NOTE: Not enough simulation time elapsed to collect data at specified index.\n')
+                        self._log_event('index_out_of_range', logging.INFO, '*NOTE: Not enough simulation time '
+                                        'elapsed to collect data at specified index.')
                 # no unnecessarily nested lists
                 if single_metric:
                     return return_data_indexed
@@ -932,7 +2594,28 @@ class BcaEnv(EmsPy):
         :param zone_ts: timestep of hour
         """
 
-        return self._get_weather(weather_metrics, when, hour, zone_ts)
+        timesteps = self.timestep_per_hour if self.timestep_per_hour else self.timestep_input
+        if type(weather_metrics) is not list or 'sun_is_up' in [(self.tc_weather or {}).get(w) for w in weather_metrics] \
+                or not (0 <= hour < 24 and 1 <= zone_ts <= timesteps):
+            return self._get_weather(weather_metrics, when, hour, zone_ts)  # current-time only or invalid input
+        # read from cached day forecast
+        weather_data = self._get_weather_day(weather_metrics, when)[:, hour, zone_ts - 1].tolist()
+        return weather_data[0] if len(weather_data) == 1 else weather_data
+
+    def get_weather_forecast_day(self, weather_metrics: list, when: str = 'today') -> np.ndarray:
+        """
+        Fetches an entire day of given weather metrics from today/tomorrow, for all hours and timesteps of the day.
+
+        This is meant for building look-ahead observations, the forecast is cached for the current simulation day so
+        that repeated calls throughout the day do not call the E+ API again.
+
+        :param weather_metrics: list of desired weather metric(s) (1 to all) from weather ToC dict
+        :param when: 'today' or 'tomorrow' relative to current timestep
+        :return: array of weather data, (weather metrics, 24 hours, timesteps per hour), index [metric, hour, ts - 1].
+        The 'sun_is_up' metric is only available for the current time and is returned as NaN
+        """
+
+        return self._get_weather_day(weather_metrics, when)
 
     def update_ems_data(self, ems_metric_list: list, return_data: bool):
         """
@@ -978,9 +2661,207 @@ class BcaEnv(EmsPy):
         :param calling_point: the calling point at which the df should be updated
         :param update_freq: how often data will be posted, it will be posted every X timesteps
         :param ems_metrics: list of EMS metric names, 'setpoint+...', or 'rewards', to store their data points in df
+
+        Each custom df is compiled into the data store column indexes of its metrics at the start of each run, and
+        updated by gathering their most recent samples into a preallocated array, see EmsCustomFrame.
         """
+        for ems_metric in ems_metrics:
+            if ems_metric != 'rewards' and ems_metric not in self.ems_names_master_list:
+                raise Exception(f'ERROR: Incorrect EMS metric name, [{ems_metric}], was entered for custom '
+                                f'dataframes.')
         self.df_count += 1
-        self.df_custom_dict[df_name] = [ems_metrics, calling_point, update_freq]
+        self.df_custom_dict[df_name] = [list(ems_metrics), calling_point, update_freq]
+
+    def init_callback_timing(self, keep_samples: bool = True, **histogram_kwargs):
+        """
+        Enables per-callback timing instrumentation, splitting E+ time from EmsPy bookkeeping and agent time.
+
+        Each callback records its total duration and that of its time update, EMS sampling, observation function,
+        actuation function, and custom dataframe update stages. The time between callbacks is attributed to E+. Must be
+        called before the simulation is ran. See EmsCallbackTiming, get_callback_timing_report(), and
+        get_callback_timing_df().
+
+        :param keep_samples: whether to keep every callback's sample for get_callback_timing_df(), or only histograms
+        :param histogram_kwargs: min_time, max_time, bins_per_decade of histograms, see EmsCallbackTiming
+        """
+        self.callback_timing = EmsCallbackTiming(self.available_calling_points,
+                                                 capacity=self._data_store.capacity if keep_samples else 8760,
+                                                 keep_samples=keep_samples, **histogram_kwargs)
+
+    def init_replay_buffer(self, calling_point: str, observation_metrics: list, action_actuators: list,
+                           capacity: int, reward_dim: int = 1, shared: bool = False,
+                           dtype=np.float32) -> EmsReplayBuffer:
+        """
+        Creates a transition replay buffer fed directly from the callback loop, without building any dataframes.
+
+        At each state update of the given calling point, the transition from the previous state update is inserted:
+        the previous observation, the actuator setpoints then taken, the reward returned by the observation function
+        (NaN if None), and the current observation. The last transition of a successful run is marked done. Must be
+        called before the simulation is ran, the calling point must update the state. See EmsReplayBuffer.
+
+        :param calling_point: the calling point whose state updates make up the transitions
+        :param observation_metrics: list of EMS/timing metric names making up the observation vector, in order
+        :param action_actuators: list of actuator names (from the Actuator ToC) making up the action vector, in order
+        :param capacity: max number of transitions stored, oldest are overwritten once full
+        :param reward_dim: number of reward objectives returned by the observation function
+        :param shared: whether to allocate the buffer in shared memory, see EmsReplayBuffer.share()
+        :param dtype: dtype of observations, actions, and rewards
+        :return: the replay buffer, also available as the replay_buffer attribute
+        """
+        if calling_point not in self.calling_point_actuation_dict:
+            raise Exception(f'ERROR: No callback function was set for calling point [{calling_point}], see '
+                            f'set_calling_point_and_callback_function().')
+        data_store = self._data_store
+        obs_columns = []
+        for ems_metric in observation_metrics:
+            self._check_ems_metric_input(ems_metric)
+            column = data_store.column_index[ems_metric]
+            if not np.issubdtype(data_store.arrays[column].dtype, np.number):
+                raise Exception(f'ERROR: Observation metric [{ems_metric}] is not numeric.')
+            obs_columns.append(column)
+        action_columns = []
+        for actuator_name in action_actuators:
+            if actuator_name not in self.tc_actuator:
+                raise Exception(f'ERROR: Either this actuator [{actuator_name}] is not tracked, or misspelled.'
+                                f' Check your Actuator ToC.')
+            action_columns.append(data_store.column_index['setpoint_' + actuator_name])
+
+        self.replay_buffer = EmsReplayBuffer(capacity, len(obs_columns), len(action_columns), reward_dim, dtype,
+                                             shared)
+        self._replay_feed = {'calling_point': calling_point, 'obs_columns': obs_columns,
+                             'action_columns': action_columns, 'obs': np.empty(len(obs_columns)),
+                             'action': np.empty(len(action_columns)), 'prev_obs': np.empty(len(obs_columns)),
+                             'prev_action': np.empty(len(action_columns)), 'has_prev': False}
+        return self.replay_buffer
+
+    def init_observation_stats(self, observation_metrics: list, stats_file: str = None, freeze: bool = False) \
+            -> EmsRunningStats:
+        """
+        Enables running mean, variance, min, and max of observation metrics, updated as each of their samples is stored.
+
+        Statistics are kept across runs of this instance, and can be saved with save_observation_stats() and reloaded
+        here so later episodes and evaluation runs reuse them. Must be called before the simulation is ran. See
+        EmsRunningStats and get_normalized_observation().
+
+        :param observation_metrics: list of EMS/weather metric names making up the observation vector, in order
+        :param stats_file: optional JSON file of statistics saved before, loaded if it exists
+        :param freeze: whether to stop updating the statistics, i.e. for evaluation runs with loaded statistics
+        :return: the running statistics, also available as the observation_stats attribute
+        """
+        for ems_metric in observation_metrics:
+            self._check_ems_metric_input(ems_metric)
+            if self.ems_type_dict[ems_metric] in ('time', 'setpoint'):
+                raise Exception(f'ERROR: Only EMS & weather metrics can be normalized, not [{ems_metric}].')
+        self.observation_stats = EmsRunningStats(observation_metrics, freeze)
+        if stats_file is not None and os.path.exists(stats_file):
+            self.observation_stats.load(stats_file)
+        return self.observation_stats
+
+    def save_observation_stats(self, stats_file: str):
+        """Writes the running statistics of observation metrics to a JSON file, see init_observation_stats()."""
+
+        if self.observation_stats is None:
+            raise Exception('ERROR: Observation statistics were not enabled, see init_observation_stats().')
+        self.observation_stats.save(stats_file)
+
+    def get_normalized_observation(self, clip: float = None, min_max: bool = False) -> np.ndarray:
+        """
+        Returns the most recent value of each observation metric, normalized by its running statistics.
+
+        :param clip: optional absolute bound of standardized values
+        :param min_max: whether to min-max scale to [0, 1] instead of standardizing to zero mean & unit variance
+        :return: array of normalized observation metrics, in the order given to init_observation_stats()
+        """
+        stats = self.observation_stats
+        if stats is None:
+            raise Exception('ERROR: Observation statistics were not enabled, see init_observation_stats().')
+        data_store = self._data_store
+        values = [data_store.last(ems_metric) if data_store.length(ems_metric) else np.nan
+                  for ems_metric in stats.metric_names]
+        return stats.scale(values) if min_max else stats.normalize(values, clip)
+
+    def get_callback_timing_report(self, log: bool = True) -> str:
+        """Returns (and logs) the callback timing summary report, see init_callback_timing()."""
+
+        if self.callback_timing is None:
+            raise Exception('ERROR: Callback timing was not enabled, see init_callback_timing().')
+        report = self.callback_timing.report()
+        if log:
+            logger.info(report)
+        return report
+
+    def get_callback_timing_df(self, summary: bool = False) -> pd.DataFrame:
+        """
+        Returns the per callback stage durations (s), or the summary per calling point & stage, see
+        init_callback_timing().
+        """
+        if self.callback_timing is None:
+            raise Exception('ERROR: Callback timing was not enabled, see init_callback_timing().')
+        return self.callback_timing.summary() if summary else self.callback_timing.get_df()
+
+    def init_sizing_cache(self, cache_dir: str):
+        """
+        Enables the sizing cache, so sizing is only ran once per (IDF, EPW) pair and later runs use a hard-sized model.
+
+        See EmsSizingCache. The sized model variant is keyed by IDF & EPW content, so any change to either resizes.
+
+        :param cache_dir: directory to write sizing simulation outputs to, can be shared by many models and simulations.
+        Sized model variants are written next to their original model
+        """
+
+        self.sizing_cache = EmsSizingCache(cache_dir, self.ep_path)
+
+    def init_handle_cache(self, cache_file: str):
+        """
+        Enables a persistent EMS handle cache, so repeat runs of the same model skip resolving handles by name.
+
+        Handles are cached by IDF content hash and E+ version, along with ToC entries found to be invalid, which are
+        then rejected before the simulation starts. See EmsHandleCache.
+
+        :param cache_file: path to the JSON cache file, created if it does not exist, can be shared by many models
+        """
+
+        self.handle_cache = EmsHandleCache(cache_file, self.idf_file, self.ep_path)
+
+    def init_data_sink(self, sink_dir: str, chunk_size: int = 4096, keep_history: int = 1,
+                       file_format: str = 'parquet'):
+        """
+        Streams all default and custom dataframe data to Parquet/Arrow files in chunks as the simulation runs.
+
+        Instead of holding all data in memory and creating dataframes after the simulation, every chunk_size state
+        updates the data is written to one file per dataframe (default EMS types, reward, and custom) and discarded
+        from memory, except for the most recent history. get_df() will then read the dataframes back from the files,
+        or use BcaEnv.get_data_sink_reader() to read them lazily, by chunk or column.
+
+        CAUTION: only the most recent keep_history data points remain available to get_ems_data() during runtime.
+        Unused actuators are still included in the streamed actuator dataframe.
+
+        :param sink_dir: directory the dataframe files will be written to
+        :param chunk_size: number of state updates per chunk written, the bound on data held in memory
+        :param keep_history: number of most recent data points to keep in memory after each chunk is written, should
+        be at least the largest time index used with get_ems_data()
+        :param file_format: 'parquet' or 'arrow' (Arrow IPC file format)
+        """
+        if keep_history < 1 or chunk_size < 1:
+            raise ValueError('ERROR: The data sink chunk size and history kept must be at least 1.')
+        self.data_sink = EmsDataSink(sink_dir, file_format)
+        self.data_sink_chunk_size = chunk_size
+        self.data_sink_keep_history = keep_history
+        self._data_store.set_capacity(chunk_size + keep_history)  # no need to presize for entire run period
+
+    def get_data_sink_reader(self) -> EmsDataSinkReader:
+        """Returns a lazy reader of the dataframes streamed by the data sink, see BcaEnv.init_data_sink()."""
+
+        if self.data_sink is None:
+            raise Exception('ERROR: No data sink was initialized, see BcaEnv.init_data_sink().')
+        return EmsDataSinkReader(self.data_sink.sink_dir, self.data_sink.file_format)
+
+    def _get_df_attr(self, df_name: str) -> pd.DataFrame:
+        """Returns a default (by EMS type) or custom dataframe, read back from the data sink if streamed."""
+
+        if self.data_sink is not None:
+            return self.get_data_sink_reader().get_df(df_name)
+        return getattr(self, df_name if df_name in self.df_custom_dict else 'df_' + df_name)
 
     def get_df(self, df_names: list=[], to_csv_file: str=''):
         """
@@ -999,50 +2880,682 @@ class BcaEnv(EmsPy):
             raise Exception('ERROR: Simulation must be run successfully first to fetch data. See EnergyPlus error file,'
                             ' eplusout.err')
 
-        all_df = pd.DataFrame()  # merge all into 1 df
-        return_df = {}
+        df_names = list(df_names)  # do not modify user's list
+        cache_key = tuple(df_names)
+        return_df = self._df_cache.get(cache_key)
+        if return_df is None:
+            return_df = self._build_return_dfs(df_names)
+            self._df_cache[cache_key] = return_df
+        if to_csv_file:
+            return_df['all'].to_csv(to_csv_file, index=False)
+        return {df_name: df.copy() for df_name, df in return_df.items()}  # cached dfs are not modified by caller
+
+    def _build_return_dfs(self, df_names: list) -> dict:
+        """Collects the selected default & custom dataframes and assembles them into one complete 'all' dataframe."""
+
+        index_cols = ['Datetime', 'Timestep', 'Calling Point']
+        default_dfs = {}
+        custom_dfs = {}
         # handle DEFAULT dfs
-        if self.rewards:  # add reward to iterator if applicable
+        if len(self.rewards):  # add reward to iterator if applicable
             df_default_names = list(self.ems_num_dict.keys()) + ['reward']
         else:
             df_default_names = self.ems_num_dict.keys()
         for df_name in df_default_names:  # iterate thru available EMS types
             if df_name in df_names or not df_names:  # specific or ALL dfs
-                df = (getattr(self, 'df_' + df_name))
-                return_df[df_name] = df
-                # create complete DF of all default vars with only 1 set of time/index columns
-                if all_df.empty:
-                    all_df = df.copy(deep=True)
-                else:
-                    all_df = pd.merge(all_df, df, on=['Datetime', 'Timestep', 'Calling Point'])  # TODO causes issue
+                default_dfs[df_name] = self._get_df_attr(df_name)
                 if df_name in df_names:
                     df_names.remove(df_name)
-
         # handle CUSTOM dfs
         for df_name in self.df_custom_dict:
             if df_name in df_names or not df_names:
-                df = (getattr(self, df_name))
-                return_df[df_name] = df
-                if all_df.empty:
-                    all_df = df.copy(deep=True)
-                else:  # TODO verify robustness of merging of custom df with default, can it be compressed for same time indexes
-                    all_df = pd.concat([all_df, df], axis=1)
-                    # TODO determine why custom dfs do not add to all_df well, num of indexes is wrong
+                custom_dfs[df_name] = self._get_df_attr(df_name)
                 if df_name in df_names:
                     df_names.remove(df_name)
         # leftover dfs not fetched and returned
         if df_names:
             raise ValueError(f'ERROR: Either dataframe custom name or default type: {df_names} is not valid or was not'
                              ' collected during simulation.')
-        else:
-            if to_csv_file:
-                all_df.to_csv(to_csv_file, index=False)
-            return_df['all'] = all_df
-            return return_df
 
-    def run_env(self, weather_file: str):
-        self.run_simulation(weather_file)
-        pass
+        # default dfs share the same time/index columns row for row, so only 1 set of index columns is needed
+        all_df = pd.DataFrame()
+        aligned_dfs = []
+        if default_dfs:
+            aligned_len = len(next(iter(default_dfs.values())))
+            aligned_dfs = [df for df in default_dfs.values() if len(df) == aligned_len]
+            all_df = pd.concat([aligned_dfs[0][index_cols]] + [df.drop(columns=index_cols) for df in aligned_dfs],
+                               axis=1)
+        # default dfs of differing length (i.e. rewards not returned every state update) and custom dfs, align by time
+        other_dfs = [(df_name, df) for df_name, df in default_dfs.items() if not any(df is d for d in aligned_dfs)]
+        other_dfs += list(custom_dfs.items())
+        for df_name, df in other_dfs:
+            df = df.drop(columns=[col for col in ('Timestep', 'Calling Point') if col in df.columns])
+            if all_df.empty:
+                all_df = df.copy()
+                continue
+            # as-of join, each row takes the most recent data point at or before its time. Both sides must be sorted by
+            # time, which is not always increasing (i.e. design days ran before the run period), so join in stable
+            # time order and restore the original row order after
+            df = df.astype({'Datetime': all_df['Datetime'].dtype}).sort_values('Datetime', kind='stable')
+            row_order = np.argsort(all_df['Datetime'].to_numpy(), kind='stable')
+            all_df = pd.merge_asof(all_df.iloc[row_order], df, on='Datetime', suffixes=('', '_' + df_name))
+            all_df.index = row_order
+            all_df = all_df.sort_index()
+
+        return_df = dict(default_dfs, **custom_dfs)
+        return_df['all'] = all_df
+        return return_df
+
+    def run_env(self, weather_file: str, output_dir: str = 'out'):
+        """See EmsPy.run_simulation() documentation."""
+
+        self.run_simulation(weather_file, output_dir)
+
+    def init_step_env(self, calling_point: str, observation_metrics: list, reward_fxn=None,
+                      update_state_freq: int = 1, update_act_freq: int = 1):
+        """
+        Sets up the Gym-style step environment, where the agent drives the simulation with reset() and step(action).
+
+        The simulation is ran on a worker thread and, at the given calling point, its callback hands off the current
+        observation and reward through a bounded queue and blocks until the agent's action is returned by step(). This
+        replaces implementing the agent within observation/actuation functions.
+
+        :param calling_point: the calling point at which observations are handed off and actions are taken
+        :param observation_metrics: list of EMS/timing metric names making up the observation vector, in order
+        :param reward_fxn: optional function taking no arguments and returning the scalar or multi-obj reward, called
+        after each state update, same as an observation function
+        :param update_state_freq: the number of zone timesteps per updating the simulation state
+        :param update_act_freq: the number of zone timesteps per observation handoff & action, i.e. per step
+        """
+        for ems_metric in observation_metrics:
+            self._check_ems_metric_input(ems_metric)
+        self.step_observation_metrics = list(observation_metrics)
+        self.set_calling_point_and_callback_function(calling_point, reward_fxn, self._step_handoff, True,
+                                                     update_state_freq, update_act_freq)
+        # bounded, at most one observation or action is ever in flight
+        self._step_obs_queue = queue.Queue(maxsize=1)
+        self._step_act_queue = queue.Queue(maxsize=1)
+        self.step_env_initialized = True
+
+    def _get_step_observation(self) -> np.ndarray:
+        """Returns the most recent observation vector of the step env observation metrics."""
+
+        data_store = self._data_store
+        return np.array([data_store.last(ems_metric) for ems_metric in self.step_observation_metrics])
+
+    def _step_handoff(self):
+        """Actuation function of the step env, hands off observation & reward then blocks until an action is given."""
+
+        if self._step_aborted:
+            return None  # episode abandoned by reset(), relinquish control until simulation stops
+        self._step_handoff_time = time.perf_counter()
+        self._step_obs_queue.put((self._get_step_observation(), self.reward_current, False, None))
+        actions = self._step_act_queue.get()
+        self._step_timing.append('Agent Wait', time.perf_counter() - self._step_handoff_time)
+        if actions is _STEP_ABORT:
+            self._step_aborted = True
+            if hasattr(self.api.runtime, 'stop_simulation'):  # not available in older E+ versions
+                self.api.runtime.stop_simulation(self.state)
+            return None
+        return actions
+
+    def _run_step_simulation(self, weather_file: str, output_dir: str):
+        """Worker thread target, runs the simulation and always hands off a final done message to the agent."""
+
+        error = None
+        try:
+            self.run_simulation(weather_file, output_dir)
+        except Exception as e:
+            error = e
+        if not self._step_aborted:
+            # the terminal observation is taken by step(), the reward handed off is the last one computed
+            self._step_obs_queue.put((None, self.reward_current, True, error))
+
+    def _stop_step_simulation(self):
+        """Abandons the currently running step env episode, if any, and waits for its worker thread to finish."""
+
+        if self._step_thread is None:
+            return
+        self._step_aborted = True
+        while self._step_thread.is_alive():
+            # release simulation if blocked waiting on an action
+            try:
+                self._step_act_queue.put(_STEP_ABORT, timeout=0.1)
+            except queue.Full:
+                pass
+            self._step_thread.join(timeout=0.1)
+        self._step_thread = None
+        # drain leftover handoffs
+        for handoff_queue in (self._step_obs_queue, self._step_act_queue):
+            while not handoff_queue.empty():
+                handoff_queue.get_nowait()
+
+    def reset(self, weather_file: str, output_dir: str = 'out') -> np.ndarray:
+        """
+        Starts a new simulation episode on a worker thread and returns its first observation.
+
+        Any currently running episode is abandoned, and all data collected from the prior episode is cleared.
+
+        :param weather_file: path to the EnergyPlus weather file, .epw
+        :param output_dir: directory EnergyPlus will write its output files to
+        :return: first observation vector of the step env observation metrics
+        """
+        if not self.step_env_initialized:
+            raise Exception('ERROR: The step env must be set up with BcaEnv.init_step_env() before reset().')
+        self._stop_step_simulation()
+        if self.simulation_success != 1 or self.got_ems_handles:  # prior episode ran on this state
+            self.reset_state()
+            self._reset_run_data()
+        self._step_timing.clear()
+        self._step_aborted = False
+        self._step_done = False
+
+        self._step_thread = threading.Thread(target=self._run_step_simulation, args=(weather_file, output_dir),
+                                             daemon=True)
+        self._step_thread.start()
+        observation, _, done, error = self._step_obs_queue.get()
+        if error is not None:
+            raise error
+        self._step_done = done
+        return observation
+
+    def step(self, actions: dict):
+        """
+        Takes the given actions in the running simulation and advances it to the next observation handoff.
+
+        :param actions: dict of actuator names (key) and setpoint values (val), same as an actuation function returns
+        :return: (observation, reward, done, info) where observation is the vector of step env observation metrics,
+        reward is the most recent reward (the final one once done), done is True once the simulation has finished, and
+        info is a dict of the current timestep, datetime, and handoff latencies (seconds)
+        """
+        if self._step_done:
+            raise Exception('ERROR: The episode is done, or was never started. Call BcaEnv.reset() first.')
+        step_start = time.perf_counter()
+        self._step_act_queue.put(actions)
+        observation, reward, done, error = self._step_obs_queue.get()
+        self._step_timing.append('Simulation Wait', time.perf_counter() - step_start)
+        if error is not None:
+            raise error
+
+        self._step_done = done
+        if done:
+            self._step_thread.join()
+            self._step_thread = None
+            observation = self._get_step_observation()
+        info = {'timestep': self.timestep_total_count,
+                'datetime': self._data_store.last('time_x'),
+                'agent_wait': self._step_timing.last('Agent Wait'),
+                'simulation_wait': self._step_timing.last('Simulation Wait')}
+        return observation, reward, done, info
+
+    def get_step_latencies(self) -> pd.DataFrame:
+        """
+        Returns the per-step handoff latencies (seconds) of the current step env episode.
+
+        'Agent Wait' is the time the simulation was blocked waiting on the agent's action, and 'Simulation Wait' is
+        the time step() was blocked waiting on the simulation to reach the next observation handoff.
+        """
+        step_timing = self._step_timing
+        step_num = min(step_timing.length('Agent Wait'), step_timing.length('Simulation Wait'))
+        return pd.DataFrame({name: step_timing.get(name)[:step_num] for name in step_timing.column_index},
+                            copy=False)
+
+    def _redirect_ep_output_files(self):
+        """
+        Redirects all files this process has open in the E+ output directory to /dev/null.
+
+        Forked processes share open files with their parent, so this keeps them from writing over each other's E+
+        output files. Linux only, since open files are found through /proc.
+        """
+        output_dir = os.path.abspath(self._output_dir if self._output_dir else 'out')
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        for fd in os.listdir('/proc/self/fd'):
+            try:
+                if os.readlink(f'/proc/self/fd/{fd}').startswith(output_dir + os.sep):
+                    os.dup2(devnull, int(fd))
+            except OSError:
+                pass  # closed since listed
+        os.close(devnull)
+
+    @staticmethod
+    def _exit_forked_process(pipe, result):
+        """Sends a forked process's result to its parent and exits without running any parent cleanup."""
+
+        try:
+            pipe.send(result)
+        except Exception as e:
+            pipe.send(Exception(f'ERROR: Forked process result could not be sent: {e}'))
+        finally:
+            sys.stdout.flush()
+            os._exit(0)
+
+    def run_forked_episodes(self, weather_file: str, num_episodes: int, episode_fxn=None, result_fxn=None,
+                            output_dir: str = 'out') -> list:
+        """
+        Runs many episodes of the same simulation, paying for input processing, sizing, and warmup only once.
+
+        The simulation is ran in a child process up to the first callback after warmup, where it is forked (os.fork())
+        into a process for each episode. Each episode process continues the simulation from that point with its own
+        copy of the agent (and everything else), its own actuation, and its own data sink if one is used (an
+        'episode_#' sub directory of the sink directory). When its simulation is done, its result is sent back over a
+        pipe. This instance is left untouched by the episodes, and can be ran again.
+
+        CAUTION: Linux only. E+ output files are not written by episodes, they share the warmup process's open files,
+        so use EmsPy's data. Random number generators are copied too, so they should be re-seeded in episode_fxn.
+
+        :param weather_file: path to the EnergyPlus weather file, .epw
+        :param num_episodes: number of episodes to fork
+        :param episode_fxn: fxn(sim: BcaEnv, episode_index: int) called in each episode process right after it is
+        forked, to set up its own agent, i.e. re-seed or set exploration params of objects used by callback functions
+        :param result_fxn: fxn(sim: BcaEnv) -> picklable result, called in each episode process after its simulation,
+        get_df() by default
+        :param output_dir: directory EnergyPlus will write its (warmup) output files to
+        :return: list of each episode's result, in order, None for episodes that failed. Failures are logged with their
+        cause, i.e. an exception, a failed E+ exit code, or the exit code of a process that died without a result
+        """
+        if not hasattr(os, 'fork'):
+            raise Exception('ERROR: Forked episodes require os.fork(), only available on Linux.')
+        if not self.calling_point_actuation_dict:
+            raise Exception('ERROR: Forked episodes require at least one calling point and callback function, see '
+                            'set_calling_point_and_callback_function().')
+
+        pipes = [multiprocessing.Pipe(duplex=False) for _ in range(num_episodes)]  # (receive, send)
+        self._fork_episodes = (episode_fxn, result_fxn, [send_pipe for _, send_pipe in pipes])
+        sys.stdout.flush()
+        pid = os.fork()
+        if pid == 0:  # warmup process, forks episodes from within the simulation
+            try:
+                self.run_simulation(weather_file, output_dir)
+                if self._fork_episode_index is None:
+                    result = Exception('ERROR: Simulation ended before episodes could be forked, it FAILED or never '
+                                       'reached the end of warmup.')
+                elif self.simulation_success != 0:  # episode process, simulation failed
+                    result = Exception(f'ERROR: Episode simulation FAILED, E+ exit code [{self.simulation_success}].')
+                else:  # episode process, simulation done
+                    result = result_fxn(self) if result_fxn is not None else self.get_df()
+            except Exception as e:
+                result = e
+            if self._fork_episode_index is None:
+                for send_pipe in self._fork_episodes[2]:
+                    send_pipe.send(result)
+                sys.stdout.flush()
+                os._exit(0)
+            self._exit_forked_process(self._fork_episodes[2][self._fork_episode_index], result)
+
+        self._fork_episodes = None
+        results, warmup_exit_code = [], None
+        for i, (receive_pipe, send_pipe) in enumerate(pipes):
+            send_pipe.close()
+            try:
+                result = receive_pipe.recv()
+            except EOFError:  # warmup process, holding all pipes, is gone without reporting this episode
+                if warmup_exit_code is None:
+                    warmup_exit_code = os.waitstatus_to_exitcode(os.waitpid(pid, 0)[1])
+                result = Exception(f'ERROR: Episode process ended without a result, warmup process exit code '
+                                   f'[{warmup_exit_code}].')
+            receive_pipe.close()
+            if isinstance(result, Exception):
+                logger.warning(f'*WARNING: Forked episode [{i}] FAILED: {result}')
+                result = None
+            results.append(result)
+        if warmup_exit_code is None:
+            os.waitpid(pid, 0)
+        return results
+
+    def _fork_episodes_from_here(self):
+        """Forks all episode processes from the running simulation, see run_forked_episodes()."""
+
+        episode_fxn, _, send_pipes = self._fork_episodes
+        sys.stdout.flush()
+        episode_pids = []
+        for i in range(len(send_pipes)):
+            pid = os.fork()
+            if pid == 0:  # episode process, continues simulation
+                self._fork_episode_index = i
+                self._redirect_ep_output_files()
+                if self.data_sink is not None:
+                    self.data_sink = EmsDataSink(os.path.join(self.data_sink.sink_dir, f'episode_{i}'),
+                                                 self.data_sink.file_format)
+                try:
+                    if episode_fxn is not None:
+                        episode_fxn(self, i)
+                except Exception as e:
+                    self._exit_forked_process(send_pipes[i], e)
+                return
+            episode_pids.append(pid)
+
+        # warmup process is done, wait for episodes so none are left orphaned, reporting those that died without result
+        exit_code = 0
+        for i, pid in enumerate(episode_pids):
+            episode_exit_code = os.waitstatus_to_exitcode(os.waitpid(pid, 0)[1])
+            if episode_exit_code != 0:
+                send_pipes[i].send(Exception(f'ERROR: Episode process exited with code [{episode_exit_code}].'))
+                exit_code = 1
+        sys.stdout.flush()
+        os._exit(exit_code)
+
+    def fork_rollouts(self, action_sequences: list, summary_fxn=None) -> list:
+        """
+        Evaluates candidate action sequences from the current timestep, by forking the simulation into a branch each.
+
+        Must be called from within an actuation function. The running simulation process is forked (os.fork()) into a
+        branch process per candidate action sequence. Each branch takes its sequence's actions at this calling point,
+        one per action update starting with the current one, while observation functions keep running as usual. Once
+        the state following its last action is observed, the branch sends back its result and exits. This simulation
+        is then continued with whatever action the actuation function returns, i.e. chosen from the results.
+
+        CAUTION: Linux only, and not from within a step env. Branches do not write E+ output files or data sinks, and
+        their agents are copies, so any learning within branches is lost.
+
+        :param action_sequences: list of candidate action sequences, each a list of actuator setpoint dicts (as
+        returned by actuation functions), one per action update. Its length is the rollout horizon
+        :param summary_fxn: fxn(sim: BcaEnv, start: int) -> picklable summary, called in each branch at its end, given
+        the data store row its rollout started at
+        :return: list of each branch's result, in order of action sequences. Each result is a dict of the 'actions'
+        taken, the 'trajectory' dataframe of all EMS data, 'rewards' dataframe and 'reward_sum' (None if no rewards),
+        and 'summary' (None if no summary_fxn). None for branches that failed
+        """
+        if not hasattr(os, 'fork'):
+            raise Exception('ERROR: Rollouts require os.fork(), only available on Linux.')
+        if self._rollout is not None:
+            raise Exception('ERROR: Rollouts can not be forked from within a rollout branch.')
+
+        sys.stdout.flush()
+        branches = []  # (pid, receive pipe)
+        for actions in action_sequences:
+            receive_pipe, send_pipe = multiprocessing.Pipe(duplex=False)
+            pid = os.fork()
+            if pid == 0:  # branch process
+                receive_pipe.close()
+                self._rollout = {'pipe': send_pipe, 'actions': list(actions), 'step': 0, 'summary_fxn': summary_fxn,
+                                 'calling_point': self._current_calling_point,
+                                 'start': self._data_store.length('time_x'), 'reward_start': len(self.rewards)}
+                self._redirect_ep_output_files()
+                self.data_sink = None  # parent's
+                raise _RolloutBranch()  # back out of actuation function, to the callback function
+            send_pipe.close()
+            branches.append((pid, receive_pipe))
+
+        results = []
+        for i, (pid, receive_pipe) in enumerate(branches):
+            try:
+                result = receive_pipe.recv()
+            except EOFError:
+                result = Exception('ERROR: Rollout branch ended without a result.')
+            receive_pipe.close()
+            os.waitpid(pid, 0)
+            if isinstance(result, Exception):
+                logger.warning(f'*WARNING: Rollout branch [{i}] FAILED: {result}')
+                result = None
+            results.append(result)
+        return results
+
+    def _next_rollout_action(self, calling_point: str):
+        """Returns the next candidate action of this rollout branch, or ends the branch once all have been taken."""
+
+        rollout = self._rollout
+        if calling_point != rollout['calling_point']:
+            return {}  # only act at rollout calling point, prior actions remain
+        if rollout['step'] < len(rollout['actions']):
+            rollout['step'] += 1
+            return rollout['actions'][rollout['step'] - 1]
+        # state following last action observed
+        self._exit_forked_process(rollout['pipe'], self._get_rollout_result())
+
+    def _get_rollout_result(self) -> dict:
+        """Collects the result of this rollout branch, see fork_rollouts()."""
+
+        rollout = self._rollout
+        start = rollout['start']
+        index_cols = ['Datetime', 'Timestep', 'Calling Point']
+        ems_dfs = [self._build_default_df(ems_type, start) for ems_type in self.ems_num_dict]
+        trajectory = pd.concat([ems_dfs[0][index_cols]] + [df.drop(columns=index_cols) for df in ems_dfs], axis=1) \
+            if ems_dfs else pd.DataFrame()
+        rewards = self.rewards[rollout['reward_start']:]
+        summary_fxn = rollout['summary_fxn']
+        return {'actions': rollout['actions'][:rollout['step']],
+                'trajectory': trajectory,
+                'rewards': self._build_reward_df(rewards) if len(rewards) else None,
+                'reward_sum': np.sum(rewards, axis=0) if len(rewards) else None,
+                'summary': summary_fxn(self, start) if summary_fxn is not None else None}
+
+
+_STEP_ABORT = object()  # step env action queue sentinel to abandon a running episode
+
+
+_unwritten = object()  # sentinel of actuators with no value written yet, never equal to a setpoint
+
+
+class _RolloutBranch(BaseException):
+    """Raised in a forked rollout branch to back out of the actuation function that forked it."""
+
+
+def _run_batch_job(ep_path: str, timesteps: int, worker_log_level: int, ep_idf_to_run: str, weather_file: str,
+                   tc: dict, agent_factory, output_dir: str):
+    """
+    Runs a single BcaEnv simulation in a worker process and returns its dataframes, or None if it failed. Errors are
+    logged rather than raised, so one failed job does not abort the whole batch.
+    """
+    set_log_level(worker_log_level)
+
+    sim = None
+    try:
+        sim = BcaEnv(ep_path, ep_idf_to_run, timesteps, tc.get('var'), tc.get('intvar'), tc.get('meter'),
+                     tc.get('actuator'), tc.get('weather'))
+        agent_factory(sim)  # user links calling points & callback functions to this worker's own env
+        sim.run_env(weather_file, output_dir)
+        if sim.simulation_success != 0:
+            return None
+        # no callbacks, nothing collected
+        return sim.get_df() if sim.calling_point_actuation_dict else {}
+    except Exception:
+        logger.exception(f'*WARNING: Batch job [{ep_idf_to_run}], [{weather_file}] FAILED:')
+        return None
+    finally:
+        if sim is not None:
+            sim.delete_state()
+
+
+class BatchSimulationRunner:
+    """
+    Runs many independent BcaEnv simulations (IDF, weather, ToC, agent) in parallel across a pool of worker processes.
+
+    Each job is simulated in its own worker process, which is not reused, so that each has its own EnergyPlus library
+    instance and state, as well as its own output directory. The resulting dataframes are gathered in order of jobs.
+
+    CAUTION: the agent factory must be picklable, i.e. defined at module level, and scripts using this must guard their
+    entry point with if __name__ == '__main__' on platforms that spawn worker processes (Windows, macOS).
+    """
+
+    def __init__(self, ep_path: str, timesteps: int, output_root: str = 'out', max_workers: int = None,
+                 worker_log_level: int = logging.WARNING):
+        """
+        :param ep_path: absolute path to EnergyPlus download directory in user's file system
+        :param timesteps: number of timesteps per hour set in all EnergyPlus model .idf files to be ran
+        :param output_root: directory under which each job's unique output directory will be created
+        :param max_workers: max number of simulations to run concurrently, all CPU cores by default
+        :param worker_log_level: logging level of EmsPy messages in worker processes, NOTEs are silenced by default
+        """
+        self.ep_path = ep_path
+        self.worker_log_level = worker_log_level
+        self.timesteps = timesteps
+        self.output_root = output_root
+        self.max_workers = max_workers if max_workers else os.cpu_count()
+        self.jobs = []  # [(ep_idf_to_run, weather_file, tc, agent_factory, output_dir), ...]
+
+    def add_job(self, ep_idf_to_run: str, weather_file: str, tc: dict, agent_factory):
+        """
+        Adds a single simulation job to be ran.
+
+        :param ep_idf_to_run: path to EnergyPlus building energy model to be simulated, .idf file
+        :param weather_file: path to the EnergyPlus weather file, .epw
+        :param tc: dict of EMS type (var, intvar, meter, actuator, weather) keys and their ToC dict as value, see
+        EmsPy.__init__() documentation. Missing EMS types are not used
+        :param agent_factory: function taking the job's BcaEnv instance, which must set its calling points and callback
+        functions, and optionally custom dataframes, before the simulation is ran
+        """
+        idf_name = os.path.splitext(os.path.basename(ep_idf_to_run))[0]
+        weather_name = os.path.splitext(os.path.basename(weather_file))[0]
+        output_dir = os.path.join(self.output_root, f'{len(self.jobs)}_{idf_name}_{weather_name}')
+        self.jobs.append((ep_idf_to_run, weather_file, tc, agent_factory, output_dir))
+
+    def add_sweep(self, ep_idfs_to_run: list, weather_files: list, tc: dict, agent_factory):
+        """Adds a simulation job for every combination of given IDF and weather files, see add_job() documentation."""
+
+        for ep_idf_to_run, weather_file in itertools.product(ep_idfs_to_run, weather_files):
+            self.add_job(ep_idf_to_run, weather_file, tc, agent_factory)
+
+    def run(self) -> list:
+        """
+        Runs all jobs in parallel and returns their results.
+
+        :return: list of each job's BcaEnv.get_df() dict of dataframes, in order of jobs added, or None for failed jobs
+        """
+        if not self.jobs:
+            raise Exception('ERROR: No simulation jobs were added to run.')
+
+        logger.info(f'* * * Running [{len(self.jobs)}] E+ Simulations on [{self.max_workers}] Workers * * *')
+        # new process per job, E+ library keeps global state that cannot be shared between simulations
+        with multiprocessing.Pool(processes=min(self.max_workers, len(self.jobs)), maxtasksperchild=1) as pool:
+            async_results = [pool.apply_async(_run_batch_job, (self.ep_path, self.timesteps, self.worker_log_level) + job)
+                             for job in self.jobs]
+            results = [async_result.get() for async_result in async_results]
+
+        failed_num = sum(result is None for result in results)
+        logger.info(f'* * * Batch Done, [{len(results) - failed_num}] of [{len(results)}] Simulations Succeeded * * *')
+        return results
+
+
+def _vector_env_worker(pipe, ep_path: str, timesteps: int, ep_idf_to_run: str, weather_file: str, tc: dict,
+                       calling_point: str, observation_metrics: list, action_actuators: list, reward_factory,
+                       output_dir: str, worker_log_level: int):
+    """Worker process of BcaVecEnv, runs one step env and serves reset/step/close commands from its pipe."""
+
+    set_log_level(worker_log_level)
+
+    sim = BcaEnv(ep_path, ep_idf_to_run, timesteps, tc.get('var'), tc.get('intvar'), tc.get('meter'),
+                 tc.get('actuator'), tc.get('weather'))
+    reward_fxn = reward_factory(sim) if reward_factory is not None else None
+    sim.init_step_env(calling_point, observation_metrics, reward_fxn)
+    while True:
+        command, data = pipe.recv()
+        try:
+            if command == 'reset':
+                pipe.send(sim.reset(weather_file, output_dir))
+            elif command == 'step':
+                # scatter action row into actuator setpoint dict, in order of action actuators
+                observation, reward, done, info = sim.step(dict(zip(action_actuators, data.tolist())))
+                if done:  # auto-reset, so that all envs keep stepping in lockstep
+                    info['terminal_observation'] = observation
+                    observation = sim.reset(weather_file, output_dir)
+                pipe.send((observation, reward, done, info))
+            elif command == 'close':
+                sim._stop_step_simulation()
+                sim.delete_state()
+                pipe.send(None)
+                break
+        except Exception as e:
+            pipe.send(e)
+    pipe.close()
+
+
+class BcaVecEnv:
+    """
+    Vectorized step environment, N independent BcaEnv simulations stepped in lockstep with batched observations.
+
+    Each env is ran in its own subprocess, since the EnergyPlus library keeps global state, using the BcaEnv step env
+    (see BcaEnv.init_step_env()). Observations are returned stacked as a (N, obs_dim) array and actions are taken as a
+    (N, act_dim) array, where each row is scattered into its env's actuators. Envs that finish their simulation are
+    automatically reset, their final observation is given in info['terminal_observation'].
+
+    CAUTION: the reward factory must be picklable, i.e. defined at module level.
+    """
+
+    def __init__(self, ep_path: str, timesteps: int, env_specs: list, calling_point: str, observation_metrics: list,
+                 action_actuators: list, reward_factory=None, output_root: str = 'out',
+                 worker_log_level: int = logging.WARNING):
+        """
+        :param ep_path: absolute path to EnergyPlus download directory in user's file system
+        :param timesteps: number of timesteps per hour set in all EnergyPlus model .idf files to be ran
+        :param env_specs: list of (ep_idf_to_run, weather_file, tc) for each env, where tc is a dict of EMS type (var,
+        intvar, meter, actuator, weather) keys and their ToC dict as value
+        :param calling_point: the calling point at which observations are handed off and actions are taken
+        :param observation_metrics: list of EMS/timing metric names making up each observation row, in order
+        :param action_actuators: list of actuator names making up each action row, in order
+        :param reward_factory: optional function taking an env's BcaEnv instance and returning its reward function
+        :param output_root: directory under which each env's unique output directory will be created
+        :param worker_log_level: logging level of EmsPy messages in worker processes, NOTEs are silenced by default
+        """
+        self.num_envs = len(env_specs)
+        self.observation_metrics = list(observation_metrics)
+        self.action_actuators = list(action_actuators)
+        self.obs_dim = len(self.observation_metrics)
+        self.act_dim = len(self.action_actuators)
+        self.closed = False
+
+        self._pipes = []
+        self._processes = []
+        for i, (ep_idf_to_run, weather_file, tc) in enumerate(env_specs):
+            parent_pipe, child_pipe = multiprocessing.Pipe()
+            output_dir = os.path.join(output_root, f'env_{i}')
+            process = multiprocessing.Process(target=_vector_env_worker,
+                                              args=(child_pipe, ep_path, timesteps, ep_idf_to_run, weather_file, tc,
+                                                    calling_point, self.observation_metrics, self.action_actuators,
+                                                    reward_factory, output_dir, worker_log_level),
+                                              daemon=True)
+            process.start()
+            child_pipe.close()
+            self._pipes.append(parent_pipe)
+            self._processes.append(process)
+
+    def _gather(self) -> list:
+        """Receives the response of every env, in order, raising any error that occurred in a worker process."""
+
+        responses = [pipe.recv() for pipe in self._pipes]
+        for response in responses:
+            if isinstance(response, Exception):
+                raise response
+        return responses
+
+    def reset(self) -> np.ndarray:
+        """
+        Starts a new episode in every env.
+
+        :return: stacked first observations, (N, obs_dim) array
+        """
+        for pipe in self._pipes:
+            pipe.send(('reset', None))
+        return np.stack(self._gather())
+
+    def step(self, actions: np.ndarray):
+        """
+        Takes a row of actions in each env and advances all envs to their next observation handoff.
+
+        :param actions: (N, act_dim) array of actuator setpoints, columns in order of action actuators
+        :return: (observations, rewards, dones, infos) as (N, obs_dim) array, (N,) or (N, num_rewards) array, (N,)
+        bool array, and list of N info dicts
+        """
+        actions = np.asarray(actions, dtype=np.float64)
+        if actions.shape != (self.num_envs, self.act_dim):
+            raise ValueError(f'ERROR: Actions must be of shape {(self.num_envs, self.act_dim)}, not {actions.shape}.')
+        for pipe, action_row in zip(self._pipes, actions):
+            pipe.send(('step', action_row))
+        observations, rewards, dones, infos = zip(*self._gather())
+        rewards = np.array([np.nan if reward is None else reward for reward in rewards], dtype=np.float64)
+        return np.stack(observations), rewards, np.array(dones, dtype=bool), list(infos)
+
+    def close(self):
+        """Stops all env simulations and worker processes."""
+
+        if self.closed:
+            return
+        for pipe in self._pipes:
+            pipe.send(('close', None))
+        for pipe, process in zip(self._pipes, self._processes):
+            pipe.recv()
+            process.join()
+            pipe.close()
+        self.closed = True
 
 
 class DataDashboard:
@@ -1052,7 +3565,260 @@ class DataDashboard:
 
 
 class EnergyPlusModelModifier:
-    # TODO figure out what idf and osm manipulation should be granted to user, or should they just do all this
-    # or use openstudio package
-    def __init__(self):
-        pass
+    """
+    IDF object model to quickly modify an E+ model and write parametric variants of it, without OpenStudio.
+
+    The IDF is parsed once (cached per file, for all instances) into a list of objects, indexed by class and by
+    (class, name). Each object is a tuple of its fields, with the class name as field 0 such that field numbering matches
+    the IDD, i.e. field 1 is typically the object's name. Unmodified objects are written back out as their original
+    text, comments included, only edited objects are re-formatted, so writing a variant is mostly a string join.
+    Objects are never modified in place, so copy() is cheap and variants share all unmodified objects.
+    """
+
+    _parse_cache = OrderedDict()  # key: IDF path, val: ((modified time, size), parsed IDF), least recently used first
+    _parse_cache_size = 16  # max number of parsed IDFs kept
+
+    def __init__(self, idf_file: str = None):
+        """
+        :param idf_file: path to the EnergyPlus building energy model, .idf file
+        """
+        self.idf_file = idf_file
+        self.objects = []  # object field tuples, None if removed
+        self._object_texts = []  # text of each object, original if unmodified
+        self._class_index = {}  # key: upper class name, val: list of object indexes
+        self._name_index = {}  # key: (upper class name, upper object name), val: object index
+        self._tail_text = ''
+        if idf_file is not None:
+            self._load(idf_file)
+
+    def _load(self, idf_file: str):
+        stat = os.stat(idf_file)
+        idf_path, idf_version = os.path.abspath(idf_file), (stat.st_mtime_ns, stat.st_size)
+        parse_cache = EnergyPlusModelModifier._parse_cache
+        if idf_path in parse_cache and parse_cache[idf_path][0] == idf_version:
+            parse_cache.move_to_end(idf_path)
+        else:
+            parse_cache[idf_path] = (idf_version, self._parse(idf_file))  # replaces any outdated parse of the file
+            parse_cache.move_to_end(idf_path)
+            while len(parse_cache) > EnergyPlusModelModifier._parse_cache_size:
+                parse_cache.popitem(last=False)
+        objects, object_texts, class_index, name_index, tail_text = parse_cache[idf_path][1]
+        self.objects, self._object_texts = list(objects), list(object_texts)
+        self._class_index = {idf_class: list(indexes) for idf_class, indexes in class_index.items()}
+        self._name_index, self._tail_text = dict(name_index), tail_text
+
+    @staticmethod
+    def _parse(idf_file: str) -> tuple:
+        """Splits the IDF text into objects, keeping each object's original text (including preceding comments)."""
+
+        with open(idf_file, 'r') as idf:
+            idf_text = idf.read()
+        # blank out comments, keeping positions, so object ends (;) can be found in the original text
+        masked_text = re.sub(r'!.*', lambda comment: ' ' * len(comment.group()), idf_text)
+        objects, object_texts, class_index, name_index = [], [], {}, {}
+        start = 0
+        for end in (match.end() for match in re.finditer(';', masked_text)):
+            fields = tuple(field.strip() for field in masked_text[start:end - 1].split(','))
+            objects.append(fields)
+            object_texts.append(idf_text[start:end])
+            class_index.setdefault(fields[0].upper(), []).append(len(objects) - 1)
+            if len(fields) > 1:
+                name_index.setdefault((fields[0].upper(), fields[1].upper()), len(objects) - 1)
+            start = end
+        return objects, object_texts, class_index, name_index, idf_text[start:]
+
+    def copy(self):
+        """Returns a copy of the model, sharing all (immutable) objects."""
+
+        model_copy = EnergyPlusModelModifier()
+        model_copy.idf_file = self.idf_file
+        model_copy.objects, model_copy._object_texts = list(self.objects), list(self._object_texts)
+        model_copy._class_index = {idf_class: list(indexes) for idf_class, indexes in self._class_index.items()}
+        model_copy._name_index, model_copy._tail_text = dict(self._name_index), self._tail_text
+        return model_copy
+
+    def _get_index(self, idf_class: str, name: str = None) -> int:
+        """Returns the index of an object by name, or the only object of its class if no name is given."""
+
+        if name is not None:
+            index = self._name_index.get((idf_class.upper(), name.upper()))
+        else:
+            indexes = self._class_index.get(idf_class.upper(), [])
+            index = indexes[0] if len(indexes) == 1 else None
+        if index is None:
+            raise ValueError(f'ERROR: IDF object [{idf_class}, {name}] not found, or is not unique.')
+        return index
+
+    def get_classes(self) -> list:
+        """Returns the (upper case) IDF classes of all objects in the model."""
+
+        return [idf_class for idf_class, indexes in self._class_index.items() if indexes]
+
+    def get_objects(self, idf_class: str) -> list:
+        """Returns all objects of an IDF class, as field tuples."""
+
+        return [self.objects[i] for i in self._class_index.get(idf_class.upper(), [])]
+
+    def get_object(self, idf_class: str, name: str = None) -> tuple:
+        """Returns an object by name, or the only object of its class (i.e. Timestep) if no name is given."""
+
+        return self.objects[self._get_index(idf_class, name)]
+
+    def _replace_object(self, index: int, fields):
+        """Replaces the object at an index with new fields, updating the name index."""
+
+        fields = tuple(str(field) for field in fields)
+        old_fields = self.objects[index]
+        if old_fields is not None and len(old_fields) > 1:
+            self._name_index.pop((old_fields[0].upper(), old_fields[1].upper()), None)
+        if len(fields) > 1:
+            self._name_index[(fields[0].upper(), fields[1].upper())] = index
+        # keep comments preceding the original object, i.e. IDF section headers
+        old_text = self._object_texts[index]
+        prefix = re.match(r'(?:[ \t\r]*(?:!.*)?\n)*[ \t]*', old_text).group() if old_text else '\n'
+        self.objects[index] = fields
+        self._object_texts[index] = prefix + self._format_object(fields)
+
+    def set_object(self, fields):
+        """
+        Replaces the existing object of the same class and name (field 1) with new fields, or adds it if not found.
+
+        :param fields: all object fields, class name first
+        """
+        index = self._name_index.get((str(fields[0]).upper(), str(fields[1]).upper())) if len(fields) > 1 else None
+        if index is None:
+            self.objects.append(None)
+            self._object_texts.append(None)
+            index = len(self.objects) - 1
+            self._class_index.setdefault(str(fields[0]).upper(), []).append(index)
+        self._replace_object(index, fields)
+
+    def set_field(self, idf_class: str, name, field_index: int, value):
+        """
+        Sets a single field of an object.
+
+        :param idf_class: IDF class of the object, i.e. 'RunPeriod'
+        :param name: name of the object, or None if it is the only object of its class
+        :param field_index: index of the field, class name is 0 and the first field (typically name) is 1
+        :param value: new field value, converted to string
+        """
+        index = self._get_index(idf_class, name)
+        fields = list(self.objects[index])
+        if field_index >= len(fields):
+            fields.extend([''] * (field_index - len(fields) + 1))
+        fields[field_index] = value
+        self._replace_object(index, fields)
+
+    def remove_object(self, idf_class: str, name: str = None):
+        """Removes an object by name, or the only object of its class if no name is given."""
+
+        index = self._get_index(idf_class, name)
+        fields = self.objects[index]
+        self._class_index[fields[0].upper()].remove(index)
+        if len(fields) > 1:
+            self._name_index.pop((fields[0].upper(), fields[1].upper()), None)
+        self.objects[index] = None
+        self._object_texts[index] = None
+
+    def set_timestep(self, timesteps: int):
+        """Sets the number of timesteps per hour, see EmsPy timesteps."""
+
+        if self._class_index.get('TIMESTEP'):
+            self.set_field('Timestep', None, 1, timesteps)
+        else:
+            self.set_object(['Timestep', timesteps])
+
+    def set_run_period(self, begin_month: int, begin_day: int, end_month: int, end_day: int, name: str = None):
+        """
+        Sets the begin & end dates of a RunPeriod, for both pre and post E+ 9.0 RunPeriod formats.
+
+        :param name: name of the RunPeriod, or None if it is the only RunPeriod
+        """
+        index = self._get_index('RunPeriod', name)
+        fields = list(self.objects[index])
+        fields.extend([''] * max(0, 7 - len(fields)))
+        # E+ 9.x adds Begin/End Year fields, older IDFs have Day of Week for Start Day right after End Day
+        if fields[6].lower() in [day.lower() for day in calendar.day_name]:
+            fields[2:6] = begin_month, begin_day, end_month, end_day
+        else:
+            fields[2:4], fields[5:7] = (begin_month, begin_day), (end_month, end_day)
+        self._replace_object(index, fields)
+
+    def set_schedule_constant(self, schedule_name: str, value: float):
+        """
+        Replaces a full schedule (Schedule:Constant, :Compact, :Year or :File) by a Schedule:Constant of the given
+        value, keeping its type limits.
+
+        Schedule:Week:* and Schedule:Day:* objects are only referenced by other schedules, which can not reference a
+        Schedule:Constant, so they are refused.
+        """
+        type_limits_fields = {'SCHEDULE:CONSTANT': 2, 'SCHEDULE:COMPACT': 2, 'SCHEDULE:YEAR': 2, 'SCHEDULE:FILE': 2}
+        for idf_class in self.get_classes():
+            if not idf_class.startswith('SCHEDULE:') or (idf_class, schedule_name.upper()) not in self._name_index:
+                continue
+            if idf_class not in type_limits_fields:
+                raise ValueError(f'ERROR: Schedule [{schedule_name}] is a {idf_class.title()}, only '
+                                 f'{", ".join(c.title() for c in type_limits_fields)} can be set constant.')
+            fields = self.objects[self._name_index[(idf_class, schedule_name.upper())]]
+            type_limits_field = type_limits_fields[idf_class]
+            type_limits = fields[type_limits_field] if len(fields) > type_limits_field else ''
+            self.remove_object(idf_class, schedule_name)
+            self.set_object(['Schedule:Constant', fields[1], type_limits, value])
+            return
+        raise ValueError(f'ERROR: Schedule [{schedule_name}] not found.')
+
+    def set_thermostat_setpoints(self, thermostat_name: str, heating: float = None, cooling: float = None):
+        """
+        Sets constant heating and/or cooling setpoints of a thermostat (ThermostatSetpoint:* object).
+
+        New Schedule:Constant objects are created for the thermostat, so setpoint schedules shared with other
+        thermostats are not affected.
+        """
+        setpoint_fields = {'THERMOSTATSETPOINT:DUALSETPOINT': {'heating': 2, 'cooling': 3},
+                           'THERMOSTATSETPOINT:SINGLEHEATING': {'heating': 2},
+                           'THERMOSTATSETPOINT:SINGLECOOLING': {'cooling': 2},
+                           'THERMOSTATSETPOINT:SINGLEHEATINGORCOOLING': {'heating': 2, 'cooling': 2}}
+        for idf_class, field_indexes in setpoint_fields.items():
+            if (idf_class, thermostat_name.upper()) not in self._name_index:
+                continue
+            for setpoint, value in [('heating', heating), ('cooling', cooling)]:
+                if value is None or setpoint not in field_indexes:
+                    continue
+                schedule_name = f'{thermostat_name} {setpoint.capitalize()} Setpoint'
+                self.set_object(['Schedule:Constant', schedule_name, '', value])
+                self.set_field(idf_class, thermostat_name, field_indexes[setpoint], schedule_name)
+            return
+        raise ValueError(f'ERROR: Thermostat [{thermostat_name}] not found.')
+
+    @staticmethod
+    def _format_object(fields: tuple) -> str:
+        return fields[0] + (',\n    ' if len(fields) > 1 else '') + ',\n    '.join(fields[1:]) + ';'
+
+    def to_idf_text(self) -> str:
+        """Returns the IDF text of the model, unmodified objects as their original text."""
+
+        return ''.join(text for fields, text in zip(self.objects, self._object_texts) if fields is not None) + \
+            self._tail_text
+
+    def write(self, idf_file: str):
+        """Writes the model to a new .idf file."""
+
+        with open(idf_file, 'w') as idf:
+            idf.write(self.to_idf_text())
+
+    def write_variants(self, variant_fxns: dict, output_dir: str) -> dict:
+        """
+        Writes many variants of the model, each a copy modified by its own function.
+
+        :param variant_fxns: {"variant_name": fxn(model: EnergyPlusModelModifier),...} to modify each variant copy
+        :param output_dir: directory to write all variant .idf files to, as 'variant_name'.idf
+        :return: {"variant_name": .idf file path,...}
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        variant_files = {}
+        for variant_name, variant_fxn in variant_fxns.items():
+            variant = self.copy()
+            variant_fxn(variant)
+            variant_files[variant_name] = os.path.join(output_dir, variant_name + '.idf')
+            variant.write(variant_files[variant_name])
+        return variant_files
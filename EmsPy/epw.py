@@ -0,0 +1,194 @@
+"""
+Offline EnergyPlus Weather (EPW) file reader, so weather data can be used without running an E+ simulation.
+
+EPW data dictionary, EnergyPlus Auxiliary Programs documentation https://energyplus.net/documentation
+"""
+
+import os
+import numpy as np
+import pandas as pd
+
+# same weather metric names as EmsPy.available_weather_metrics, along with time fields of each EPW data row
+epw_time_fields = ['year', 'month', 'day', 'hour', 'minute']
+epw_weather_metrics = ['sun_is_up', 'is_raining', 'is_snowing', 'albedo', 'beam_solar', 'diffuse_solar',
+                       'horizontal_ir', 'liquid_precipitation', 'outdoor_barometric_pressure', 'outdoor_dew_point',
+                       'outdoor_dry_bulb', 'outdoor_relative_humidity', 'sky_temperature', 'wind_direction',
+                       'wind_speed']
+epw_dtype = np.dtype([(field, np.int16) for field in epw_time_fields] +
+                     [(metric, np.float32) for metric in epw_weather_metrics])
+
+# EPW data row field indexes of weather metrics read directly, others are derived
+epw_field_index = {'outdoor_dry_bulb': 6, 'outdoor_dew_point': 7, 'outdoor_relative_humidity': 8,
+                   'outdoor_barometric_pressure': 9, 'horizontal_ir': 12, 'beam_solar': 14, 'diffuse_solar': 15,
+                   'wind_direction': 20, 'wind_speed': 21, 'albedo': 32, 'liquid_precipitation': 33}
+# EPW missing value codes of weather metrics read directly, values at or above them are missing (NaN)
+epw_missing_values = {'outdoor_dry_bulb': 99.9, 'outdoor_dew_point': 99.9, 'outdoor_relative_humidity': 999,
+                      'outdoor_barometric_pressure': 999999, 'horizontal_ir': 9999, 'beam_solar': 9999,
+                      'diffuse_solar': 9999, 'wind_direction': 999, 'wind_speed': 999, 'albedo': 999,
+                      'liquid_precipitation': 999}
+EPW_EXTRATERRESTRIAL_FIELD_INDEX = 10  # extraterrestrial horizontal radiation, used to derive sun_is_up
+EPW_RADIATION_MISSING = 9999
+EPW_CACHE_VERSION = 2  # bumped whenever parsing changes, so older caches are not reused
+EPW_HEADER_LINES = 8
+STEFAN_BOLTZMANN = 5.6697e-8  # W/m2-K4
+
+
+class EpwWeather:
+    """
+    Parses an EPW file once into a typed NumPy record array, cached in binary .npy format for memory-mapped loads.
+
+    Each record (row) holds the time fields and all weather metrics, named as in EmsPy.available_weather_metrics, of one
+    EPW data row. Metrics not given directly by the EPW are derived the same way EnergyPlus does: sun_is_up from
+    extraterrestrial horizontal radiation, is_raining/is_snowing from liquid precipitation and present weather codes,
+    and sky_temperature from horizontal infrared radiation. Values are in EPW units.
+    """
+
+    def __init__(self, epw_file: str, cache_dir: str = None, use_cache: bool = True):
+        """
+        :param epw_file: path to the EnergyPlus weather file, .epw
+        :param cache_dir: directory to write/read the binary cache to, same as EPW file by default
+        :param use_cache: whether to load from (and write to) the binary cache, if not then the EPW is always parsed
+        """
+        self.epw_file = epw_file
+        self.cache_file = os.path.join(cache_dir if cache_dir else os.path.dirname(os.path.abspath(epw_file)),
+                                       os.path.splitext(os.path.basename(epw_file))[0] +
+                                       f'.v{EPW_CACHE_VERSION}.epw.npy')
+        self.header = self._read_header()
+        self.location = self._parse_location()
+        self.timesteps_per_hour = self._parse_timesteps_per_hour()
+
+        if use_cache and self._cache_is_valid():
+            self.data = np.load(self.cache_file, mmap_mode='r')  # read-only, memory-mapped
+        else:
+            self.data = self._parse_data()
+            if use_cache:
+                self._write_cache()
+
+    def __len__(self):
+        return len(self.data)
+
+    def _read_header(self) -> list:
+        """Reads the EPW header lines, each split into its fields."""
+
+        with open(self.epw_file, 'r') as epw:
+            return [next(epw).rstrip('\n').split(',') for _ in range(EPW_HEADER_LINES)]
+
+    def _parse_location(self) -> dict:
+        """Parses the LOCATION header line."""
+
+        fields = self.header[0]
+        return {'city': fields[1], 'state': fields[2], 'country': fields[3], 'source': fields[4], 'wmo': fields[5],
+                'latitude': float(fields[6]), 'longitude': float(fields[7]), 'time_zone': float(fields[8]),
+                'elevation': float(fields[9])}
+
+    def _parse_timesteps_per_hour(self) -> int:
+        """Parses the number of records per hour from the DATA PERIODS header line."""
+
+        try:
+            return int(self.header[-1][2])
+        except (IndexError, ValueError):
+            return 1
+
+    def _cache_is_valid(self) -> bool:
+        """The cache is valid if it exists and is newer than the EPW file."""
+
+        return os.path.exists(self.cache_file) and \
+            os.path.getmtime(self.cache_file) >= os.path.getmtime(self.epw_file)
+
+    def _write_cache(self):
+        """Writes the parsed data to the binary cache, skipped if the cache directory is not writable."""
+
+        try:
+            np.save(self.cache_file, self.data)
+        except OSError:
+            pass
+
+    def _parse_data(self) -> np.ndarray:
+        """Parses all EPW data rows into a record array, vectorized per field."""
+
+        with open(self.epw_file, 'r') as epw:
+            rows = [line.rstrip('\n').split(',') for line in epw.readlines()[EPW_HEADER_LINES:] if line.strip()]
+        # older (i.e. TMY2 converted) EPWs may omit trailing fields, pad missing ones
+        field_num = max(len(row) for row in rows)
+        rows = [row + [''] * (field_num - len(row)) for row in rows]
+        columns = list(zip(*rows))
+
+        def numeric_field(i: int, missing_value: float = None) -> np.ndarray:
+            if i >= field_num:
+                return np.full(len(rows), np.nan)
+            values = pd.to_numeric(pd.Series(columns[i]), errors='coerce').to_numpy(dtype=np.float64, copy=True)
+            if missing_value is not None:
+                values[values >= missing_value] = np.nan
+            return values
+
+        data = np.zeros(len(rows), dtype=epw_dtype)
+        for i, field in enumerate(epw_time_fields):
+            data[field] = numeric_field(i)
+        for metric, i in epw_field_index.items():
+            data[metric] = numeric_field(i, epw_missing_values.get(metric))
+
+        # derived metrics, missing if their source field is
+        data['sun_is_up'] = numeric_field(EPW_EXTRATERRESTRIAL_FIELD_INDEX, EPW_RADIATION_MISSING) > 0
+        horizontal_ir = numeric_field(epw_field_index['horizontal_ir'], epw_missing_values['horizontal_ir'])
+        data['sky_temperature'] = (horizontal_ir / STEFAN_BOLTZMANN) ** 0.25 - 273.15
+        # present weather codes, only used if observation indicator is 0, digit 2 is rain & 4-5 snow, 9 is none
+        observed = numeric_field(26) == 0
+        codes = np.array([code.strip().strip('\'"').rjust(9, '9') for code in columns[27]]) \
+            if field_num > 27 else np.full(len(rows), '999999999')
+        code_digits = codes.view('<U1').reshape(len(rows), -1)[:, :9]
+        rain_code = observed & (code_digits[:, 1] != '9')
+        snow_code = observed & ((code_digits[:, 3] != '9') | (code_digits[:, 4] != '9'))
+        data['is_raining'] = (np.nan_to_num(data['liquid_precipitation']) > 0) | rain_code
+        data['is_snowing'] = snow_code
+        return data
+
+    def get(self, weather_metric: str) -> np.ndarray:
+        """Returns an entire weather metric (or time field) column, no copy."""
+
+        return self.data[weather_metric]
+
+    def get_index(self, month: int, day: int, hour: int, record: int = 1) -> int:
+        """
+        Returns the row index of a given time.
+
+        :param month: month of year, 1-12
+        :param day: day of month
+        :param hour: EPW hour of day, 1-24, the hour ending at this time
+        :param record: record within the hour, for sub-hourly EPWs, 1 to timesteps per hour
+        """
+        matches = np.flatnonzero((self.data['month'] == month) & (self.data['day'] == day) &
+                                 (self.data['hour'] == hour))
+        if len(matches) < record:
+            raise ValueError(f'ERROR: No EPW data for month [{month}], day [{day}], hour [{hour}], record [{record}].')
+        return int(matches[record - 1])
+
+    def get_forecast(self, weather_metrics: list, start_index: int, horizon: int) -> np.ndarray:
+        """
+        Returns a look-ahead window of weather metrics, wrapping around the end of the weather file.
+
+        :param weather_metrics: list of weather metric names, see EmsPy.available_weather_metrics
+        :param start_index: row index to start the window at, see get_index()
+        :param horizon: number of rows (records) in the window
+        :return: array of weather data, (weather metrics, horizon)
+        """
+        window = np.arange(start_index, start_index + horizon) % len(self.data)
+        return np.stack([self.data[weather_metric][window] for weather_metric in weather_metrics])
+
+    def get_forecasts(self, weather_metrics: list, horizon: int) -> np.ndarray:
+        """
+        Returns the look-ahead window of every row at once, i.e. a forecast feature dataset.
+
+        :param weather_metrics: list of weather metric names, see EmsPy.available_weather_metrics
+        :param horizon: number of rows (records) in each window
+        :return: array of weather data, (rows, weather metrics, horizon), read-only views of one padded copy
+        """
+        # pad with wrapped start of year, then take zero-copy sliding windows
+        metrics = np.stack([self.data[weather_metric] for weather_metric in weather_metrics])
+        padded = np.concatenate([metrics, metrics[:, :horizon - 1]], axis=1)
+        windows = np.lib.stride_tricks.sliding_window_view(padded, horizon, axis=1)
+        return windows[:, :len(self.data)].transpose(1, 0, 2)
+
+    def to_df(self) -> pd.DataFrame:
+        """Returns all weather data as a dataframe."""
+
+        return pd.DataFrame(self.data)
@@ -0,0 +1,13 @@
+"""
+Pure-Python stand-in for the EnergyPlus Python API, so EmsPy can be benchmarked and tested without an E+ install.
+
+This directory is a drop-in E+ 'ep_path', pass FAKE_EP_PATH as the ep_path of EmsPy/BcaEnv and its pyenergyplus package
+is imported instead of E+'s. It drives the real EmsPy/BcaEnv callback code through warmup and every zone timestep of the
+model's RunPeriod, serving synthetic handles and values. See pyenergyplus/api.py for its settings.
+
+CAUTION: once imported, this pyenergyplus package shadows the real one for the rest of the process.
+"""
+
+import os
+
+FAKE_EP_PATH = os.path.dirname(os.path.abspath(__file__))
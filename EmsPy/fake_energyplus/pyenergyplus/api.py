@@ -0,0 +1,256 @@
+"""
+Fake EnergyPlus Python API, the same EnergyPlusAPI interface (state_manager, runtime, exchange) EmsPy uses.
+
+A simulation runs the setup calling points, then warmup and run period days of zone timesteps, calling each registered
+callback at its calling point in E+ order. Timestep and RunPeriod are read from the .idf passed to run_energyplus(),
+annual at 6 timesteps an hour by default. Handles are assigned in order of request and all values are deterministic
+synthetic functions of handle and time. Module level settings below can be changed before running.
+"""
+
+import re
+import math
+import datetime
+import calendar
+
+WARMUP_DAYS = 1  # warmup days ran before the run period, with the warmup flag set
+SYSTEM_ITERATIONS = 2  # calls per zone timestep of callback_inside_system_iteration_loop
+YEAR = 2001  # year of run period dates, non-leap
+INVALID_NAME = 'INVALID'  # handle requests with this in any name return -1, to test ToC validation
+
+SETUP_CALLING_POINTS = ['callback_after_component_get_input', 'callback_end_zone_sizing',
+                        'callback_end_system_sizing', 'callback_begin_new_environment']
+ZONE_TIMESTEP_CALLING_POINTS = ['callback_begin_zone_timestep_before_set_current_weather',
+                                'callback_begin_zone_timestep_before_init_heat_balance',
+                                'callback_begin_zone_timestep_after_init_heat_balance',
+                                'callback_begin_system_timestep_before_predictor',
+                                'callback_after_predictor_before_hvac_managers',
+                                'callback_after_predictor_after_hvac_managers',
+                                'callback_inside_system_iteration_loop',
+                                'callback_end_system_timestep_before_hvac_reporting',
+                                'callback_end_system_timestep_after_hvac_reporting',
+                                'callback_end_zone_timestep_before_zone_reporting',
+                                'callback_end_zone_timestep_after_zone_reporting']
+ALL_CALLING_POINTS = SETUP_CALLING_POINTS + ['callback_after_new_environment_warmup_complete'] + \
+    ZONE_TIMESTEP_CALLING_POINTS
+
+
+class State:
+    """Simulation state, the opaque state pointer of E+."""
+
+    def __init__(self):
+        self.callbacks = {}  # key: calling point, val: list of callback functions
+        self.handles = {}  # key: (handle type, names), val: handle
+        self.actuated = {}  # key: actuator handle, val: setpoint
+        self.ready = False
+        self.warmup = True
+        self.stop = False
+        self.timesteps = 6
+        self.date = datetime.date(YEAR, 1, 1)
+        self.hour = 0
+        self.timestep = 1
+
+
+class StateManager:
+
+    def new_state(self) -> State:
+        return State()
+
+    def reset_state(self, state: State):
+        state.__init__()
+
+    def delete_state(self, state: State):
+        state.callbacks.clear()
+
+
+def _parse_idf(idf_file: str) -> tuple:
+    """Returns the timesteps per hour and RunPeriod (begin, end) dates of an .idf, defaults if not readable."""
+
+    timesteps, begin, end = 6, datetime.date(YEAR, 1, 1), datetime.date(YEAR, 12, 31)
+    try:
+        with open(idf_file, 'r') as idf:
+            idf_text = re.sub(r'!.*', '', idf.read())
+    except (OSError, TypeError):
+        return timesteps, begin, end
+    weekdays = [day.lower() for day in calendar.day_name]
+    for idf_obj in idf_text.split(';'):
+        fields = [field.strip() for field in idf_obj.split(',')]
+        try:
+            if fields[0].lower() == 'timestep':
+                timesteps = int(fields[1])
+            elif fields[0].lower() == 'runperiod':
+                if len(fields) > 6 and fields[6].lower() in weekdays:  # pre E+ 9.0 RunPeriod
+                    begin_month, begin_day, end_month, end_day = fields[2:6]
+                else:
+                    begin_month, begin_day, _, end_month, end_day = fields[2:7]
+                begin = datetime.date(YEAR, int(begin_month), int(begin_day))
+                end = datetime.date(YEAR, int(end_month), int(end_day))
+        except (IndexError, ValueError):
+            continue
+    return timesteps, begin, end
+
+
+class Runtime:
+
+    def __init__(self):
+        for calling_point in ALL_CALLING_POINTS:
+            setattr(self, calling_point, self._registrar(calling_point))
+
+    @staticmethod
+    def _registrar(calling_point: str):
+        def register_callback(state: State, fxn):
+            state.callbacks.setdefault(calling_point, []).append(fxn)
+        return register_callback
+
+    @staticmethod
+    def _call(state: State, calling_point: str):
+        for fxn in state.callbacks.get(calling_point, ()):
+            fxn(state)
+
+    def run_energyplus(self, state: State, command_line_args: list) -> int:
+        """Runs the fake simulation of the .idf, the last command line arg, returns 0 on success."""
+
+        state.timesteps, begin, end = _parse_idf(command_line_args[-1] if command_line_args else None)
+        if end < begin:  # run period wraps around new year
+            end = end.replace(year=YEAR + 1)
+        run_days = [begin + datetime.timedelta(days=d) for d in range((end - begin).days + 1)]
+
+        state.stop = False
+        state.ready = False
+        state.warmup = True
+        self._call(state, 'callback_after_component_get_input')
+        state.ready = True
+        for calling_point in SETUP_CALLING_POINTS[1:]:
+            self._call(state, calling_point)
+
+        zone_calling_points = [(calling_point, SYSTEM_ITERATIONS if calling_point.endswith('iteration_loop') else 1)
+                               for calling_point in ZONE_TIMESTEP_CALLING_POINTS]
+        for warmup, days in [(True, run_days[:WARMUP_DAYS]), (False, run_days)]:
+            state.warmup = warmup
+            if not warmup:
+                self._call(state, 'callback_after_new_environment_warmup_complete')
+            for date in days:
+                state.date = date
+                for hour in range(24):
+                    state.hour = hour
+                    for timestep in range(1, state.timesteps + 1):
+                        state.timestep = timestep
+                        for calling_point, iterations in zone_calling_points:
+                            for _ in range(iterations):
+                                self._call(state, calling_point)
+                        if state.stop:
+                            return 1
+        return 0
+
+    def stop_simulation(self, state: State):
+        state.stop = True
+
+
+class DataExchange:
+
+    # time
+    def api_data_fully_ready(self, state: State) -> bool:
+        return state.ready
+
+    def warmup_flag(self, state: State) -> bool:
+        return state.warmup
+
+    def zone_time_step(self, state: State) -> float:
+        return 1 / state.timesteps
+
+    def zone_time_step_number(self, state: State) -> int:
+        return state.timestep
+
+    def year(self, state: State) -> int:
+        return state.date.year
+
+    def month(self, state: State) -> int:
+        return state.date.month
+
+    def day_of_month(self, state: State) -> int:
+        return state.date.day
+
+    def hour(self, state: State) -> int:
+        return state.hour
+
+    def minutes(self, state: State) -> int:
+        return state.timestep * 60 // state.timesteps  # end of timestep, 60 at end of hour as in E+
+
+    def current_time(self, state: State) -> float:
+        return state.hour + state.timestep / state.timesteps
+
+    def actual_time(self, state: State) -> float:
+        return self.current_time(state)
+
+    def actual_date_time(self, state: State) -> float:
+        return state.date.timetuple().tm_yday * 24 + self.current_time(state)
+
+    # handles
+    @staticmethod
+    def _handle(state: State, handle_type: str, *names) -> int:
+        if any(INVALID_NAME in name.upper() for name in names):
+            return -1
+        key = (handle_type,) + tuple(name.upper() for name in names)
+        return state.handles.setdefault(key, len(state.handles))
+
+    def get_variable_handle(self, state: State, variable_name: str, variable_key: str) -> int:
+        return self._handle(state, 'variable', variable_name, variable_key)
+
+    def get_internal_variable_handle(self, state: State, variable_type: str, variable_key: str) -> int:
+        return self._handle(state, 'internal variable', variable_type, variable_key)
+
+    def get_meter_handle(self, state: State, meter_name: str) -> int:
+        return self._handle(state, 'meter', meter_name)
+
+    def get_actuator_handle(self, state: State, component_type: str, control_type: str, actuator_key: str) -> int:
+        return self._handle(state, 'actuator', component_type, control_type, actuator_key)
+
+    # values
+    @staticmethod
+    def _value(state: State, handle: int) -> float:
+        """Daily cycle of a phase and offset unique to each handle."""
+
+        return 20 + (handle % 10) + 5 * math.sin(2 * math.pi * (state.hour + state.timestep / state.timesteps) / 24
+                                                 + handle)
+
+    def get_variable_value(self, state: State, handle: int) -> float:
+        return self._value(state, handle)
+
+    def get_internal_variable_value(self, state: State, handle: int) -> float:
+        return 100.0 + handle  # static
+
+    def get_meter_value(self, state: State, handle: int) -> float:
+        return 1000 * (1 + self._value(state, handle))
+
+    def get_actuator_value(self, state: State, handle: int) -> float:
+        return state.actuated.get(handle, self._value(state, handle))
+
+    def set_actuator_value(self, state: State, handle: int, value: float):
+        state.actuated[handle] = value
+
+    def reset_actuator(self, state: State, handle: int):
+        state.actuated.pop(handle, None)
+
+    # weather
+    def sun_is_up(self, state: State) -> bool:
+        return 6 <= state.hour < 18
+
+    def __getattr__(self, name: str):
+        """Serves today_weather_<metric>_at_time & tomorrow_weather_<metric>_at_time(state, hour, timestep)."""
+
+        match = re.match(r'(today|tomorrow)_weather_(\w+)_at_time$', name)
+        if match is None:
+            raise AttributeError(name)
+        offset = 24 if match.group(1) == 'tomorrow' else 0
+        phase = sum(map(ord, match.group(2)))
+
+        def weather_at_time(state: State, hour: int, timestep: int) -> float:
+            return 10 + 10 * math.sin(2 * math.pi * (hour + offset + timestep / state.timesteps) / 24 + phase)
+        return weather_at_time
+
+
+class EnergyPlusAPI:
+
+    def __init__(self):
+        self.state_manager = StateManager()
+        self.runtime = Runtime()
+        self.exchange = DataExchange()
@@ -0,0 +1,63 @@
+import logging
+
+import pytest
+
+from EmsPy import emspy
+from EmsPy.fake_energyplus import FAKE_EP_PATH
+
+STATE_CP = 'callback_after_predictor_after_hvac_managers'
+ACT_CP = 'callback_begin_system_timestep_before_predictor'
+TIMESTEPS = 4
+
+emspy.set_log_level(logging.WARNING)
+
+
+@pytest.fixture
+def idf_file(tmp_path):
+    """A 2 day, 4 timesteps/hr model for the fake E+ API, 192 zone timesteps."""
+
+    idf = tmp_path / 'model.idf'
+    idf.write_text(f'Timestep, {TIMESTEPS};\nRunPeriod, Test, 1, 1, , 1, 2, , ;\n')
+    return str(idf)
+
+
+@pytest.fixture
+def make_sim(idf_file, tmp_path):
+    """Builds a BcaEnv on the fake E+ API, run with run(sim)."""
+
+    def make(var_tc=None, meter_tc=None, actuator_tc=None, weather_tc=None):
+        var_tc = var_tc if var_tc is not None else {'zone_temp': ['Zone Air Temperature', 'Zone 1']}
+        actuator_tc = actuator_tc if actuator_tc is not None else \
+            {'cool_sp': ['Zone Temperature Control', 'Cooling Setpoint', 'Zone 1']}
+        return emspy.BcaEnv(FAKE_EP_PATH, idf_file, TIMESTEPS, var_tc, None, meter_tc, actuator_tc, weather_tc)
+
+    return make
+
+
+@pytest.fixture
+def run(tmp_path):
+    def run_sim(sim):
+        sim.run_env(str(tmp_path / 'weather.epw'), str(tmp_path / 'out'))
+        return sim
+    return run_sim
+
+
+@pytest.fixture
+def log_records():
+    """Records all EmsPy messages, NOTEs included."""
+
+    class ListHandler(logging.Handler):
+        def __init__(self):
+            super().__init__()
+            self.records = []
+
+        def emit(self, record):
+            self.records.append(record)
+
+    handler = ListHandler()
+    level = emspy.logger.level
+    emspy.logger.addHandler(handler)
+    emspy.set_log_level(logging.INFO)
+    yield handler.records
+    emspy.logger.removeHandler(handler)
+    emspy.set_log_level(level)
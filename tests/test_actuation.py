@@ -0,0 +1,48 @@
+import numpy as np
+
+from conftest import STATE_CP
+
+
+def setpoint_schedule(sim, schedule):
+    """Actuation function setting the cooling setpoint from the given fxn of the total timestep count."""
+
+    return lambda: {'cool_sp': schedule(sim.timestep_total_count)}
+
+
+def test_unchanged_setpoints_are_coalesced_and_run_length_encoded(make_sim, run):
+    sim = make_sim()
+    sim.set_calling_point_and_callback_function(
+        STATE_CP, None, setpoint_schedule(sim, lambda count: 22.0 if count <= 96 else 24.0), True)
+    run(sim)
+
+    assert sim.actuator_writes == 2
+    assert sim.actuator_writes_skipped == 190
+    np.testing.assert_array_equal(sim.data_setpoint_changes_cool_sp, [0, 96])
+    # expanded back to the setpoint at each actuation
+    np.testing.assert_array_equal(sim.data_setpoint_cool_sp, [22.0] * 96 + [24.0] * 96)
+    # actuator values read at each state update are those written after the previous one
+    assert (sim.get_df(['actuator'])['actuator']['cool_sp'][1:] == sim.data_setpoint_cool_sp[:-1]).all()
+
+
+def test_write_coalescing_disabled(make_sim, run):
+    sim = make_sim()
+    sim.actuator_write_coalescing = False
+    sim.set_calling_point_and_callback_function(STATE_CP, None, setpoint_schedule(sim, lambda count: 22.0), True)
+    run(sim)
+
+    assert sim.actuator_writes == 192
+    assert sim.actuator_writes_skipped == 0
+    assert len(sim.data_setpoint_changes_cool_sp) == 192
+    np.testing.assert_array_equal(sim.data_setpoint_cool_sp, [22.0] * 192)
+
+
+def test_relinquished_setpoint_is_nan(make_sim, run):
+    sim = make_sim()
+    sim.set_calling_point_and_callback_function(
+        STATE_CP, None, setpoint_schedule(sim, lambda count: 22.0 if count <= 10 else None), True)
+    run(sim)
+
+    assert sim.actuator_writes == 2
+    setpoints = sim.data_setpoint_cool_sp
+    np.testing.assert_array_equal(setpoints[:10], [22.0] * 10)
+    assert np.isnan(setpoints[10:]).all()
@@ -0,0 +1,32 @@
+from EmsPy import emspy
+from EmsPy.fake_energyplus import FAKE_EP_PATH
+
+from conftest import STATE_CP, TIMESTEPS
+
+TC = {'var': {'zone_temp': ['Zone Air Temperature', 'Zone 1']}}
+
+
+def observe_agent(sim):
+    sim.set_calling_point_and_callback_function(STATE_CP, lambda: None, None, True, 1, 1)
+
+
+def no_callback_agent(sim):
+    pass
+
+
+def broken_agent(sim):
+    raise ValueError('broken agent')
+
+
+def test_failed_job_does_not_abort_batch(idf_file, tmp_path):
+    runner = emspy.BatchSimulationRunner(FAKE_EP_PATH, TIMESTEPS, str(tmp_path / 'out'), max_workers=2)
+    weather = str(tmp_path / 'weather.epw')
+    runner.add_job(idf_file, weather, TC, observe_agent)
+    runner.add_job(idf_file, weather, TC, broken_agent)
+    runner.add_job(idf_file, weather, TC, no_callback_agent)
+
+    observed, failed, no_callbacks = runner.run()
+
+    assert len(observed['var']) == 192
+    assert failed is None
+    assert no_callbacks == {}  # observation only, nothing collected is not a failure
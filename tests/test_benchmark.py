@@ -0,0 +1,20 @@
+import pandas as pd
+
+from EmsPy.Testscripts import emspy_benchmark
+
+
+def test_benchmark_smoke(tmp_path):
+    result = emspy_benchmark.run_benchmark(20, 1, 4, str(tmp_path), latency_calls=10)
+
+    assert result['callbacks'] == 96
+    assert result['callbacks/s'] > 0 and result['bytes/sample'] > 0
+
+
+def test_compare_to_baseline():
+    baseline = pd.DataFrame([{'metrics': 10, 'callbacks/s': 1000.0, 'bytes/sample': 8.0, 'get_ems_data (us)': 10.0,
+                              'get_df (ms)': 5.0}])
+    results = baseline.assign(**{'callbacks/s': 700.0, 'get_df (ms)': 5.5})
+
+    regressions = emspy_benchmark.compare_to_baseline(results, baseline, 0.25)
+
+    assert len(regressions) == 1 and '[callbacks/s]' in regressions[0]
@@ -0,0 +1,51 @@
+import pytest
+
+ITERATION_CP = 'callback_inside_system_iteration_loop'  # fires twice per zone timestep with the fake E+ API
+
+
+def count_calls(calls):
+    def observation_fxn():
+        calls.append(1)
+    return observation_fxn
+
+
+def test_no_dedup_stores_every_firing(make_sim, run):
+    calls = []
+    sim = make_sim()
+    sim.set_callback_dedup(None)
+    sim.set_calling_point_and_callback_function(ITERATION_CP, count_calls(calls), None, True)
+    run(sim)
+
+    assert len(calls) == 384
+    assert len(sim.time_x) == 384
+
+
+def test_dedup_first(make_sim, run):
+    calls = []
+    sim = make_sim()
+    sim.set_callback_dedup('first')
+    sim.set_calling_point_and_callback_function(ITERATION_CP, count_calls(calls), None, True)
+    run(sim)
+
+    assert len(calls) == 192
+    assert len(sim.time_x) == 192
+    assert sim.callback_dedup_counts[ITERATION_CP] == 192
+    assert len(sim.get_df(['var'])['var']) == 192
+
+
+def test_dedup_latest(make_sim, run):
+    calls = []
+    sim = make_sim()
+    sim.set_callback_dedup('latest', [ITERATION_CP])
+    sim.set_calling_point_and_callback_function(ITERATION_CP, count_calls(calls), None, True)
+    run(sim)
+
+    assert len(calls) == 384  # agent still sees every firing
+    assert len(sim.time_x) == 192
+    assert len(sim.data_var_zone_temp) == 192
+    assert sim.callback_dedup_counts[ITERATION_CP] == 192
+
+
+def test_invalid_dedup_mode(make_sim):
+    with pytest.raises(Exception, match='dedup mode'):
+        make_sim().set_callback_dedup('all')
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from EmsPy.emspy import EmsCallbackTiming
+
+from conftest import ACT_CP, STATE_CP
+
+OBSERVATION = EmsCallbackTiming.stages.index('Observation')
+# observation times (s), binned at 1 bin per decade from 1e-6 to 1 s, NaN if not ran
+OBSERVATION_TIMES = [2e-6, 5e-5, 0.5, 1e-9, 10.0, np.nan, 3e-6]
+OBSERVATION_BINS = [3, 1, 0, 0, 0, 2]  # clipped below min & above max times
+
+
+def record_samples(timing: EmsCallbackTiming):
+    """Records a callback of calling point 1 per observation time, each taking 1 ms after 2 ms of E+."""
+
+    clock = 0.0
+    for observation in OBSERVATION_TIMES:
+        clock += 2e-3
+        timing.record(1, clock, clock + 1e-3, 1e-5, 1e-5, observation, np.nan, 1e-6)
+        clock += 1e-3
+
+
+@pytest.mark.parametrize('keep_samples', [True, False])
+def test_histogram_binning(keep_samples):
+    timing = EmsCallbackTiming(['a', 'b'], capacity=4, keep_samples=keep_samples, min_time=1e-6, max_time=1.0,
+                               bins_per_decade=1)
+    assert timing.bin_num == 6
+    np.testing.assert_allclose(timing.bin_edges, np.logspace(-6, 0, 7))
+
+    record_samples(timing)
+    summary = timing.summary()
+
+    np.testing.assert_array_equal(timing.histograms[1, OBSERVATION], OBSERVATION_BINS)
+    assert not timing.histograms[0].any()
+    observation = summary.loc[('b', 'Observation')]
+    assert observation['count'] == 6
+    assert observation['total (s)'] == pytest.approx(np.nansum(OBSERVATION_TIMES))
+    assert observation['max (us)'] == pytest.approx(10.0 * 1e6)
+    assert observation['p50 (us)'] == pytest.approx(1e-5 * 1e6)  # upper edge of the bin of the 3rd time
+    assert observation['p95 (us)'] == pytest.approx(1.0 * 1e6)
+    # E+ time of the first callback is unknown
+    assert summary.loc[('b', 'E+'), 'count'] == 6
+    assert summary.loc[('b', 'E+'), 'mean (us)'] == pytest.approx(2e3)
+    assert summary.loc[('b', 'Callback'), 'mean (us)'] == pytest.approx(1e3)
+    assert summary.loc[('b', 'E+'), 'share (%)'] + summary.loc[('b', 'Callback'), 'share (%)'] == \
+        pytest.approx(100)
+    assert ('b', 'Actuation') not in summary.index
+    # summaries do not re-bin samples
+    np.testing.assert_array_equal(timing.summary().values, summary.values)
+
+    df = timing.get_df()
+    if keep_samples:
+        assert len(df) == len(OBSERVATION_TIMES)
+        assert (df['Calling Point'] == 'b').all()
+        np.testing.assert_array_equal(df['Observation'], OBSERVATION_TIMES)
+        assert np.isnan(df['E+'][0]) and df['E+'][1:].to_numpy() == pytest.approx(2e-3)
+    else:
+        assert len(df) < timing.samples.capacity  # binned batches are cleared
+
+    timing.clear()
+    assert timing.summary().empty
+    assert timing.report() == 'No callback timing recorded.'
+
+
+def test_callback_timing_of_simulation(make_sim, run):
+    sim = make_sim()
+    sim.set_calling_point_and_callback_function(STATE_CP, lambda: 1.0, lambda: {'cool_sp': 22.0}, True)
+    sim.set_calling_point_and_callback_function(ACT_CP, None, lambda: {'cool_sp': 23.0}, True, 1, 2)
+    sim.init_callback_timing()
+    run(sim)
+
+    summary = sim.get_callback_timing_df(summary=True)
+    counts = summary['count']
+    assert (counts[STATE_CP] == 192).all()
+    assert 'Observation' not in counts[ACT_CP]
+    assert counts[(ACT_CP, 'Actuation')] == 96
+    assert counts[(ACT_CP, 'Callback')] == 192
+    assert summary.xs('E+', level='Stage')['share (%)'].sum() + \
+        summary.xs('Callback', level='Stage')['share (%)'].sum() == pytest.approx(100)
+
+    df = sim.get_callback_timing_df()
+    assert len(df) == 384
+    assert (df['Calling Point'].value_counts()[[STATE_CP, ACT_CP]] == 192).all()
+    assert df['Callback'].sum() == pytest.approx(summary.xs('Callback', level='Stage')['total (s)'].sum())
+    assert (df['Callback'] >= df[['Update Time', 'Sampling', 'Actuation']].max(axis=1)).all()
+
+    report = sim.get_callback_timing_report(log=False)
+    assert report.startswith('Callback Timing: E+ [')
+    assert STATE_CP in report and ACT_CP in report
+
+
+def test_callback_timing_must_be_enabled(make_sim):
+    with pytest.raises(Exception, match='not enabled'):
+        make_sim().get_callback_timing_df()
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from conftest import STATE_CP
+
+LATER_CP = 'callback_end_zone_timestep_after_zone_reporting'
+
+
+def test_custom_dataframes(make_sim, run):
+    sim = make_sim()
+    sim.set_calling_point_and_callback_function(STATE_CP, lambda: float(sim.timestep_total_count),
+                                                lambda: {'cool_sp': 20.0 + sim.timestep_total_count % 3}, True)
+    sim.init_custom_dataframe_dict('every_other', STATE_CP, 2, ['zone_temp', 'setpoint_cool_sp', 'rewards'])
+    sim.init_custom_dataframe_dict('later_cp', LATER_CP, 1, ['zone_temp'])
+    sim.set_calling_point_and_callback_function(LATER_CP, None, None, False)
+    run(sim)
+    dfs = sim.get_df(['every_other', 'later_cp'])
+    df = dfs['every_other']
+
+    assert len(df) == 96
+    np.testing.assert_array_equal(df['Timestep'].unique(), [2, 4])
+    # most recent sample of each metric, taken every other zone timestep
+    np.testing.assert_array_equal(df['zone_temp'], sim.data_var_zone_temp[1::2])
+    np.testing.assert_array_equal(df['setpoint_cool_sp'], sim.data_setpoint_cool_sp[1::2])
+    np.testing.assert_array_equal(df['rewards'], sim.rewards[1::2])
+    # updated at a calling point without state updates, from the most recent one
+    assert len(dfs['later_cp']) == 192
+    np.testing.assert_array_equal(dfs['later_cp']['zone_temp'], sim.data_var_zone_temp)
+
+
+def test_invalid_custom_dataframe_metric(make_sim):
+    with pytest.raises(Exception, match='Incorrect EMS metric name'):
+        make_sim().init_custom_dataframe_dict('df', STATE_CP, 1, ['not_a_metric'])
@@ -0,0 +1,44 @@
+import pandas as pd
+import pytest
+
+from conftest import STATE_CP
+
+pytest.importorskip('pyarrow')
+
+
+def run_agent(sim, run):
+    def observation_fxn():
+        return -abs(sim.get_ems_data(['zone_temp']) - 22.0)  # reward
+
+    def actuation_fxn():
+        return {'cool_sp': 22.0 if sim.timestep_total_count % 40 < 20 else 24.0}
+
+    sim.init_custom_dataframe_dict('temps', STATE_CP, 2, ['zone_temp', 'setpoint_cool_sp'])
+    sim.set_calling_point_and_callback_function(STATE_CP, observation_fxn, actuation_fxn, True)
+    return run(sim)
+
+
+@pytest.mark.parametrize('file_format', ['parquet', 'arrow'])
+def test_streamed_dataframes_match_in_memory(make_sim, run, tmp_path, file_format):
+    expected_dfs = run_agent(make_sim(), run).get_df()
+    sim = make_sim()
+    sim.init_data_sink(str(tmp_path / 'sink'), chunk_size=50, keep_history=2, file_format=file_format)
+    dfs = run_agent(sim, run).get_df()
+
+    assert set(dfs) == set(expected_dfs)
+    for df_name, expected_df in expected_dfs.items():
+        pd.testing.assert_frame_equal(dfs[df_name].reset_index(drop=True), expected_df.reset_index(drop=True),
+                                      check_dtype=False, check_categorical=False)
+    assert len(sim.time_x) <= 52  # bounded history kept in memory
+
+
+def test_lazy_reader_chunks(make_sim, run, tmp_path):
+    sim = make_sim()
+    sim.init_data_sink(str(tmp_path / 'sink'), chunk_size=50)
+    run_agent(sim, run)
+    reader = sim.get_data_sink_reader()
+
+    assert {'var', 'actuator', 'reward', 'temps'} <= set(reader.df_names)
+    chunks = list(reader.iter_chunks('var', columns=['zone_temp']))
+    assert sum(len(chunk) for chunk in chunks) == 192
+    assert list(chunks[0].columns) == ['zone_temp']
@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+
+from EmsPy.emspy import EmsDataStore
+
+from conftest import ACT_CP, STATE_CP
+
+
+def test_append_and_get():
+    data_store = EmsDataStore(capacity=4)
+    data_store.add_column('a')
+    data_store.add_column('b', np.int64)
+    for i in range(3):
+        data_store.append('a', i * 1.5)
+    data_store.append_at(data_store.column_index['b'], 7)
+
+    np.testing.assert_array_equal(data_store.get('a'), [0.0, 1.5, 3.0])
+    assert data_store.get('b').dtype == np.int64
+    assert data_store.length('a') == 3 and data_store.length('b') == 1
+    assert 'a' in data_store and 'c' not in data_store
+    with pytest.raises(ValueError):
+        data_store.add_column('a')
+
+
+def test_grow_preserves_data():
+    data_store = EmsDataStore(capacity=2)
+    data_store.add_column('a')
+    for i in range(9):
+        data_store.append('a', i)
+
+    np.testing.assert_array_equal(data_store.get('a'), np.arange(9))
+    assert len(data_store.arrays[0]) == 16  # doubled from 2
+
+
+def test_last():
+    data_store = EmsDataStore(capacity=4)
+    data_store.add_column('a')
+    with pytest.raises(IndexError):
+        data_store.last('a')
+    data_store.append('a', 1.0)
+    data_store.append('a', 2.0)
+    assert data_store.last('a') == 2.0
+    data_store.clear()
+    with pytest.raises(IndexError):
+        data_store.last('a')
+
+
+def test_sample_shape():
+    data_store = EmsDataStore(capacity=1)
+    data_store.add_column('rewards', shape=(2,))
+    data_store.append('rewards', (1.0, -1.0))
+    data_store.append('rewards', np.array([2.0, -2.0]))
+
+    assert data_store.get('rewards').shape == (2, 2)
+    np.testing.assert_array_equal(data_store.last('rewards'), [2.0, -2.0])
+
+
+def test_column_periods_and_capacity():
+    data_store = EmsDataStore(capacity=12)
+    data_store.add_column('a')
+    data_store.add_column('hourly')
+    data_store.set_column_period('hourly', 4)
+    assert len(data_store.arrays[1]) == 3
+
+    data_store.append('hourly', 1.0)
+    data_store.set_capacity(2)
+    assert len(data_store.arrays[0]) == 2 and len(data_store.arrays[1]) == 1
+    np.testing.assert_array_equal(data_store.get('hourly'), [1.0])
+
+    data_store.remove_column('a')
+    assert 'a' not in data_store and data_store.arrays[0] is None
+    assert data_store.nbytes == data_store.arrays[1].nbytes
+
+
+def test_discard_head():
+    data_store = EmsDataStore(capacity=8)
+    data_store.add_column('a')
+    data_store.add_column('b')
+    for i in range(5):
+        data_store.append('a', i)
+    data_store.append('b', 1.0)
+    data_store.discard_head(2)
+
+    np.testing.assert_array_equal(data_store.get('a'), [3.0, 4.0])
+    np.testing.assert_array_equal(data_store.get('b'), [1.0])
+
+
+def test_data_attributes_are_data_store_views(make_sim, run):
+    sim = make_sim()
+    with pytest.raises(IndexError):
+        sim._data_store.last('hours')  # no time update yet
+    sim.set_calling_point_and_callback_function(STATE_CP, lambda: None, None, True)
+    run(sim)
+
+    assert len(sim.data_var_zone_temp) == len(sim.time_x) == 192
+    assert sim.data_var_zone_temp.base is not None  # no copy
+    assert sim.ems_current_data_dict['zone_temp'] == sim.data_var_zone_temp[-1]
+    with pytest.raises(AttributeError):
+        sim.data_var_not_a_metric
+
+
+def test_no_custom_dataframe_row_before_first_state_update(make_sim, run):
+    sim = make_sim()
+    sim.set_calling_point_and_callback_function(STATE_CP, lambda: None, None, True)
+    sim.set_calling_point_and_callback_function(ACT_CP, None, None, False)  # fires before the state update
+    sim.init_custom_dataframe_dict('early', ACT_CP, 1, ['zone_temp'])
+    run(sim)
+    df = sim.get_df(['early'])['early']
+
+    assert len(df) == 191
+    np.testing.assert_array_equal(df['zone_temp'], sim.data_var_zone_temp[:-1])
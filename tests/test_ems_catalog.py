@@ -0,0 +1,64 @@
+import os
+
+import pytest
+
+from EmsPy.ems_catalog import EmsCatalog
+
+EXAMPLE_OUT = os.path.join(os.path.dirname(__file__), '..', 'EnergyPlus-PythonAPI-Examples', 'api-example-copies',
+                           'PyEMS_CJE', 'out')
+
+
+def example_catalog() -> EmsCatalog:
+    return EmsCatalog(os.path.join(EXAMPLE_OUT, 'eplusout.rdd'), os.path.join(EXAMPLE_OUT, 'eplusout.edd'),
+                      os.path.join(EXAMPLE_OUT, 'eplusout.mdd'))
+
+
+def test_idf_format_dictionaries():
+    catalog = example_catalog()
+    assert len(catalog.variables) > 500
+    assert catalog.variables['ZONE AIR TEMPERATURE'] == ['Zone Air Temperature', 'C']
+    assert catalog.meters['ELECTRICITY:FACILITY'] == ['Electricity:Facility', 'J']
+    assert not any('HOURLY' in meter for meter in catalog.meters)
+    assert len(catalog.actuators) == 67
+
+
+def test_regular_format_dictionaries(tmp_path):
+    rdd = tmp_path / 'eplusout.rdd'
+    rdd.write_text('Program Version,EnergyPlus, Version 9.5.0\nVar Type (reported time step),Var Report Type,'
+                   'Variable Name [Units]\nZone,Average,Zone Air Temperature [C]\n')
+    mdd = tmp_path / 'eplusout.mdd'
+    mdd.write_text('Program Version,EnergyPlus, Version 9.5.0\nZone,Meter,Electricity:Facility [J]\n')
+    catalog = EmsCatalog(str(rdd), None, str(mdd))
+    assert catalog.variables == {'ZONE AIR TEMPERATURE': ['Zone Air Temperature', 'C']}
+    assert catalog.meters == {'ELECTRICITY:FACILITY': ['Electricity:Facility', 'J']}
+
+
+def test_validate():
+    catalog = example_catalog()
+    invalid = catalog.validate(var_tc={'oa_db': ['Site Outdoor Air Drybulb Temperature', 'Environment'],
+                                       'bad': ['Not A Variable', 'Zone 1']},
+                               meter_tc={'elec': 'Electricity:Facility'})
+    assert list(invalid) == ['bad']
+
+
+def test_cache_is_reused_until_a_source_file_changes_or_is_missing(tmp_path):
+    rdd = tmp_path / 'eplusout.rdd'
+    rdd.write_text('Program Version,EnergyPlus, Version 9.5.0\nZone,Average,Zone Air Temperature [C]\n')
+    cache_file = str(tmp_path / 'ems_catalog.json')
+    EmsCatalog(str(rdd), cache_file=cache_file)
+
+    cached = EmsCatalog(str(rdd), cache_file=cache_file)
+    assert cached._load_cache() is not None
+    assert cached.variables == {'ZONE AIR TEMPERATURE': ['Zone Air Temperature', 'C']}
+
+    # a changed source file is parsed again
+    rdd.write_text('Program Version,EnergyPlus, Version 9.5.0\nZone,Average,Zone Air Humidity Ratio []\n')
+    os.utime(rdd, (os.path.getmtime(cache_file) + 10,) * 2)
+    assert EmsCatalog(str(rdd), cache_file=cache_file).variables == {'ZONE AIR HUMIDITY RATIO': ['Zone Air Humidity '
+                                                                                                 'Ratio', '']}
+
+    # a missing source file makes the cache stale, rather than an error in checking its modified time
+    rdd.unlink()
+    assert cached._load_cache() is None
+    with pytest.raises(FileNotFoundError):
+        EmsCatalog(str(rdd), cache_file=cache_file)
@@ -0,0 +1,84 @@
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from EmsPy.epw import EpwWeather, STEFAN_BOLTZMANN
+
+EPW_FILE = os.path.join(os.path.dirname(__file__), '..', 'Resource_Files', 'reference_weather',
+                        '1A_USA_FL_MIAMI_TMY2.epw')
+
+
+@pytest.fixture
+def epw_file(tmp_path):
+    """First 2 days of the Miami TMY2 EPW, with missing values in rows 1-2 and rain in row 3."""
+
+    with open(EPW_FILE) as epw:
+        lines = [next(epw) for _ in range(8 + 48)]
+    fields = lines[9].rstrip('\n').split(',')
+    fields[6:10] = ['99.9', '99.9', '999', '999999']  # dry bulb, dew point, relative humidity, pressure
+    fields[10], fields[12], fields[14], fields[15] = '9999', '9999', '9999', '9999'  # radiation
+    fields[20:22] = ['999', '999']  # wind direction & speed
+    lines[9] = ','.join(fields + ['999', '999']) + '\n'  # albedo, liquid precipitation
+    fields = lines[10].rstrip('\n').split(',')
+    lines[10] = ','.join(fields + ['0.2', '1.5']) + '\n'
+    fields = lines[11].rstrip('\n').split(',')
+    fields[26:28] = ['0', '929999999']  # observed, rain
+    lines[11] = ','.join(fields) + '\n'
+    path = tmp_path / 'weather.epw'
+    path.write_text(''.join(lines))
+    return str(path)
+
+
+def test_parse_reference_epw(tmp_path):
+    weather = EpwWeather(EPW_FILE, cache_dir=str(tmp_path))
+
+    assert len(weather) == 8760
+    assert weather.location['city'] == 'MIAMI' and weather.location['latitude'] == 25.8
+    row = weather.data[0]
+    assert (row['month'], row['day'], row['hour']) == (1, 1, 1)
+    assert row['outdoor_dry_bulb'] == pytest.approx(20.0)
+    assert row['outdoor_relative_humidity'] == 73
+    assert row['sky_temperature'] == pytest.approx((362 / STEFAN_BOLTZMANN) ** 0.25 - 273.15, rel=1e-5)
+    assert not row['sun_is_up']
+    assert weather.get('sun_is_up')[weather.get_index(1, 1, 13)]
+    assert np.isnan(weather.get('albedo')).all()  # not in TMY2 converted EPWs
+    assert weather.get_forecasts(['outdoor_dry_bulb'], 24).shape == (8760, 1, 24)
+
+
+def test_missing_values(epw_file, tmp_path):
+    weather = EpwWeather(epw_file, use_cache=False)
+    missing_row, valid_row = weather.data[1], weather.data[2]
+
+    for metric in ['outdoor_dry_bulb', 'outdoor_dew_point', 'outdoor_relative_humidity',
+                   'outdoor_barometric_pressure', 'horizontal_ir', 'beam_solar', 'diffuse_solar', 'wind_direction',
+                   'wind_speed', 'albedo', 'liquid_precipitation', 'sky_temperature']:
+        assert np.isnan(missing_row[metric]), metric
+        assert not np.isnan(weather.data[0][metric]) or metric in ('albedo', 'liquid_precipitation'), metric
+    assert not missing_row['sun_is_up'] and not missing_row['is_raining']
+    assert valid_row['albedo'] == pytest.approx(0.2) and valid_row['liquid_precipitation'] == 1.5
+    assert valid_row['is_raining']
+    assert weather.data[3]['is_raining'] and not weather.data[3]['is_snowing']
+
+
+def test_npy_cache(epw_file, tmp_path):
+    cache_dir = tmp_path / 'cache'
+    cache_dir.mkdir()
+    weather = EpwWeather(epw_file, cache_dir=str(cache_dir))
+    assert os.path.exists(weather.cache_file)
+    assert not isinstance(weather.data, np.memmap)  # parsed
+
+    cached = EpwWeather(epw_file, cache_dir=str(cache_dir))
+    assert isinstance(cached.data, np.memmap)
+    pd.testing.assert_frame_equal(cached.to_df(), weather.to_df())
+
+    # source EPW changed since cached
+    shutil.copy(EPW_FILE, epw_file)
+    cache_time = os.path.getmtime(weather.cache_file)
+    os.utime(epw_file, (cache_time + 10, cache_time + 10))
+    reparsed = EpwWeather(epw_file, cache_dir=str(cache_dir))
+    assert not isinstance(reparsed.data, np.memmap)
+    assert len(reparsed) == 8760
+    assert len(EpwWeather(epw_file, cache_dir=str(cache_dir))) == 8760  # new cache reused
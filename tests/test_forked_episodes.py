@@ -0,0 +1,87 @@
+import logging
+import os
+
+import pytest
+
+from conftest import STATE_CP
+
+pytestmark = pytest.mark.skipif(not hasattr(os, 'fork'), reason='forked episodes require os.fork()')
+
+
+def episode_setpoint(sim, episode_index):
+    """Episode fxn, each episode holds its own cooling setpoint."""
+
+    sim.episode_setpoint = 20.0 + episode_index
+
+
+def make_episode_sim(make_sim):
+    sim = make_sim()
+    sim.episode_setpoint = None
+    sim.set_calling_point_and_callback_function(STATE_CP, None, lambda: {'cool_sp': sim.episode_setpoint}, True)
+    return sim
+
+
+def run_episodes(sim, tmp_path, num_episodes, episode_fxn, result_fxn=None):
+    return sim.run_forked_episodes(str(tmp_path / 'weather.epw'), num_episodes, episode_fxn, result_fxn,
+                                   str(tmp_path / 'out'))
+
+
+def failures(log_records) -> list:
+    return [record.getMessage() for record in log_records if record.levelno >= logging.WARNING]
+
+
+def test_episodes_return_their_own_results(make_sim, tmp_path, log_records):
+    sim = make_episode_sim(make_sim)
+
+    results = run_episodes(sim, tmp_path, 3, episode_setpoint,
+                           lambda episode: (episode._fork_episode_index, sorted(set(episode.data_setpoint_cool_sp))))
+
+    assert results == [(i, [20.0 + i]) for i in range(3)]
+    assert not failures(log_records)
+    # this instance is untouched by its episodes
+    assert sim.episode_setpoint is None
+    assert sim.timestep_total_count == 0
+
+
+def test_episode_default_result_is_its_dataframes(make_sim, tmp_path):
+    sim = make_episode_sim(make_sim)
+
+    results = run_episodes(sim, tmp_path, 2, episode_setpoint)
+
+    for i, dfs in enumerate(results):
+        assert len(dfs['var']) == 192
+        assert (dfs['actuator']['cool_sp'][1:] == 20.0 + i).all()
+
+
+def test_failed_episodes_are_reported_and_others_kept(make_sim, tmp_path, log_records):
+    def episode_fxn(episode, episode_index):
+        episode_setpoint(episode, episode_index)
+        if episode_index == 1:
+            raise ValueError('bad agent')
+        if episode_index == 2:
+            os._exit(3)  # dies without a result
+        if episode_index == 3:
+            episode.api.runtime.stop_simulation(episode.state)  # E+ fails
+
+    sim = make_episode_sim(make_sim)
+
+    results = run_episodes(sim, tmp_path, 5, episode_fxn, lambda episode: episode._fork_episode_index)
+
+    assert results == [0, None, None, None, 4]
+    messages = failures(log_records)
+    assert len(messages) == 3
+    assert 'Forked episode [1] FAILED: bad agent' in messages[0]
+    assert 'Forked episode [2] FAILED' in messages[1] and 'exited with code [3]' in messages[1]
+    assert 'Forked episode [3] FAILED' in messages[2] and 'E+ exit code [1]' in messages[2]
+
+
+def test_failed_warmup_fails_all_episodes(make_sim, tmp_path, log_records):
+    sim = make_episode_sim(make_sim)
+    sim.api.runtime.run_energyplus = lambda state, command_line_args: os._exit(5)
+
+    results = run_episodes(sim, tmp_path, 2, episode_setpoint)
+
+    assert results == [None, None]
+    messages = failures(log_records)
+    assert len(messages) == 2
+    assert all('warmup process exit code [5]' in message for message in messages)
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from conftest import STATE_CP
+
+
+def test_get_df_with_non_monotonic_datetimes(make_sim, run):
+    sim = make_sim()
+    # first day reported as Jan 15, like design days ran before the run period
+    day_of_month = sim.api.exchange.day_of_month
+    sim.api.exchange.day_of_month = lambda state: 15 if day_of_month(state) == 1 else day_of_month(state)
+
+    def observation_fxn():  # no reward for the first state updates, a shorter reward df
+        return float(sim.timestep_total_count) if sim.timestep_total_count > 10 else None
+
+    sim.set_calling_point_and_callback_function(STATE_CP, observation_fxn, None, True)
+    sim.init_custom_dataframe_dict('temps', STATE_CP, 4, ['zone_temp'])
+    run(sim)
+    dfs = sim.get_df()
+    all_df = dfs['all']
+
+    assert not all_df['Datetime'].is_monotonic_increasing
+    pd.testing.assert_series_equal(all_df['Datetime'], dfs['var']['Datetime'])
+    np.testing.assert_array_equal(all_df['zone_temp'], sim.data_var_zone_temp)
+    # most recent reward & custom df row at or before each row's time
+    np.testing.assert_array_equal(all_df['reward'].iloc[96:100], [97.0, 98.0, 99.0, 100.0])
+    assert all_df['reward'].iloc[10] == 11.0
+    assert all_df['reward'].iloc[0] == 192.0  # Jan 15 00:15 is after all of Jan 2
+    np.testing.assert_array_equal(all_df['zone_temp_temps'].iloc[96:100], [np.nan] * 3 +
+                                  [sim.data_var_zone_temp[99]])
+
+
+def test_get_df_returns_copies(make_sim, run):
+    sim = make_sim()
+    sim.set_calling_point_and_callback_function(STATE_CP, lambda: None, None, True)
+    run(sim)
+    df_var = sim.get_df()['var']
+    df_var.loc[:, 'zone_temp'] = 0.0
+
+    np.testing.assert_array_equal(sim.get_df()['var']['zone_temp'], sim.data_var_zone_temp)
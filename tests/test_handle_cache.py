@@ -0,0 +1,70 @@
+import hashlib
+import json
+
+import pytest
+
+from conftest import STATE_CP
+
+INVALID_VAR_TC = {'zone_temp': ['Zone Air Temperature', 'Zone 1'], 'bad': ['Zone Air Temperature', 'INVALID Zone']}
+
+
+@pytest.fixture
+def cached_sim(make_sim, tmp_path):
+    """Builds a sim with a handle cache, counting its handles resolved through the E+ API."""
+
+    def make(var_tc=None):
+        sim = make_sim(var_tc=var_tc)
+        sim.init_handle_cache(str(tmp_path / 'handles.json'))
+        sim.set_calling_point_and_callback_function(STATE_CP, lambda: None, None, True)
+        sim.handles_resolved = []
+        get_variable_handle = sim.api.exchange.get_variable_handle
+
+        def counted_get_variable_handle(state, *names):
+            sim.handles_resolved.append(names)
+            return get_variable_handle(state, *names)
+        sim.api.exchange.get_variable_handle = counted_get_variable_handle
+        return sim
+    return make
+
+
+def test_cache_hit_and_miss(cached_sim, run):
+    sim = run(cached_sim())
+    assert sim.handles_resolved == [('Zone Air Temperature', 'Zone 1')]
+
+    cached = run(cached_sim())
+    assert cached.handles_resolved == []
+    assert cached.handle_var_zone_temp == sim.handle_var_zone_temp
+    assert len(cached.data_var_zone_temp) == 192
+
+
+def test_cache_invalidated_when_idf_changes(cached_sim, run, idf_file, tmp_path):
+    sim = run(cached_sim())
+    with open(idf_file, 'a') as idf:
+        idf.write('! modified\n')
+
+    changed = run(cached_sim())
+    assert changed.handles_resolved == [('Zone Air Temperature', 'Zone 1')]
+    assert changed.handle_cache.model_key != sim.handle_cache.model_key
+    with open(tmp_path / 'handles.json') as cache:
+        assert set(json.load(cache)) == {sim.handle_cache.model_key, changed.handle_cache.model_key}
+
+
+def test_cached_invalid_handle_rejected_before_run(cached_sim, run):
+    with pytest.raises(Exception, match='could not be found. Please'):
+        run(cached_sim(INVALID_VAR_TC))
+
+    sim = cached_sim(INVALID_VAR_TC)
+    sim.api.runtime.run_energyplus = lambda *args: pytest.fail('simulation started')
+    with pytest.raises(Exception, match='could not be found in a prior run'):
+        run(sim)
+
+
+def test_sized_idf_is_hashed(cached_sim, run, tmp_path):
+    sized_idf_file = tmp_path / 'sized.idf'
+    sized_idf_file.write_text('Timestep, 4;\nRunPeriod, Test, 1, 1, , 1, 2, , ;\n! sized\n')
+    sim = cached_sim()
+    sim.init_sizing_cache(str(tmp_path / 'sizing'))
+    sim.sizing_cache.get_sized_idf = lambda idf_file, weather_file, run_sizing: str(sized_idf_file)
+    run(sim)
+
+    assert sim.handle_cache.model_key.startswith(hashlib.sha256(sized_idf_file.read_bytes()).hexdigest())
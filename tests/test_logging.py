@@ -0,0 +1,49 @@
+import logging
+
+import pytest
+
+from EmsPy import emspy
+
+from conftest import ACT_CP
+
+
+@pytest.fixture
+def log_messages():
+    """Records all emitted EmsPy messages, NOTEs included."""
+
+    messages = []
+    handler = logging.Handler()
+    handler.emit = lambda record: messages.append(record.getMessage())
+    level = emspy.logger.level
+    emspy.logger.addHandler(handler)
+    emspy.set_log_level(logging.INFO)
+    yield messages
+    emspy.logger.removeHandler(handler)
+    emspy.set_log_level(level)
+
+
+def test_runtime_events_are_rate_limited_per_call_site(make_sim, run, log_messages):
+    sim = make_sim()
+    sim.set_calling_point_and_callback_function(ACT_CP, None, lambda: None, False)
+    run(sim)
+
+    no_actuation = [msg for msg in log_messages if 'No actuators/values defined' in msg]
+    assert sim.log_event_counts['no_actuation'] == 192
+    # same call site, different formatted messages, all within one rate limit interval
+    assert len(no_actuation) == 5
+
+
+def test_other_messages_are_not_rate_limited(log_messages):
+    for _ in range(10):
+        emspy.logger.info('*NOTE: not rate limited')
+
+    assert len(log_messages) == 10
+
+
+def test_rate_limit_filter_evicts_expired_windows():
+    rate_limit_filter = emspy._RateLimitFilter(max_num=1, interval=0.0)
+    for lineno in range(100):
+        record = logging.LogRecord('EmsPy.events', logging.INFO, 'emspy.py', lineno, 'msg', None, None)
+        assert rate_limit_filter.filter(record)
+
+    assert len(rate_limit_filter._windows) <= 1
@@ -0,0 +1,163 @@
+import os
+
+import pytest
+
+from EmsPy.emspy import EnergyPlusModelModifier
+
+IDF_TEXT = """\
+!- ===========  ALL OBJECTS IN CLASS: TIMESTEP ===========
+
+Timestep,
+    6;                       !- Number of Timesteps per Hour
+
+RunPeriod,
+    Annual,                  !- Name
+    1,                       !- Begin Month
+    1,                       !- Begin Day of Month
+    ,                        !- Begin Year
+    12,                      !- End Month
+    31,                      !- End Day of Month
+    ,                        !- End Year
+    Sunday;                  !- Day of Week for Start Day
+
+Schedule:Compact,
+    Occupancy,               !- Name
+    Fraction,                !- Schedule Type Limits Name
+    Through: 12/31,          !- Field 1
+    For: AllDays,            !- Field 2
+    Until: 24:00, 1.0;       !- Field 3
+
+Schedule:Year,
+    Lighting,                !- Name
+    Fraction,                !- Schedule Type Limits Name
+    Lighting Week,           !- Schedule:Week Name 1
+    1, 1, 12, 31;            !- Start & End Dates 1
+
+Schedule:Week:Daily,
+    Lighting Week,           !- Name
+    Lighting Day, Lighting Day, Lighting Day, Lighting Day, Lighting Day, Lighting Day, Lighting Day,
+    Lighting Day, Lighting Day, Lighting Day, Lighting Day, Lighting Day;
+
+Schedule:Day:Interval,
+    Lighting Day,            !- Name
+    Fraction,                !- Schedule Type Limits Name
+    No,                      !- Interpolate to Timestep
+    24:00, 0.5;              !- Time & Value Until Time 1
+
+Schedule:File,
+    Plug Loads,              !- Name
+    Fraction,                !- Schedule Type Limits Name
+    schedules/plug_loads.csv,!- File Name
+    1,                       !- Column Number
+    0;                       !- Rows to Skip at Top
+
+ThermostatSetpoint:DualSetpoint,
+    Zone 1 Thermostat,       !- Name
+    Heating Setpoints,       !- Heating Setpoint Temperature Schedule Name
+    Cooling Setpoints;       !- Cooling Setpoint Temperature Schedule Name
+
+! end of model
+"""
+
+
+@pytest.fixture
+def idf_path(tmp_path):
+    idf = tmp_path / 'model.idf'
+    idf.write_text(IDF_TEXT)
+    return str(idf)
+
+
+def test_unmodified_round_trip_is_identical(idf_path, tmp_path):
+    model = EnergyPlusModelModifier(idf_path)
+    model.write(str(tmp_path / 'copy.idf'))
+
+    assert (tmp_path / 'copy.idf').read_text() == IDF_TEXT
+
+
+def test_edit_round_trip(idf_path, tmp_path):
+    model = EnergyPlusModelModifier(idf_path)
+    model.set_timestep(4)
+    model.set_run_period(1, 1, 1, 2)
+    model.set_schedule_constant('Occupancy', 0.5)
+    model.set_thermostat_setpoints('Zone 1 Thermostat', heating=20, cooling=24)
+    model.write(str(tmp_path / 'edited.idf'))
+
+    edited = EnergyPlusModelModifier(str(tmp_path / 'edited.idf'))
+    assert edited.get_object('Timestep') == ('Timestep', '4')
+    assert edited.get_object('RunPeriod', 'Annual')[2:9] == ('1', '1', '', '1', '2', '', 'Sunday')
+    assert edited.get_object('Schedule:Constant', 'Occupancy') == ('Schedule:Constant', 'Occupancy', 'Fraction',
+                                                                   '0.5')
+    assert edited.get_objects('Schedule:Compact') == []
+    assert edited.get_object('ThermostatSetpoint:DualSetpoint', 'Zone 1 Thermostat')[2:] == \
+        ('Zone 1 Thermostat Heating Setpoint', 'Zone 1 Thermostat Cooling Setpoint')
+    assert edited.get_object('Schedule:Constant', 'Zone 1 Thermostat Heating Setpoint')[3] == '20'
+    # unmodified objects and comments are kept as is
+    edited_text = (tmp_path / 'edited.idf').read_text()
+    assert edited_text.startswith('!- ===========  ALL OBJECTS IN CLASS: TIMESTEP ===========')
+    assert 'schedules/plug_loads.csv,!- File Name' in edited_text
+    assert edited_text.endswith('! end of model\n')
+    # the source model is unchanged
+    assert EnergyPlusModelModifier(idf_path).to_idf_text() == IDF_TEXT
+
+
+def test_variants_do_not_share_edits(idf_path, tmp_path):
+    model = EnergyPlusModelModifier(idf_path)
+
+    variant_files = model.write_variants({'ts_1': lambda m: m.set_timestep(1), 'ts_2': lambda m: m.set_timestep(2)},
+                                         str(tmp_path / 'variants'))
+
+    assert EnergyPlusModelModifier(variant_files['ts_1']).get_object('Timestep') == ('Timestep', '1')
+    assert EnergyPlusModelModifier(variant_files['ts_2']).get_object('Timestep') == ('Timestep', '2')
+    assert model.get_object('Timestep') == ('Timestep', '6')
+
+
+@pytest.mark.parametrize('schedule_class, schedule_name', [('Schedule:Compact', 'Occupancy'),
+                                                           ('Schedule:Year', 'Lighting'),
+                                                           ('Schedule:File', 'Plug Loads')])
+def test_schedule_constant_keeps_type_limits(idf_path, schedule_class, schedule_name):
+    model = EnergyPlusModelModifier(idf_path)
+
+    model.set_schedule_constant(schedule_name, 1)
+
+    assert model.get_object('Schedule:Constant', schedule_name) == ('Schedule:Constant', schedule_name, 'Fraction',
+                                                                    '1')
+    assert [fields[1] for fields in model.get_objects(schedule_class)] == []
+
+
+@pytest.mark.parametrize('schedule_name', ['Lighting Week', 'Lighting Day'])
+def test_schedule_constant_refuses_week_and_day_schedules(idf_path, schedule_name):
+    model = EnergyPlusModelModifier(idf_path)
+
+    with pytest.raises(ValueError, match='can be set constant'):
+        model.set_schedule_constant(schedule_name, 1)
+    assert model.to_idf_text() == IDF_TEXT
+
+
+def test_schedule_constant_unknown_schedule(idf_path):
+    with pytest.raises(ValueError, match='not found'):
+        EnergyPlusModelModifier(idf_path).set_schedule_constant('Missing', 1)
+
+
+def test_parse_cache_is_bounded_and_tracks_changes(tmp_path, monkeypatch):
+    monkeypatch.setattr(EnergyPlusModelModifier, '_parse_cache', type(EnergyPlusModelModifier._parse_cache)())
+    monkeypatch.setattr(EnergyPlusModelModifier, '_parse_cache_size', 2)
+    idf_files = []
+    for i in range(3):
+        idf_files.append(str(tmp_path / f'model_{i}.idf'))
+        with open(idf_files[-1], 'w') as idf:
+            idf.write(f'Timestep, {i + 1};\n')
+        EnergyPlusModelModifier(idf_files[-1])
+
+    assert list(EnergyPlusModelModifier._parse_cache) == [os.path.abspath(f) for f in idf_files[1:]]
+
+    # a changed file is re-parsed, replacing its outdated entry
+    with open(idf_files[2], 'w') as idf:
+        idf.write('Timestep, 10;\n')
+    os.utime(idf_files[2], ns=(1, 1))
+    assert EnergyPlusModelModifier(idf_files[2]).get_object('Timestep') == ('Timestep', '10')
+    assert len(EnergyPlusModelModifier._parse_cache) == 2
+
+    # a cache hit is moved to most recently used
+    EnergyPlusModelModifier(idf_files[1])
+    EnergyPlusModelModifier(idf_files[0])
+    assert list(EnergyPlusModelModifier._parse_cache) == [os.path.abspath(f) for f in [idf_files[1], idf_files[0]]]
@@ -0,0 +1,29 @@
+import numpy as np
+
+from conftest import STATE_CP
+
+
+def test_running_stats_saved_and_reloaded(make_sim, run, tmp_path):
+    stats_file = str(tmp_path / 'stats.json')
+    sim = make_sim()
+    sim.set_calling_point_and_callback_function(STATE_CP, lambda: None, None, True)
+    stats = sim.init_observation_stats(['zone_temp'])
+    run(sim)
+    zone_temps = sim.data_var_zone_temp
+    sim.save_observation_stats(stats_file)
+
+    assert stats.to_df().loc['zone_temp', 'count'] == 192
+    np.testing.assert_allclose(stats.mean, [zone_temps.mean()])
+    np.testing.assert_allclose(stats.var, [zone_temps.var()])
+    np.testing.assert_allclose(sim.get_normalized_observation(),
+                               [(zone_temps[-1] - zone_temps.mean()) / zone_temps.std()], atol=1e-6)
+    np.testing.assert_allclose(sim.get_normalized_observation(min_max=True),
+                               [(zone_temps[-1] - zone_temps.min()) / np.ptp(zone_temps)])
+
+    frozen_sim = make_sim()
+    frozen_sim.set_calling_point_and_callback_function(STATE_CP, lambda: None, None, True)
+    frozen_stats = frozen_sim.init_observation_stats(['zone_temp'], stats_file, freeze=True)
+    run(frozen_sim)
+
+    assert frozen_stats.to_df().loc['zone_temp', 'count'] == 192  # loaded, not updated
+    np.testing.assert_allclose(frozen_stats.mean, stats.mean)
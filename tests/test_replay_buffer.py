@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from conftest import STATE_CP
+
+
+@pytest.fixture
+def agent_sim(make_sim):
+    """Sim whose reward is the timestep count and cooling setpoint cycles through 20, 21, 22."""
+
+    sim = make_sim()
+    sim.set_calling_point_and_callback_function(STATE_CP, lambda: float(sim.timestep_total_count),
+                                                lambda: {'cool_sp': 20.0 + sim.timestep_total_count % 3}, True)
+    return sim
+
+
+def test_transitions_fed_from_callbacks(agent_sim, run):
+    replay_buffer = agent_sim.init_replay_buffer(STATE_CP, ['zone_temp'], ['cool_sp'], 1000, dtype=np.float64)
+    run(agent_sim)
+    arrays = replay_buffer.arrays
+
+    assert len(replay_buffer) == 191  # one per state update after the first
+    np.testing.assert_array_equal(arrays['obs'][:191, 0], agent_sim.data_var_zone_temp[:-1])
+    np.testing.assert_array_equal(arrays['next_obs'][:191, 0], agent_sim.data_var_zone_temp[1:])
+    np.testing.assert_array_equal(arrays['actions'][:191, 0], agent_sim.data_setpoint_cool_sp[:-1])
+    np.testing.assert_array_equal(arrays['rewards'][:191, 0], agent_sim.rewards[1:])
+    assert arrays['dones'][:191].nonzero()[0].tolist() == [190]
+
+
+def test_full_buffer_overwrites_oldest(agent_sim, run):
+    replay_buffer = agent_sim.init_replay_buffer(STATE_CP, ['zone_temp'], ['cool_sp'], 50)
+    run(agent_sim)
+    batch = replay_buffer.sample(32, np.random.default_rng(0))
+
+    assert len(replay_buffer) == 50
+    assert batch['obs'].shape == (32, 1)
+    assert batch['rewards'].min() >= 143  # rewards of the last 50 transitions only
+
+
+def test_shared_buffer_attach(agent_sim, run):
+    replay_buffer = agent_sim.init_replay_buffer(STATE_CP, ['zone_temp'], ['cool_sp'], 1000, shared=True)
+    run(agent_sim)
+    attached = type(replay_buffer).attach(replay_buffer.share())
+    try:
+        assert len(attached) == 191
+        np.testing.assert_array_equal(attached.arrays['next_obs'], replay_buffer.arrays['next_obs'])
+    finally:
+        attached.close()
+        replay_buffer.close()
+
+
+def test_replay_buffer_requires_callback(make_sim):
+    with pytest.raises(Exception, match='No callback function'):
+        make_sim().init_replay_buffer(STATE_CP, ['zone_temp'], ['cool_sp'], 10)
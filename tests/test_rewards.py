@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from conftest import STATE_CP
+
+
+def reward_sequence(sim, rewards):
+    """Observation function returning the given rewards in turn, the last one repeated."""
+
+    def observation_fxn():
+        return rewards[min(sim.timestep_total_count, len(rewards)) - 1]
+    return observation_fxn
+
+
+def test_scalar_reward(make_sim, run):
+    sim = make_sim()
+    sim.set_calling_point_and_callback_function(STATE_CP, reward_sequence(sim, [1.0, 2]), None, True)
+    run(sim)
+
+    assert not sim.rewards_multi
+    assert sim.reward_current == 2.0
+    assert sim.reward_totals[0] == 1.0 + 2.0 * (len(sim.rewards) - 1)
+
+
+def test_multi_obj_reward(make_sim, run):
+    sim = make_sim()
+    sim.set_calling_point_and_callback_function(STATE_CP, reward_sequence(sim, [(1.0, -1.0)]), None, True)
+    run(sim)
+
+    assert sim.rewards_multi
+    assert sim.rewards.shape == (192, 2)
+    np.testing.assert_array_equal(sim.reward_totals, [192.0, -192.0])
+
+
+def test_float_reward_after_multi_obj_reward_raises(make_sim, run):
+    sim = make_sim()
+    sim.set_calling_point_and_callback_function(STATE_CP, reward_sequence(sim, [(1.0, -1.0), 1.0]), None, True)
+    with pytest.raises(TypeError):
+        run(sim)
@@ -0,0 +1,36 @@
+import os
+
+import pytest
+
+from conftest import ACT_CP, STATE_CP
+
+pytestmark = pytest.mark.skipif(not hasattr(os, 'fork'), reason='rollouts require os.fork()')
+
+
+@pytest.mark.parametrize('act_cp', [STATE_CP, ACT_CP])
+def test_fork_rollouts_horizon(make_sim, run, act_cp):
+    sim = make_sim()
+    results = {}
+
+    def actuation():
+        if not results and sim.timestep_total_count == 10:
+            results['rollouts'] = sim.fork_rollouts([[{'cool_sp': 20.0 + i}] * 3 for i in range(2)],
+                                                    lambda branch, start: branch.get_ems_data('cool_sp'))
+        return {'cool_sp': 24.0}
+
+    if act_cp == STATE_CP:
+        sim.set_calling_point_and_callback_function(STATE_CP, lambda: 1.0, actuation, True)
+    else:  # actuation at a different calling point from the state update
+        sim.set_calling_point_and_callback_function(STATE_CP, lambda: 1.0, None, True)
+        sim.set_calling_point_and_callback_function(ACT_CP, None, actuation, False)
+    run(sim)
+
+    rollouts = results['rollouts']
+    assert len(rollouts) == 2
+    for i, rollout in enumerate(rollouts):
+        assert rollout['actions'] == [{'cool_sp': 20.0 + i}] * 3
+        assert len(rollout['trajectory']) <= 4  # state updates until the state following the last action
+        assert rollout['reward_sum'] == len(rollout['rewards'])
+        assert rollout['summary'] == 20.0 + i
+    # parent simulation continued with its own action to the end
+    assert len(sim.rewards) == 192
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from conftest import STATE_CP
+
+METER_TC = {'elec': 'Electricity:Facility'}
+WEATHER_TC = {'oa_db': 'outdoor_dry_bulb'}
+
+
+@pytest.fixture
+def sampled_sim(make_sim):
+    sim = make_sim(meter_tc=METER_TC, weather_tc=WEATHER_TC)
+    sim.set_sampling_periods({'meter': 60, 'oa_db': 30})  # every 4 and 2 zone timesteps
+    return sim
+
+
+def test_metrics_sampled_once_every_period(sampled_sim, run):
+    seen = []
+    sampled_sim.set_calling_point_and_callback_function(
+        STATE_CP, lambda: seen.append(sampled_sim.get_ems_data(['elec', 'oa_db'])), None, True)
+    run(sampled_sim)
+
+    assert sampled_sim.sampling_periods == {'elec': 4, 'oa_db': 2}
+    assert len(sampled_sim.data_meter_elec) == 48
+    assert len(sampled_sim.data_weather_oa_db) == 96
+    assert len(sampled_sim.data_var_zone_temp) == 192
+    np.testing.assert_array_equal(sampled_sim.sample_indexes_4[:3], [0, 4, 8])
+    # runtime data is the most recent sample
+    assert seen[5] == [sampled_sim.data_meter_elec[1], sampled_sim.data_weather_oa_db[2]]
+
+
+def test_default_dataframes_are_nan_where_not_sampled(sampled_sim, run):
+    sampled_sim.set_calling_point_and_callback_function(STATE_CP, lambda: None, None, True)
+    run(sampled_sim)
+    dfs = sampled_sim.get_df()
+
+    assert len(dfs['meter']) == len(dfs['weather']) == 192
+    np.testing.assert_array_equal(dfs['meter']['elec'][::4], sampled_sim.data_meter_elec)
+    assert dfs['meter']['elec'].isna().sum() == 144
+    assert dfs['weather']['oa_db'].isna().sum() == 96
+
+
+def test_invalid_sampling_period_key(make_sim):
+    with pytest.raises(Exception, match='sampling period key'):
+        make_sim().set_sampling_periods({'not_a_metric': 60})
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from EmsPy import emspy
+from EmsPy.fake_energyplus import FAKE_EP_PATH
+
+from conftest import ACT_CP, STATE_CP, TIMESTEPS
+
+VAR_TC = {'zone_temp': ['Zone Air Temperature', 'Zone 1'], 'zone_rh': ['Zone Air Relative Humidity', 'Zone 1']}
+INTVAR_TC = {'zone_volume': ['Zone Air Volume', 'Zone 1'], 'zone_area': ['Zone Floor Area', 'Zone 1']}
+METER_TC = {'elec': 'Electricity:Facility'}
+ACTUATOR_TC = {'cool_sp': ['Zone Temperature Control', 'Cooling Setpoint', 'Zone 1'],
+               'heat_sp': ['Zone Temperature Control', 'Heating Setpoint', 'Zone 1']}
+WEATHER_TC = {'oa_db': 'outdoor_dry_bulb', 'oa_rh': 'outdoor_relative_humidity', 'sun': 'sun_is_up'}
+
+
+def per_callback_sample(sim) -> dict:
+    """Samples all EMS & weather metrics one by one, as each callback did before sampling plans were compiled."""
+
+    datax = sim.api.exchange
+    ems_datax_func = {'var': datax.get_variable_value,
+                      'intvar': datax.get_internal_variable_value,
+                      'meter': datax.get_meter_value,
+                      'actuator': datax.get_actuator_value}
+    sample = {}
+    for ems_name in sim.ems_names_master_list:
+        ems_type = sim.ems_type_dict[ems_name]
+        if ems_type == 'time' or ems_type == 'setpoint':
+            continue
+        if ems_type == 'weather':
+            sample[ems_name] = sim._get_weather([ems_name], 'today', sim._data_store.last('hours'),
+                                                sim.timestep_zone_num_current)
+        else:
+            sample[ems_name] = ems_datax_func[ems_type](sim.state, getattr(sim, 'handle_' + ems_type + '_' + ems_name))
+    return sample
+
+
+@pytest.mark.parametrize('sampling_periods', [None, {'meter': 60, 'oa_db': 30}])
+def test_sampling_plan_matches_per_callback_sampling(idf_file, run, sampling_periods):
+    sim = emspy.BcaEnv(FAKE_EP_PATH, idf_file, TIMESTEPS, VAR_TC, INTVAR_TC, METER_TC, ACTUATOR_TC, WEATHER_TC)
+    if sampling_periods is not None:
+        sim.set_sampling_periods(sampling_periods)
+    expected = []
+
+    def observation():
+        expected.append(per_callback_sample(sim))
+
+    def actuation():
+        return {'cool_sp': 22.0 + sim.timestep_total_count % 3, 'heat_sp': 18.0 + sim.timestep_total_count % 5}
+
+    sim.set_calling_point_and_callback_function(STATE_CP, observation, actuation, True)
+    sim.set_calling_point_and_callback_function(ACT_CP, None, lambda: {'cool_sp': 24.0}, False)
+    run(sim)
+
+    assert len(expected) == 192
+    for ems_name in list(VAR_TC) + list(INTVAR_TC) + list(METER_TC) + list(ACTUATOR_TC) + list(WEATHER_TC):
+        if sampling_periods is not None and ems_name in sim.sampling_periods:
+            sample_indexes = getattr(sim, f'sample_indexes_{sim.sampling_periods[ems_name]}')
+        else:
+            sample_indexes = np.arange(192)
+        np.testing.assert_array_equal(sim._data_store.get(ems_name),
+                                      [expected[i][ems_name] for i in sample_indexes], err_msg=ems_name)
+    # actuator values sampled are those actuated since the prior state update
+    assert set(sim._data_store.get('cool_sp')[1:]) == {24.0}
+    assert set(sim._data_store.get('heat_sp')[1:]) == {18.0, 19.0, 20.0, 21.0, 22.0}
+    # static internal variables are fetched once
+    assert sim.static_vars_obtained
+    assert len(set(sim._data_store.get('zone_volume'))) == 1
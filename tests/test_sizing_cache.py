@@ -0,0 +1,182 @@
+import os
+
+import pytest
+
+from EmsPy.emspy import EmsSizingCache, EnergyPlusModelModifier
+
+IDD_TEXT = """\
+!IDD_Version 22.1.0
+\\group Simulation Parameters
+
+SimulationControl,
+  A1 , \\field Do Zone Sizing Calculation
+  A2 , \\field Do System Sizing Calculation
+  A3 , \\field Do Plant Sizing Calculation
+  A4 , \\field Run Simulation for Sizing Periods
+  A5 ; \\field Run Simulation for Weather File Run Periods
+
+Fan:OnOff,
+  \\memo Constant volume fan
+  A1 , \\field Name
+       \\required-field
+  A2 , \\field Availability Schedule Name
+  N1 , \\field Fan Total Efficiency
+  N2 , \\field Pressure Rise
+       \\units Pa
+  N3 ; \\field Maximum Flow Rate
+       \\units m3/s
+       \\autosizable
+
+Coil:Heating:Electric,
+  A1 , \\field Name
+  A2 , \\field Availability Schedule Name
+  N1 , \\field Efficiency
+  N2 , \\field Nominal Capacity
+       \\autosizable
+  N3 ; \\field Maximum Flow Rate
+       \\autosizable
+"""
+
+IDF_TEXT = """\
+SimulationControl, Yes, Yes, Yes, Yes, Yes;
+
+Schedule:File,
+  Occupancy,               !- Name
+  Fraction,                !- Schedule Type Limits Name
+  schedules/occupancy.csv, !- File Name
+  1,                       !- Column Number
+  0;                       !- Rows to Skip at Top
+
+Fan:OnOff,
+  Unit 1,                  !- Name
+  Always On,               !- Availability Schedule Name
+  0.6,                     !- Fan Total Efficiency
+  300,                     !- Pressure Rise {Pa}
+  Autosize;                !- Maximum Flow Rate {m3/s}
+
+Coil:Heating:Electric,
+  Unit 1,                  !- Name
+  Always On,               !- Availability Schedule Name
+  1.0,                     !- Efficiency
+  Autosize,                !- Nominal Capacity {W}
+  Autosize;                !- Maximum Flow Rate {m3/s}
+"""
+
+EIO_TEXT = """\
+! <Component Sizing Information>, Component Type, Component Name, Input Field Description, Value
+ Component Sizing Information, Fan:OnOff, UNIT 1, Design Size Maximum Flow Rate [m3/s], 0.40
+ Component Sizing Information, Coil:Heating:Electric, UNIT 1, Design Size Nominal Capacity [W], 5000.0
+ Component Sizing Information, Coil:Heating:Electric, UNIT 1, Design Size Maximum Flow Rate [m3/s], 0.35
+ Component Sizing Information, Coil:Heating:Electric, UNIT 1, User-Specified Efficiency, 1.0
+ Zone Sizing Information, ZONE 1, Cooling, 1.0
+"""
+
+
+@pytest.fixture
+def model_dir(tmp_path):
+    (tmp_path / 'ep').mkdir()
+    (tmp_path / 'ep' / 'Energy+.idd').write_text(IDD_TEXT)
+    (tmp_path / 'model').mkdir()
+    (tmp_path / 'model' / 'building.idf').write_text(IDF_TEXT)
+    (tmp_path / 'model' / 'weather.epw').write_text('LOCATION,Test\n')
+    EmsSizingCache._idd_cache.clear()
+    yield tmp_path
+    EmsSizingCache._idd_cache.clear()
+
+
+def make_run_sizing(runs: list, eio_text: str = EIO_TEXT, exit_code: int = 0):
+    def run_sizing(idf_file, weather_file, output_dir):
+        runs.append(EnergyPlusModelModifier(idf_file))
+        with open(os.path.join(output_dir, 'eplusout.eio'), 'w') as eio:
+            eio.write(eio_text)
+        return exit_code
+    return run_sizing
+
+
+def test_parse_eio_sizes(tmp_path):
+    eio_file = tmp_path / 'eplusout.eio'
+    eio_file.write_text(EIO_TEXT)
+
+    sizes = EmsSizingCache._parse_eio_sizes(str(eio_file))
+
+    assert sizes == {
+        ('FAN:ONOFF', 'UNIT 1'): {'maximum flow rate': '0.40'},
+        ('COIL:HEATING:ELECTRIC', 'UNIT 1'): {'nominal capacity': '5000.0', 'maximum flow rate': '0.35'},
+    }
+
+
+def test_idd_field_names_are_numbered_as_model_fields(model_dir):
+    cache = EmsSizingCache(str(model_dir / 'cache'), str(model_dir / 'ep'))
+
+    idd_fields = cache._get_idd_field_names()
+
+    assert idd_fields['FAN:ONOFF'] == ['', 'Name', 'Availability Schedule Name', 'Fan Total Efficiency',
+                                       'Pressure Rise', 'Maximum Flow Rate']
+    assert len(idd_fields['SIMULATIONCONTROL']) == 6
+    model = EnergyPlusModelModifier(str(model_dir / 'model' / 'building.idf'))
+    fan = model.get_object('Fan:OnOff', 'Unit 1')
+    assert fan[idd_fields['FAN:ONOFF'].index('Maximum Flow Rate')] == 'Autosize'
+    coil = model.get_object('Coil:Heating:Electric', 'Unit 1')
+    assert coil[idd_fields['COIL:HEATING:ELECTRIC'].index('Nominal Capacity')] == 'Autosize'
+
+
+def test_same_named_objects_are_sized_by_class(model_dir):
+    runs = []
+    cache = EmsSizingCache(str(model_dir / 'cache'), str(model_dir / 'ep'))
+
+    sized_idf_file = cache.get_sized_idf(str(model_dir / 'model' / 'building.idf'), str(model_dir / 'model' /
+                                         'weather.epw'), make_run_sizing(runs))
+
+    sized_model = EnergyPlusModelModifier(sized_idf_file)
+    assert sized_model.get_object('Fan:OnOff', 'Unit 1')[5] == '0.40'
+    assert sized_model.get_object('Coil:Heating:Electric', 'Unit 1')[4:6] == ('5000.0', '0.35')
+    # nothing left autosized, so sizing is disabled
+    assert sized_model.get_object('SimulationControl') == ('SimulationControl', 'No', 'No', 'No', 'No', 'Yes')
+    # the sizing run itself sizes only
+    assert runs[0].get_object('SimulationControl') == ('SimulationControl', 'Yes', 'Yes', 'Yes', 'Yes', 'No')
+
+
+def test_sized_model_is_written_next_to_the_original_and_reused(model_dir):
+    runs = []
+    idf_file, weather_file = str(model_dir / 'model' / 'building.idf'), str(model_dir / 'model' / 'weather.epw')
+    cache = EmsSizingCache(str(model_dir / 'cache'), str(model_dir / 'ep'))
+
+    sized_idf_file = cache.get_sized_idf(idf_file, weather_file, make_run_sizing(runs))
+
+    # so relative file references (i.e. Schedule:File) resolve the same as for the original model
+    assert os.path.dirname(sized_idf_file) == str(model_dir / 'model')
+    assert os.path.dirname(runs[0].idf_file) == str(model_dir / 'model')
+    assert EnergyPlusModelModifier(sized_idf_file).get_object('Schedule:File', 'Occupancy')[3] == \
+        'schedules/occupancy.csv'
+    # the sizing model is temporary, its outputs go to the cache directory
+    assert sorted(os.listdir(model_dir / 'model')) == sorted(['building.idf', 'weather.epw',
+                                                               os.path.basename(sized_idf_file)])
+    assert os.path.exists(model_dir / 'cache' / (os.path.basename(sized_idf_file).split('.')[1] + '_sizing') /
+                          'eplusout.eio')
+
+    assert cache.get_sized_idf(idf_file, weather_file, make_run_sizing(runs)) == sized_idf_file
+    assert len(runs) == 1
+
+
+def test_failed_sizing_runs_the_original_model(model_dir):
+    runs = []
+    idf_file, weather_file = str(model_dir / 'model' / 'building.idf'), str(model_dir / 'model' / 'weather.epw')
+    cache = EmsSizingCache(str(model_dir / 'cache'), str(model_dir / 'ep'))
+
+    assert cache.get_sized_idf(idf_file, weather_file, make_run_sizing(runs, exit_code=1)) == idf_file
+    assert sorted(os.listdir(model_dir / 'model')) == ['building.idf', 'weather.epw']
+
+
+def test_unmatched_autosize_keeps_sizing_enabled(model_dir):
+    runs = []
+    eio_text = ' Component Sizing Information, Fan:OnOff, UNIT 1, Design Size Maximum Flow Rate [m3/s], 0.40\n'
+    cache = EmsSizingCache(str(model_dir / 'cache'), str(model_dir / 'ep'))
+
+    sized_idf_file = cache.get_sized_idf(str(model_dir / 'model' / 'building.idf'), str(model_dir / 'model' /
+                                         'weather.epw'), make_run_sizing(runs, eio_text))
+
+    sized_model = EnergyPlusModelModifier(sized_idf_file)
+    assert sized_model.get_object('Fan:OnOff', 'Unit 1')[5] == '0.40'
+    # the coil's sizes are not taken from the fan of the same name
+    assert sized_model.get_object('Coil:Heating:Electric', 'Unit 1')[4:6] == ('Autosize', 'Autosize')
+    assert sized_model.get_object('SimulationControl') == ('SimulationControl', 'Yes', 'Yes', 'Yes', 'Yes', 'Yes')
@@ -0,0 +1,100 @@
+import logging
+
+import numpy as np
+import pytest
+
+from EmsPy import emspy
+from EmsPy.fake_energyplus import FAKE_EP_PATH
+
+from conftest import STATE_CP, TIMESTEPS
+
+
+def timestep_reward_factory(sim):
+    """Reward factory of vec env workers, module level to be picklable. Rewards the total timestep count."""
+
+    return lambda: float(sim.timestep_total_count)
+
+
+def test_reset_abandoning_episode_is_not_a_failure(make_sim, tmp_path, log_records):
+    sim = make_sim()
+    sim.init_step_env(STATE_CP, ['zone_temp'])
+    weather_file, output_dir = str(tmp_path / 'weather.epw'), str(tmp_path / 'out')
+
+    sim.reset(weather_file, output_dir)
+    sim.step({'cool_sp': 22.0})
+    sim.reset(weather_file, output_dir)  # abandons the running episode
+    sim._stop_step_simulation()
+
+    assert not [record for record in log_records if record.levelno >= logging.WARNING]
+    assert any('Episode Abandoned' in record.getMessage() for record in log_records)
+
+
+def test_failed_run_of_plain_emspy_is_reported(idf_file, tmp_path, log_records):
+    sim = emspy.EmsPy(FAKE_EP_PATH, idf_file, TIMESTEPS, {'zone_temp': ['Zone Air Temperature', 'Zone 1']}, None,
+                      None, None, None)
+    sim.api.runtime.run_energyplus = lambda state, command_line_args: 1  # E+ fatal error
+
+    sim.run_simulation(str(tmp_path / 'weather.epw'), str(tmp_path / 'out'))
+
+    assert sim.simulation_success == 1
+    assert '* * * Simulation FAILED * * *' in [record.getMessage() for record in log_records
+                                               if record.levelno >= logging.WARNING]
+
+
+def test_vec_env_close_is_quiet(idf_file, tmp_path):
+    tc = {'var': {'zone_temp': ['Zone Air Temperature', 'Zone 1']},
+          'actuator': {'cool_sp': ['Zone Temperature Control', 'Cooling Setpoint', 'Zone 1']}}
+    weather_file = str(tmp_path / 'weather.epw')
+    log_file = tmp_path / 'log.txt'
+    # worker processes inherit the EmsPy log handler, whose stream is redirected to a file before they are started
+    with open(log_file, 'w') as log_stream:
+        stream = emspy.logger.handlers[0].setStream(log_stream)
+        try:
+            vec_env = emspy.BcaVecEnv(FAKE_EP_PATH, TIMESTEPS, [(idf_file, weather_file, tc)] * 2, STATE_CP,
+                                      ['zone_temp'], ['cool_sp'], output_root=str(tmp_path / 'out'))
+            observations = vec_env.reset()
+            vec_env.step(np.full((2, 1), 22.0))
+            vec_env.close()
+        finally:
+            emspy.logger.handlers[0].setStream(stream)
+
+    assert observations.shape == (2, 1)
+    assert log_file.read_text() == ''
+
+
+def test_done_step_returns_final_reward(make_sim, tmp_path):
+    sim = make_sim()
+    sim.init_step_env(STATE_CP, ['zone_temp'], timestep_reward_factory(sim), update_act_freq=3)
+
+    sim.reset(str(tmp_path / 'weather.epw'), str(tmp_path / 'out'))
+    steps = []
+    done = False
+    while not done:
+        observation, reward, done, info = sim.step({'cool_sp': 22.0})
+        steps.append((reward, info['timestep']))
+
+    # rewards after the last handoff are still computed, the final one is handed off with the terminal observation
+    assert steps[-2] == (191.0, 191)
+    assert steps[-1] == (192.0, 192)
+    assert observation[0] == sim.data_var_zone_temp[-1]
+
+
+def test_vec_env_done_returns_final_reward(idf_file, tmp_path):
+    tc = {'var': {'zone_temp': ['Zone Air Temperature', 'Zone 1']},
+          'actuator': {'cool_sp': ['Zone Temperature Control', 'Cooling Setpoint', 'Zone 1']}}
+    vec_env = emspy.BcaVecEnv(FAKE_EP_PATH, TIMESTEPS, [(idf_file, str(tmp_path / 'weather.epw'), tc)], STATE_CP,
+                              ['zone_temp'], ['cool_sp'], timestep_reward_factory, str(tmp_path / 'out'))
+    try:
+        vec_env.reset()
+        for _ in range(192):
+            observations, rewards, dones, infos = vec_env.step(np.full((1, 1), 22.0))
+            if dones[0]:
+                break
+    finally:
+        vec_env.close()
+
+    assert dones[0]
+    assert rewards[0] == 192.0
+    assert infos[0]['terminal_observation'].shape == (1,)
+    # auto-reset, the next episode's first observation is returned
+    assert observations.shape == (1, 1)
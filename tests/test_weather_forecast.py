@@ -0,0 +1,46 @@
+import numpy as np
+
+from conftest import STATE_CP, TIMESTEPS
+
+WEATHER_TC = {'oa_db': 'outdoor_dry_bulb', 'oa_rh': 'outdoor_relative_humidity'}
+
+
+def count_calls(exchange, getter_name, calls):
+    getter = getattr(exchange, getter_name)
+
+    def counted_getter(*args):
+        calls.append(args[1:])
+        return getter(*args)
+    setattr(exchange, getter_name, counted_getter)
+
+
+def test_day_forecast_cache(make_sim, run):
+    sim = make_sim(weather_tc=WEATHER_TC)
+    calls = []
+    count_calls(sim.api.exchange, 'tomorrow_weather_outdoor_dry_bulb_at_time', calls)
+    forecast_calls = []  # E+ API calls of each day forecast fetch
+    days = {}
+
+    def observation_fxn():
+        for _ in range(2):
+            call_num = len(calls)
+            forecast = sim.get_weather_forecast_day(['oa_db', 'oa_rh'], 'tomorrow')
+            forecast_calls.append(len(calls) - call_num)
+        days.setdefault(int(sim.days[-1]), []).append(forecast)
+        if sim.timestep_total_count in (5, 150):
+            # same as the per-timestep forecast, and as the uncached E+ API
+            for hour, zone_ts in [(0, 1), (7, 3), (23, TIMESTEPS)]:
+                expected = sim._get_weather(['oa_db', 'oa_rh'], 'tomorrow', hour, zone_ts)
+                assert sim.get_weather_forecast(['oa_db', 'oa_rh'], 'tomorrow', hour, zone_ts) == expected
+                np.testing.assert_array_equal(forecast[:, hour, zone_ts - 1], expected)
+                assert sim.get_weather_forecast(['oa_db'], 'tomorrow', hour, zone_ts) == expected[0]
+
+    sim.set_calling_point_and_callback_function(STATE_CP, observation_fxn, None, True)
+    run(sim)
+
+    # fetched once per day, then cache hits
+    assert forecast_calls.count(24 * TIMESTEPS) == len(days) == 2
+    assert sum(forecast_calls) == 2 * 24 * TIMESTEPS
+    for forecasts in days.values():
+        assert all(forecast is forecasts[0] for forecast in forecasts)
+        assert forecasts[0].shape == (2, 24, TIMESTEPS)